@@ -4,17 +4,31 @@ import bpy.utils.previews
 
 from .operators.limit_weights import NaoLimitWeightsOperator
 from .operators.ue_psk_fix import UEPskFixOperator
-from .operators.p3r_outline_mesh import P3ROutlineMeshOperator
+from .operators.outline_mesh import NaoOutlineMeshOperator, OUTLINE_PRESET_ITEMS
 from .operators.normalize_weights import NaoNormalizeOperator
 from .operators.rename_uv import NaoRenameUVOperator
 from .operators.split_by_material import NaoSplitByMaterialOperator
+from .operators.split_by_bone_palette import NaoSplitByBonePaletteOperator
 from .operators.triangulate_faces import NaoTriangulateOperator
+from .operators.optimize_vertex_cache import NaoOptimizeVertexCacheOperator
+from .operators.export_vertex_buffers import NaoExportVertexBuffersOperator, layout_items
 from .operators.clear_unused_weights import NaoClearUnusedWeightsOperator
+from .operators.transfer_weights import NaoTransferWeightsOperator
 from .operators.ue_material_duplicate import UEMaterialDuplicateOperator
-from .operators.skeleton_printer import SkeletonPrinterOperator
+from .operators.skeleton_printer import SkeletonPrinterOperator, NaoSkeletonDiffOperator, SKELETON_OUTPUT_ITEMS
 from .operators.vertex_colors_to_normals import NaoVertexColorsToNormalsOperator
 from .operators.bake_normals_workflow import NaoBakeNormalsWorkflowOperator
-from .operators.rename_materials_list import NaoRenameMaterialsListOperator
+from .operators.rename_materials_list import NaoRenameMaterialsListOperator, profile_items
+from .operators.consolidate_materials import NaoConsolidateMaterialsOperator
+from .operators.copy_mirror_pose import NaoCopyMirrorPoseOperator, clear_pair_cache
+from .operators.surface_query import clear_surface_cache
+from .operators.bake_normals_workflow import clear_bake_cache
+from .operators.recipe_pipeline import (NaoRecipeStep, NaoRunRecipeOperator, NaoLoadRecipeOperator,
+                                        NaoSaveRecipeOperator, NaoRecipeStepAddOperator,
+                                        NaoRecipeStepRemoveOperator, draw_recipe, recipe_items)
+from .operators import profiling
+from .operators import change_tracking
+from .operators.profiling import NaoExportProfileOperator, NaoClearProfileOperator
 
 bl_info = {
     "name": "NaoTools",
@@ -33,6 +47,93 @@ class NaoProperties(bpy.types.PropertyGroup):
         min=1,
         max=10
     )
+    weight_precision: bpy.props.EnumProperty(
+        name="Weight Precision",
+        description="Quantize normalized weights so they add up exactly once exported at this bit depth",
+        items=[
+            ('FLOAT', "Float", "Keep full precision weights"),
+            ('8', "8-bit", "Weights stored as 0-255"),
+            ('16', "16-bit", "Weights stored as 0-65535"),
+        ]
+    )
+    only_changed: bpy.props.BoolProperty(
+        name="Only Changed Meshes",
+        description="Skip meshes that haven't changed since the tool last ran on them",
+        default=False
+    )
+    outline_preset: bpy.props.EnumProperty(
+        name="Outline Preset",
+        items=OUTLINE_PRESET_ITEMS
+    )
+    outline_collection: bpy.props.PointerProperty(
+        name="Outline Collection",
+        type=bpy.types.Collection
+    )
+    transfer_resolution: bpy.props.IntProperty(
+        name="Transfer Resolution",
+        description="Size of the UV grid used by the UV transfer, 0 picks it from the source's texel density",
+        default=0,
+        min=0,
+        max=16384
+    )
+    transfer_source: bpy.props.PointerProperty(
+        name="Transfer Source",
+        description="Mesh whose normals are sent to every other selected mesh, leave empty to use the 2 selected meshes",
+        type=bpy.types.Object,
+        poll=lambda self, obj: obj.type == 'MESH'
+    )
+    recipe_steps: bpy.props.CollectionProperty(type=NaoRecipeStep)
+    recipe_preset: bpy.props.EnumProperty(
+        name="Recipe",
+        items=recipe_items
+    )
+    recipe_name: bpy.props.StringProperty(name="Recipe Name", default="")
+    profiling: bpy.props.BoolProperty(
+        name="Profile Operators",
+        description="Time every NaoTools operator and its stages",
+        default=False,
+        update=lambda self, context: profiling.set_enabled(self.profiling)
+    )
+    profiling_history: bpy.props.IntProperty(
+        name="Runs Kept",
+        default=20,
+        min=1,
+        max=500,
+        update=lambda self, context: profiling.set_history(self.profiling_history)
+    )
+    material_profile: bpy.props.EnumProperty(
+        name="Material Profile",
+        items=profile_items
+    )
+    skeleton_output: bpy.props.EnumProperty(
+        name="Output",
+        items=SKELETON_OUTPUT_ITEMS
+    )
+    skeleton_filepath: bpy.props.StringProperty(
+        name="File",
+        subtype='FILE_PATH',
+        default="//skeleton.txt"
+    )
+    skeleton_diff_filepath: bpy.props.StringProperty(
+        name="Diff File",
+        description="File Skeleton Diff writes to, so it doesn't overwrite the printed hierarchy",
+        subtype='FILE_PATH',
+        default="//skeleton_diff.json"
+    )
+    skeleton_transforms: bpy.props.BoolProperty(
+        name="Rest Transforms",
+        description="Include each bone's rest head, tail and roll in text output",
+        default=True
+    )
+    vertex_layout: bpy.props.EnumProperty(
+        name="Vertex Layout",
+        items=layout_items
+    )
+    vertex_buffer_directory: bpy.props.StringProperty(
+        name="Folder",
+        subtype='DIR_PATH',
+        default="//"
+    )
 
 # A dictionary to hold the custom preview collection for images
 preview_collections = {}
@@ -63,6 +164,8 @@ class NaoAllMeshesPanel(bpy.types.Panel):
         layout = self.layout
         layout.operator("wm.nao_limit_weights_operator")
         layout.prop(context.scene.nao_props, "max_vertex_groups")
+        layout.prop(context.scene.nao_props, "weight_precision")
+        layout.prop(context.scene.nao_props, "only_changed")
         layout.operator("wm.nao_normalize_operator")
         layout.operator("wm.nao_rename_uv_operator")
         layout.prop(context.scene, "nao_custom_uv_name")
@@ -74,6 +177,7 @@ class NaoAllMeshesPanel(bpy.types.Panel):
         layout.label(text="P5R: UV0")
         layout.label(text="P4D: UV1")
         layout.label(text="Smush: map1")
+        layout.operator("wm.nao_consolidate_materials_operator")
 
 class NaoSelectedMeshPanel(bpy.types.Panel):
     bl_parent_id = "PT_Nao_Tools_Main_Panel"
@@ -86,9 +190,15 @@ class NaoSelectedMeshPanel(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         layout.operator("wm.nao_split_by_material_operator")
+        layout.operator("wm.nao_split_by_bone_palette_operator")
         layout.operator("wm.nao_triangulate_operator")
+        layout.operator("wm.nao_optimize_vertex_cache_operator")
         layout.operator("wm.nao_clear_unused_weights_operator") 
+        layout.operator("wm.nao_transfer_weights_operator")
         layout.operator("wm.ue_material_duplicate_operator")
+        layout.prop(context.scene.nao_props, "vertex_layout")
+        layout.prop(context.scene.nao_props, "vertex_buffer_directory")
+        layout.operator("wm.nao_export_vertex_buffers_operator")
 
 class NaoMiscPanel(bpy.types.Panel):
     bl_parent_id = "PT_Nao_Tools_Main_Panel"
@@ -100,8 +210,14 @@ class NaoMiscPanel(bpy.types.Panel):
 
     def draw(self, context):
         layout = self.layout
-        layout.operator("wm.p3r_outline_mesh_operator")
+        layout.prop(context.scene.nao_props, "outline_preset")
+        layout.operator("wm.nao_outline_mesh_operator").scope = 'ACTIVE'
+        row = layout.row(align=True)
+        row.operator("wm.nao_outline_mesh_operator", text="Outline Selected").scope = 'SELECTED'
+        row.operator("wm.nao_outline_mesh_operator", text="Outline Collection").scope = 'COLLECTION'
+        layout.prop(context.scene.nao_props, "outline_collection")
         layout.operator("wm.nao_rename_materials_list_operator")
+        layout.prop(context.scene.nao_props, "material_profile")
         
 class NaoNormalBakingPanel(bpy.types.Panel):
     bl_parent_id = "PT_Nao_Tools_Main_Panel"
@@ -113,7 +229,11 @@ class NaoNormalBakingPanel(bpy.types.Panel):
 
     def draw(self, context):
         layout = self.layout
-        layout.operator("wm.nao_bake_normals_workflow_operator")
+        layout.operator("wm.nao_bake_normals_workflow_operator").mode = 'BAKE'
+        layout.operator("wm.nao_bake_normals_workflow_operator", text="Transfer Normals (UV)").mode = 'UV'
+        layout.operator("wm.nao_bake_normals_workflow_operator", text="Transfer Normals (Nearest Surface)").mode = 'SPATIAL'
+        layout.prop(context.scene.nao_props, "transfer_source")
+        layout.prop(context.scene.nao_props, "transfer_resolution")
         layout.operator("wm.nao_vertex_colors_to_normals_operator", text="Vertex Colors to Normals")
 
 class NaoSelectedArmaturePanel(bpy.types.Panel):
@@ -128,6 +248,44 @@ class NaoSelectedArmaturePanel(bpy.types.Panel):
         layout = self.layout
         layout.operator("wm.ue_psk_fix_operator")
         layout.operator("wm.skeleton_printer_operator")
+        layout.operator("wm.nao_skeleton_diff_operator")
+        row = layout.row(align=True)
+        row.operator("wm.nao_copy_mirror_pose_operator", text="Mirror Bone").scope = 'ACTIVE'
+        row.operator("wm.nao_copy_mirror_pose_operator", text="Selected").scope = 'SELECTED'
+        row.operator("wm.nao_copy_mirror_pose_operator", text="Whole Pose").scope = 'ALL'
+        row = layout.row(align=True)
+        row.prop(context.scene, "nao_left_suffix")
+        row.prop(context.scene, "nao_right_suffix")
+        props = context.scene.nao_props
+        layout.prop(props, "skeleton_output")
+        if props.skeleton_output in {'TEXT', 'JSON'}:
+            layout.prop(props, "skeleton_filepath")
+            layout.prop(props, "skeleton_diff_filepath")
+        if props.skeleton_output != 'JSON':
+            layout.prop(props, "skeleton_transforms")
+
+class NaoRecipePanel(bpy.types.Panel):
+    bl_parent_id = "PT_Nao_Tools_Main_Panel"
+    bl_label = "Recipes"
+    bl_idname = "PT_Nao_Recipe_Panel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'NaoTools'
+
+    def draw(self, context):
+        draw_recipe(self.layout, context.scene.nao_props)
+
+class NaoPerformancePanel(bpy.types.Panel):
+    bl_parent_id = "PT_Nao_Tools_Main_Panel"
+    bl_label = "Performance"
+    bl_idname = "PT_Nao_Performance_Panel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'NaoTools'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        profiling.draw_runs(self.layout, context.scene.nao_props)
 
 # Function to load the logo image into preview collections
 def load_logo():
@@ -148,40 +306,73 @@ def unload_logo():
     preview_collections.clear()
 
 classes = (
+    NaoRecipeStep,
     NaoProperties,
     NaoLimitWeightsOperator,
     NaoNormalizeOperator,
     NaoRenameUVOperator,
     NaoSplitByMaterialOperator,
+    NaoSplitByBonePaletteOperator,
     NaoTriangulateOperator,
-    P3ROutlineMeshOperator,
+    NaoOptimizeVertexCacheOperator,
+    NaoExportVertexBuffersOperator,
+    NaoOutlineMeshOperator,
     NaoClearUnusedWeightsOperator,
+    NaoTransferWeightsOperator,
     NaoToolsPanel,
     NaoAllMeshesPanel,
     NaoSelectedMeshPanel,
     NaoMiscPanel,
     NaoNormalBakingPanel,
     NaoSelectedArmaturePanel,
+    NaoRecipePanel,
+    NaoPerformancePanel,
     UEPskFixOperator,
     UEMaterialDuplicateOperator,
     SkeletonPrinterOperator,
+    NaoSkeletonDiffOperator,
+    NaoCopyMirrorPoseOperator,
     NaoVertexColorsToNormalsOperator, 
     NaoBakeNormalsWorkflowOperator,
     NaoRenameMaterialsListOperator,
+    NaoConsolidateMaterialsOperator,
+    NaoRunRecipeOperator,
+    NaoLoadRecipeOperator,
+    NaoSaveRecipeOperator,
+    NaoRecipeStepAddOperator,
+    NaoRecipeStepRemoveOperator,
+    NaoExportProfileOperator,
+    NaoClearProfileOperator,
 )
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.nao_custom_uv_name = bpy.props.StringProperty(name="UV Name", default="UV0")
+    bpy.types.Scene.nao_left_suffix = bpy.props.StringProperty(name="Left", default="L")
+    bpy.types.Scene.nao_right_suffix = bpy.props.StringProperty(name="Right", default="R")
     bpy.types.Scene.nao_props = bpy.props.PointerProperty(type=NaoProperties)
+    profiling.track(classes)
+    profiling.register_handlers()
+    if clear_surface_cache not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(clear_surface_cache)
+    change_tracking.register_handlers()
     load_logo()
 
 def unregister():
+    profiling.unregister_handlers()
+    change_tracking.unregister_handlers()
     for cls in classes:
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.nao_custom_uv_name
+    del bpy.types.Scene.nao_left_suffix
+    del bpy.types.Scene.nao_right_suffix
     del bpy.types.Scene.nao_props
+    if clear_surface_cache in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_surface_cache)
+    clear_surface_cache()
+    clear_bake_cache()
+    clear_pair_cache()
     unload_logo()
 
 if __name__ == "__main__":
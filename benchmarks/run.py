@@ -0,0 +1,291 @@
+"""NaoTools benchmark suite.
+
+Times the NaoTools operators on synthetic meshes inside background Blender,
+along with the bpy-free NumPy cores, and compares the results against a
+stored baseline.
+
+Usage:
+    blender -b --factory-startup --python benchmarks/run.py -- [options]
+    python benchmarks/run.py --core-only [options]
+
+Options:
+    --scales 10k,100k        scales to run, see synthetic.SCALES
+    --cases limit,normals    only run cases whose name contains one of these
+    --repeat N               keep the best of N runs of each case
+    --baseline FILE          baseline JSON to compare against
+    --threshold 0.25         allowed slowdown before a case counts as a regression
+    --update-baseline        write the results into the baseline file
+    --output FILE            also write the results as JSON
+
+Exits with status 1 when any case regressed, and 2 when there is no
+baseline to compare against. Timings depend on the machine, so no baseline
+is shipped; record one with --update-baseline before making changes.
+"""
+import argparse
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ADDON_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+sys.path.insert(0, str(ADDON_DIR))
+
+import numpy as np
+
+import synthetic
+from core import normals, partition, transfer, vertex_buffer, vertex_cache, weights
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+# --- bpy-free cores ---
+
+def asset_table(asset):
+    return weights.WeightTable(asset.weight_verts, asset.weight_groups, asset.weight_values,
+                               asset.vertex_count, asset.group_count)
+
+
+def asset_triangles(asset):
+    quads = np.arange(len(asset.loop_verts)).reshape(-1, 4)
+    return np.concatenate((quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]))
+
+
+def asset_loop_normals(asset):
+    return normals.colors_to_normals(asset.colors)
+
+
+def asset_vertex_buffers(asset):
+    layout = vertex_buffer.VertexLayout("bench", [
+        ("position", "float32", 3), ("normal", "float16", 4), ("uv0", "float16", 2),
+        ("bone_indices", "uint8", 4), ("bone_weights", "unorm8", 4)], "uint32")
+    indices, weights = vertex_buffer.bone_streams(asset_table(asset), 4, "unorm8")
+    streams = {"position": asset.coords[asset.loop_verts], "normal": asset_loop_normals(asset), "uv0": asset.uvs,
+               "bone_indices": indices[asset.loop_verts], "bone_weights": weights[asset.loop_verts]}
+    return vertex_buffer.build_buffers(layout, streams, asset_triangles(asset), np.tile(asset.material_index, 2))
+
+
+def asset_transfer_weights(asset):
+    """Transfer the asset's weights onto its own vertices, each hitting a spread out triangle."""
+    tri_verts = asset.loop_verts[asset_triangles(asset)]
+    faces = np.arange(asset.vertex_count) % len(tri_verts)
+    steps = [("limit_weights", {"limit": 4, "normalize": False}), ("normalize", {})]
+    return transfer.transfer_weights(asset_table(asset), asset.coords, faces, asset.coords, tri_verts, steps)
+
+
+CORE_CASES = {
+    "core.limit_total": lambda asset: weights.limit_total(asset_table(asset), 4),
+    "core.normalize": lambda asset: weights.normalize(asset.weight_verts, asset.weight_values, asset.vertex_count),
+    "core.quantize": lambda asset: weights.quantize(asset.weight_verts, asset.weight_values, asset.vertex_count, 8),
+    "core.weight_steps": lambda asset: weights.run_weight_steps(asset_table(asset), [
+        ("limit_weights", {"limit": 4}), ("normalize", {}), ("clear_unused_weights", {})]),
+    "core.colors_to_normals": lambda asset: normals.colors_to_normals(asset.colors),
+    "core.split_by_material": lambda asset: [
+        partition.submesh(faces, asset.loop_starts, asset.loop_totals, asset.loop_verts,
+                          asset.loop_edges, asset.edge_verts)
+        for faces in partition.group_faces(asset.material_index)[1]],
+    "core.uv_transfer": lambda asset: transfer.uv_transfer_normals(
+        asset.uvs, asset_loop_normals(asset), asset_triangles(asset), asset.uvs),
+    "core.transfer_weights": asset_transfer_weights,
+    "core.vertex_buffers": asset_vertex_buffers,
+    "core.vertex_cache": lambda asset: vertex_cache.tipsify(asset.loop_verts[asset_triangles(asset)],
+                                                            asset.vertex_count),
+}
+
+
+# --- Operators inside Blender ---
+
+def load_addon():
+    sys.path.insert(0, str(ADDON_DIR.parent))
+    addon = importlib.import_module(ADDON_DIR.name)
+    if not hasattr(bpy.types.Scene, "nao_props"):
+        addon.register()
+    return importlib.import_module(f"{ADDON_DIR.name}.operators.weight_io")
+
+
+def clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+
+
+def build_object(asset, weight_io):
+    """Create a mesh object from a synthetic asset and make it the only selected, active object."""
+    mesh = bpy.data.meshes.new(asset.name)
+    mesh.vertices.add(asset.vertex_count)
+    mesh.loops.add(len(asset.loop_verts))
+    mesh.polygons.add(asset.face_count)
+    mesh.vertices.foreach_set("co", asset.coords.ravel())
+    mesh.loops.foreach_set("vertex_index", asset.loop_verts)
+    mesh.polygons.foreach_set("loop_start", asset.loop_starts)
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", asset.loop_totals)
+    mesh.polygons.foreach_set("material_index", asset.material_index)
+    mesh.update(calc_edges=True)
+
+    mesh.uv_layers.new(name="UVMap").data.foreach_set("uv", asset.uvs.ravel())
+    colors = mesh.color_attributes.new("Col", 'BYTE_COLOR', 'CORNER')
+    colors.data.foreach_set("color", asset.colors.ravel())
+    for i in range(asset.material_count):
+        mesh.materials.append(bpy.data.materials.get(f"Bench_{i}") or bpy.data.materials.new(f"Bench_{i}"))
+
+    obj = bpy.data.objects.new(asset.name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    for i in range(asset.group_count):
+        obj.vertex_groups.new(name=f"Bone_{i:03d}")
+    weight_io.add_weights(obj, asset_table(asset))
+
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+    return obj
+
+
+# Operator cases: bpy.ops.wm operator name and the largest material count it is run with
+OPERATOR_CASES = {
+    "op.limit_weights": ("nao_limit_weights_operator", None),
+    "op.normalize": ("nao_normalize_operator", None),
+    "op.clear_unused_weights": ("nao_clear_unused_weights_operator", None),
+    "op.vertex_colors_to_normals": ("nao_vertex_colors_to_normals_operator", None),
+    "op.split_by_material": ("nao_split_by_material_operator", None),
+    "op.triangulate": ("nao_triangulate_operator", None),
+    "op.optimize_vertex_cache": ("nao_optimize_vertex_cache_operator", None),
+    "op.rename_uv": ("nao_rename_uv_operator", None),
+    "op.outline_mesh": ("nao_outline_mesh_operator", None),
+    # Builds one full copy per material, keep it to the smaller assets
+    "op.ue_material_duplicate": ("ue_material_duplicate_operator", 4),
+}
+
+
+def run_operator(name):
+    def run(obj):
+        getattr(bpy.ops.wm, name)()
+    return run
+
+
+# --- Driver ---
+
+def best_time(func, repeat, setup=None):
+    best = None
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        func(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def selected(name, filters):
+    return not filters or any(pattern in name for pattern in filters)
+
+
+def run_suite(args):
+    results = {}
+    weight_io = load_addon() if bpy is not None and not args.core_only else None
+    for scale in args.scales:
+        asset = synthetic.make_asset(scale)
+        print(f"== {scale}: {asset.vertex_count} vertices, {asset.face_count} faces, "
+              f"{asset.group_count} groups, {asset.material_count} materials")
+        for name, func in CORE_CASES.items():
+            if selected(name, args.cases):
+                results[f"{name}[{scale}]"] = best_time(lambda _argument: func(asset), args.repeat)
+                print(f"{name:<32} {results[f'{name}[{scale}]']:9.3f}s")
+
+        if weight_io is None:
+            continue
+        for name, (operator, max_materials) in OPERATOR_CASES.items():
+            if not selected(name, args.cases):
+                continue
+            if max_materials is not None and asset.material_count > max_materials:
+                continue
+
+            def setup():
+                clear_scene()
+                return build_object(asset, weight_io)
+
+            results[f"{name}[{scale}]"] = best_time(run_operator(operator), args.repeat, setup)
+            print(f"{name:<32} {results[f'{name}[{scale}]']:9.3f}s")
+        clear_scene()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print every case against its baseline time.
+
+    Returns the names that regressed and the names missing from the
+    baseline, which can't be checked.
+    """
+    regressions = []
+    missing = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            missing.append(name)
+            print(f"{name:<44} {'(none)':>10} -> {seconds:9.3f}s")
+            continue
+        change = seconds / reference - 1.0 if reference > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<44} {reference:9.3f}s -> {seconds:9.3f}s ({change:+.0%}){flag}")
+    return regressions, missing
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="NaoTools benchmark suite")
+    parser.add_argument("--scales", default="10k,100k", type=lambda value: value.split(","))
+    parser.add_argument("--cases", default="", type=lambda value: [part for part in value.split(",") if part])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--core-only", action="store_true")
+    args = parser.parse_args(argv)
+    unknown = [scale for scale in args.scales if scale not in synthetic.SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s) {', '.join(unknown)}, pick from {', '.join(synthetic.SCALES)}")
+    return args
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = parse_args(argv)
+    results = run_suite(args)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    if not baseline and not args.update_baseline:
+        print(f"No baseline at {baseline_path}, nothing to compare against. "
+              f"Record one on this machine with --update-baseline.", file=sys.stderr)
+        return 2
+    if args.update_baseline:
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True), encoding="utf-8")
+        print(f"Baseline updated: {baseline_path}")
+        return 0
+
+    regressions, missing = compare(results, baseline, args.threshold)
+    if missing:
+        print(f"Warning: {len(missing)} case(s) have no baseline and weren't checked, "
+              f"add them with --update-baseline", file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
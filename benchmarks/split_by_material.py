@@ -0,0 +1,63 @@
+"""Compare the array based Split by Materials with Blender's separate operator.
+
+Run with:
+    blender -b --factory-startup --python benchmarks/split_by_material.py -- [faces] [materials]
+"""
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+ADDON_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ADDON_DIR.parent))
+split_by_material = importlib.import_module(f"{ADDON_DIR.name}.operators.split_by_material").split_by_material
+
+
+def make_grid(faces, materials):
+    """Add a square grid of about ``faces`` quads with ``materials`` material stripes."""
+    side = int(np.sqrt(faces))
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=side + 1, y_subdivisions=side + 1, size=2.0)
+    obj = bpy.context.active_object
+    for i in range(materials):
+        obj.data.materials.append(bpy.data.materials.new(f"Bench_{i}"))
+    count = len(obj.data.polygons)
+    obj.data.polygons.foreach_set("material_index", (np.arange(count) * materials // count).astype(np.int32))
+    obj.data.uv_layers.new(name="UV0")
+    return obj
+
+
+def separate(obj):
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.ops.mesh.select_all(action='SELECT')
+    bpy.ops.mesh.separate(type='MATERIAL')
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def timed(label, func, obj):
+    start = time.perf_counter()
+    func(obj)
+    print(f"{label:<20} {time.perf_counter() - start:8.3f}s")
+
+
+def main():
+    args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    faces = int(args[0]) if args else 1_000_000
+    materials = int(args[1]) if len(args) > 1 else 8
+
+    bpy.ops.wm.read_homefile(use_empty=True)
+    obj = make_grid(faces, materials)
+    print(f"{len(obj.data.polygons)} faces, {materials} materials")
+    copy = obj.copy()
+    copy.data = obj.data.copy()
+    bpy.context.collection.objects.link(copy)
+
+    timed("mesh.separate", separate, copy)
+    timed("split_by_material", split_by_material, obj)
+
+
+if __name__ == "__main__":
+    main()
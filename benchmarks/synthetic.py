@@ -0,0 +1,77 @@
+"""Deterministic synthetic assets for the benchmarks.
+
+An asset is a quad grid with per-loop UVs and colors, material stripes and
+skin weights spread over a given number of vertex groups. Everything is
+generated from a fixed seed with NumPy, so the same scale always produces
+the same data. Nothing in here imports bpy.
+"""
+import numpy as np
+
+# Vertex count, vertex groups and materials of every benchmark scale
+SCALES = {
+    "10k": {"vertices": 10_000, "groups": 50, "materials": 1},
+    "100k": {"vertices": 100_000, "groups": 100, "materials": 4},
+    "1M": {"vertices": 1_000_000, "groups": 200, "materials": 8},
+    "2M": {"vertices": 2_000_000, "groups": 300, "materials": 16},
+}
+
+INFLUENCES = 6
+WEIGHT_STEPS = 64
+
+
+class Asset:
+    """Arrays describing one synthetic skinned mesh."""
+
+    def __init__(self, name, vertices, groups, materials, seed=0):
+        rng = np.random.default_rng(seed)
+        side = max(int(np.ceil(np.sqrt(vertices))), 2)
+        self.name = name
+        self.group_count = groups
+        self.material_count = materials
+
+        u, v = np.meshgrid(np.linspace(0.0, 1.0, side, dtype=np.float32),
+                           np.linspace(0.0, 1.0, side, dtype=np.float32))
+        height = 0.05 * np.sin(u * 12.0) * np.cos(v * 9.0)
+        self.coords = np.stack((u.ravel() * 2 - 1, v.ravel() * 2 - 1, height.ravel()), axis=1).astype(np.float32)
+        self.vertex_uvs = np.stack((u.ravel(), v.ravel()), axis=1)
+
+        quads = side - 1
+        row, col = np.divmod(np.arange(quads * quads), quads)
+        corner = row * side + col
+        self.loop_verts = np.stack((corner, corner + 1, corner + side + 1, corner + side), axis=1).ravel().astype(np.int32)
+        self.loop_totals = np.full(quads * quads, 4, dtype=np.int32)
+        self.loop_starts = np.arange(0, len(self.loop_verts), 4, dtype=np.int32)
+        self.material_index = (row * materials // quads).astype(np.int32)
+
+        first = self.loop_verts
+        second = self.loop_verts.reshape(-1, 4)[:, [1, 2, 3, 0]].ravel()
+        keys = np.sort(np.stack((first, second), axis=1), axis=1)
+        self.edge_verts, self.loop_edges = np.unique(keys, axis=0, return_inverse=True)
+        self.loop_edges = self.loop_edges.astype(np.int32).ravel()
+
+        self.uvs = self.vertex_uvs[self.loop_verts]
+        self.colors = np.rint(rng.random((len(self.loop_verts), 4), dtype=np.float32) * 255.0) / 255.0
+        self.colors[:, 3] = 1.0
+
+        count = len(self.coords)
+        self.weight_verts = np.repeat(np.arange(count, dtype=np.int32), INFLUENCES)
+        # Strictly increasing offsets give every vertex distinct groups
+        steps = rng.integers(1, max(groups // INFLUENCES, 1) + 1, size=(count, INFLUENCES))
+        offsets = np.cumsum(steps, axis=1)
+        base = (np.arange(count) * groups // count)[:, None]
+        self.weight_groups = ((base + offsets) % groups).astype(np.int32).ravel()
+        # Coarse weights keep the number of distinct (group, weight) pairs small
+        raw = rng.integers(1, WEIGHT_STEPS + 1, size=count * INFLUENCES)
+        self.weight_values = (raw / WEIGHT_STEPS).astype(np.float32)
+
+    @property
+    def vertex_count(self):
+        return len(self.coords)
+
+    @property
+    def face_count(self):
+        return len(self.loop_starts)
+
+
+def make_asset(scale, seed=0):
+    return Asset(scale, seed=seed, **SCALES[scale])
@@ -0,0 +1,215 @@
+"""Run a NaoTools recipe over a folder of models with background Blender workers.
+
+Usage:
+    blender -b --python cli.py -- INPUT_DIR --recipe recipe.json [--output DIR]
+                                  [--jobs N] [--log batch.jsonl] [--timeout SECONDS]
+
+A recipe is a JSON list of steps, or an object with a "steps" list, e.g.
+
+    [
+        {"step": "limit_weights", "limit": 4},
+        {"step": "normalize"},
+        {"step": "rename_uv", "name": "UV0"},
+        {"step": "triangulate"},
+        {"step": "split_by_material"},
+        {"step": "export", "filepath": "{output}/{stem}.fbx"}
+    ]
+
+Every .fbx, .psk, .pskx and .blend file under INPUT_DIR is processed by its
+own Blender process, up to --jobs at a time. One JSON line per file is
+appended to the log as soon as it finishes; a file that fails is logged
+and the batch carries on.
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+ADDON_DIR = Path(__file__).resolve().parent
+# Name the add-on is imported under in workers, its folder name may not be a valid module name
+ADDON_PACKAGE = "naotools"
+MODEL_EXTENSIONS = {".fbx", ".psk", ".pskx", ".blend"}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="blender -b --python cli.py --", description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="folder of models, or a single model when running as a worker")
+    parser.add_argument("--recipe", required=True, help="recipe JSON file, or the name of a built-in recipe such as p5r")
+    parser.add_argument("--output", help="output folder, defaults to INPUT_DIR/naotools_output")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="number of Blender workers")
+    parser.add_argument("--log", help="JSON lines log, defaults to OUTPUT/batch_log.jsonl")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds before a file is given up on")
+    parser.add_argument("--blender", help="Blender executable for the workers")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def script_args():
+    """Arguments after Blender's "--" separator, or all of them when run by plain Python."""
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return sys.argv[1:]
+
+
+def resolve_recipe(recipe):
+    """Path of a recipe file, looking names up in the add-on's recipes folder."""
+    path = Path(recipe)
+    if not path.exists() and (ADDON_DIR / "recipes" / f"{recipe.lower()}.json").exists():
+        path = ADDON_DIR / "recipes" / f"{recipe.lower()}.json"
+    return str(path.resolve())
+
+
+def load_recipe(path):
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    return data["steps"] if isinstance(data, dict) else data
+
+
+def blender_binary(override=None):
+    if override:
+        return override
+    try:
+        import bpy
+    except ImportError:
+        return "blender"
+    return bpy.app.binary_path or "blender"
+
+
+def collect_models(folder, exclude=None):
+    """Model files under ``folder``, leaving out anything inside ``exclude`` (the output folder)."""
+    exclude = Path(exclude).resolve() if exclude else None
+    return sorted(path for path in Path(folder).resolve().rglob("*")
+                  if path.is_file() and path.suffix.lower() in MODEL_EXTENSIONS
+                  and not (exclude and exclude in path.parents))
+
+
+# --- Worker, runs inside a background Blender with one model ---
+
+def import_model(path):
+    import bpy
+
+    extension = path.suffix.lower()
+    if extension == ".blend":
+        bpy.ops.wm.open_mainfile(filepath=str(path))
+        return
+    bpy.ops.wm.read_homefile(use_empty=True)
+    if extension == ".fbx":
+        bpy.ops.import_scene.fbx(filepath=str(path))
+    elif extension in {".psk", ".pskx"}:
+        if not hasattr(bpy.ops.import_scene, "psk"):
+            import addon_utils
+            addon_utils.enable("io_scene_psk_psa", default_set=True)
+        bpy.ops.import_scene.psk(filepath=str(path))
+
+
+def import_addon():
+    """Import the add-on package from ADDON_DIR under ADDON_PACKAGE, whatever its folder is called."""
+    if ADDON_PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(ADDON_PACKAGE, ADDON_DIR / "__init__.py",
+                                                      submodule_search_locations=[str(ADDON_DIR)])
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[ADDON_PACKAGE] = package
+        try:
+            spec.loader.exec_module(package)
+        except BaseException:
+            del sys.modules[ADDON_PACKAGE]
+            raise
+    return sys.modules[ADDON_PACKAGE]
+
+
+def run_worker(args):
+    path = Path(args.input)
+    record = {"file": str(path), "status": "failed", "steps": []}
+    start = time.perf_counter()
+    try:
+        import_addon()
+        recipes = importlib.import_module(f"{ADDON_PACKAGE}.operators.recipes")
+        recipe = load_recipe(args.recipe)
+        recipes.validate_recipe(recipe)
+
+        step_start = time.perf_counter()
+        import_model(path)
+        record["steps"].append({"step": "import", "seconds": time.perf_counter() - step_start})
+        record["steps"].extend(recipes.run_recipe(recipe, {"output": args.output, "stem": path.stem, "name": path.name}))
+        record["status"] = "ok"
+    except Exception as error:
+        record["error"] = f"{type(error).__name__}: {error}"
+    record["seconds"] = time.perf_counter() - start
+
+    with open(args.result, "w", encoding="utf-8") as file:
+        json.dump(record, file)
+    return 0 if record["status"] == "ok" else 1
+
+
+# --- Driver, hands the files out to worker processes ---
+
+def process_file(blender, path, args):
+    """Run one worker process for ``path`` and return its log record."""
+    handle, result_path = tempfile.mkstemp(suffix=".json", prefix="naotools_")
+    os.close(handle)
+    command = [blender, "-b", "--python", str(Path(__file__).resolve()), "--",
+               str(path), "--worker", "--recipe", args.recipe, "--output", args.output, "--result", result_path]
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+        try:
+            with open(result_path, encoding="utf-8") as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            record = {"file": str(path), "status": "failed", "steps": [],
+                      "error": f"Blender exited with code {completed.returncode}",
+                      "stderr": completed.stderr[-2000:]}
+    except subprocess.TimeoutExpired:
+        record = {"file": str(path), "status": "failed", "steps": [],
+                  "error": f"Timed out after {args.timeout}s"}
+    finally:
+        if os.path.exists(result_path):
+            os.remove(result_path)
+    record["wall_seconds"] = time.perf_counter() - start
+    return record
+
+
+def run_batch(args):
+    args.recipe = resolve_recipe(args.recipe)
+    load_recipe(args.recipe)
+    args.output = str(Path(args.output or Path(args.input) / "naotools_output").resolve())
+    files = collect_models(args.input, args.output)
+    log_path = Path(args.log or Path(args.output) / "batch_log.jsonl")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    blender = blender_binary(args.blender)
+
+    print(f"NaoTools batch: {len(files)} file(s), {args.jobs} worker(s), log {log_path}")
+    start = time.perf_counter()
+    failed = 0
+    with open(log_path, "a", encoding="utf-8") as log, ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        futures = [pool.submit(process_file, blender, path, args) for path in files]
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            log.write(json.dumps(record) + "\n")
+            log.flush()
+            failed += record["status"] != "ok"
+            status = "ok" if record["status"] == "ok" else f"FAILED ({record.get('error')})"
+            print(f"[{done}/{len(files)}] {record['file']}: {status} in {record['wall_seconds']:.1f}s", flush=True)
+
+        summary = {"summary": True, "files": len(files), "failed": failed,
+                   "seconds": time.perf_counter() - start}
+        log.write(json.dumps(summary) + "\n")
+    print(f"Done: {len(files) - failed} ok, {failed} failed in {summary['seconds']:.1f}s")
+    return 1 if failed else 0
+
+
+def main():
+    args = parse_args(script_args())
+    return run_worker(args) if args.worker else run_batch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
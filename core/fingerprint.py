@@ -0,0 +1,14 @@
+"""Content fingerprints for mesh data arrays."""
+import hashlib
+
+import numpy as np
+
+
+def array_fingerprint(*arrays):
+    """Hash the shapes, types and contents of the given arrays into a hex digest."""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.data)
+    return digest.hexdigest()
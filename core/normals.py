@@ -0,0 +1,49 @@
+"""Vectorized conversions between colors and normal vectors.
+
+Large arrays are processed in fixed-size chunks so the temporary buffers
+stay small no matter how many loops a mesh has. Nothing in here imports
+bpy.
+"""
+import numpy as np
+
+CHUNK_SIZE = 1 << 18
+
+
+def gamma_lut(gamma=2.2):
+    """Lookup table decoding 8-bit channel values with the given gamma."""
+    return (np.arange(256, dtype=np.float32) / np.float32(255.0)) ** np.float32(gamma)
+
+
+def normalize_rows(vectors):
+    """Normalize (N, 3) vectors in place, leaving zero-length rows at zero."""
+    lengths = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+    np.divide(vectors, lengths[:, None], out=vectors, where=lengths[:, None] > 0.0)
+    return vectors
+
+
+def colors_to_normals(colors, gamma=2.2, quantized=True, out=None, chunk_size=CHUNK_SIZE):
+    """Decode (N, 3+) colors into unit normals, mapping 0..1 to -1..1.
+
+    Quantized colors are 8-bit values stored as floats and are gamma decoded
+    through a lookup table; float colors use a direct power when ``gamma``
+    isn't 1.
+    """
+    count = len(colors)
+    if out is None:
+        out = np.empty((count, 3), dtype=np.float32)
+    lut = gamma_lut(gamma) if quantized else None
+
+    for start in range(0, count, chunk_size):
+        end = min(start + chunk_size, count)
+        chunk = colors[start:end, :3]
+        if quantized:
+            indices = np.rint(np.clip(chunk, 0.0, 1.0) * 255.0).astype(np.uint8)
+            chunk = lut[indices]
+        elif gamma != 1.0:
+            chunk = np.power(np.clip(chunk, 0.0, None), np.float32(gamma))
+        else:
+            chunk = chunk.astype(np.float32, copy=True)
+        chunk *= 2.0
+        chunk -= 1.0
+        out[start:end] = normalize_rows(chunk)
+    return out
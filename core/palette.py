@@ -0,0 +1,181 @@
+"""Bone palette partitioning.
+
+Splits a mesh's faces into clusters that each reference at most a given
+number of distinct bones (vertex groups), as needed by games that skin
+every draw call with a fixed size bone palette. Faces are reduced to
+their distinct bone sets first, so the greedy packing only loops over
+those sets rather than over faces. Nothing in here imports bpy.
+"""
+import numpy as np
+
+from .partition import face_loops
+
+
+def face_bones(loop_starts, loop_totals, loop_verts, table, threshold=0.0):
+    """Distinct (face, bone) pairs of a mesh, sorted by face.
+
+    A face uses every bone that weights one of its vertices above
+    ``threshold``.
+    """
+    face_count = len(loop_starts)
+    live = table.weights > threshold
+    verts = table.verts[live]
+    order = np.argsort(verts, kind="stable")
+    groups = table.groups[live][order].astype(np.int64)
+    counts = np.bincount(verts, minlength=table.vertex_count)
+    vert_starts = np.cumsum(counts) - counts
+
+    loops, _starts, totals = face_loops(np.arange(face_count), loop_starts, loop_totals)
+    corner_verts = loop_verts[loops]
+    corner_faces = np.repeat(np.arange(face_count, dtype=np.int64), totals)
+    per_corner = counts[corner_verts]
+    offsets = np.arange(int(per_corner.sum())) - np.repeat(np.cumsum(per_corner) - per_corner, per_corner)
+    pair_bones = groups[np.repeat(vert_starts[corner_verts], per_corner) + offsets]
+    pair_faces = np.repeat(corner_faces, per_corner)
+
+    stride = max(table.group_count, 1)
+    pairs = np.sort(pair_faces * stride + pair_bones)
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+    return pairs // stride, pairs % stride
+
+
+def _unique(values):
+    """First index of every distinct value and each value's distinct index, via a stable sort."""
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    new = np.r_[True, ordered[1:] != ordered[:-1]] if len(values) else np.zeros(0, dtype=bool)
+    inverse = np.empty(len(values), dtype=np.int64)
+    inverse[order] = np.cumsum(new) - 1
+    return order[new], inverse
+
+
+def bone_sets(face_count, pair_faces, pair_bones):
+    """Number every distinct bone set.
+
+    Returns each face's set id, the bones of every set and each set's
+    lowest and mean bone. Faces are sorted by a 64-bit hash summed over
+    their bones, so no Python object is built per face, then neighbours
+    with equal hashes have their bones compared exactly. A collision can at
+    worst split one set in two, never merge two different ones.
+    """
+    rng = np.random.default_rng(0x6E616F)
+    keys = rng.integers(1, np.iinfo(np.int64).max, size=int(pair_bones.max()) + 1 if len(pair_bones) else 1,
+                        dtype=np.int64).view(np.uint64)
+    # Pairs are sorted by face, so each face's hash is a difference of running sums
+    starts = np.searchsorted(pair_faces, np.arange(face_count + 1))
+    face_sizes = starts[1:] - starts[:-1]
+    sums = np.zeros(len(pair_bones) + 1, dtype=np.uint64)
+    np.cumsum(keys[pair_bones], dtype=np.uint64, out=sums[1:])
+    hashes = sums[starts[1:]] - sums[starts[:-1]]
+
+    order = np.lexsort((face_sizes, hashes))
+    left = order[:-1]
+    right = order[1:]
+    same = (hashes[left] == hashes[right]) & (face_sizes[left] == face_sizes[right])
+    # Each face's bones are sorted, so equal sets have equal bone rows
+    candidates = np.flatnonzero(same)
+    lengths = face_sizes[left[candidates]]
+    offsets = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    differ = (pair_bones[np.repeat(starts[left[candidates]], lengths) + offsets]
+              != pair_bones[np.repeat(starts[right[candidates]], lengths) + offsets])
+    owner = np.repeat(np.arange(len(candidates)), lengths)
+    same[candidates[np.bincount(owner, weights=differ, minlength=len(candidates)) > 0]] = False
+
+    new = np.r_[True, ~same] if face_count else np.zeros(0, dtype=bool)
+    set_ids = np.empty(face_count, dtype=np.int64)
+    set_ids[order] = np.cumsum(new) - 1
+    first = order[new]
+
+    sizes = face_sizes[first]
+    bone_sums = np.concatenate(([0], np.cumsum(pair_bones)))
+    means = (bone_sums[starts[first + 1]] - bone_sums[starts[first]]) / np.maximum(sizes, 1)
+    lowest = np.full(len(first), -1, dtype=np.int64)
+    lowest[sizes > 0] = pair_bones[starts[first[sizes > 0]]]
+    sets = [frozenset(pair_bones[starts[face]:starts[face + 1]].tolist()) for face in first.tolist()]
+    return set_ids, sets, lowest, means
+
+
+def pack_palettes(sets, order, budget, window=8):
+    """Greedily pack bone sets into palettes of at most ``budget`` bones.
+
+    Sets are visited in ``order``, which should put sets sharing bones
+    next to each other, and go into whichever of the ``window`` most
+    recently opened palettes grows the least, ties going to the newest.
+    Neighbouring palettes that still fit together afterwards are merged. A
+    set larger than the budget gets a palette of its own. Returns each
+    set's palette index and the palettes.
+    """
+    palettes = []
+    members = []
+    for i in order:
+        bones = sets[i]
+        best = None
+        for index in range(len(palettes) - 1, max(len(palettes) - window, 0) - 1, -1):
+            palette = palettes[index]
+            if bones <= palette:
+                best = (None, index)
+                break
+            added = len(bones.difference(palette))
+            if len(palette) + added > budget:
+                continue
+            if best is None or added < best[0]:
+                best = (added, index)
+        if best is None:
+            palettes.append(set(bones))
+            members.append([i])
+        else:
+            palettes[best[1]].update(bones)
+            members[best[1]].append(i)
+
+    kept_palettes = []
+    kept_members = []
+    for palette, indices in zip(palettes, members):
+        for index in range(max(len(kept_palettes) - window, 0), len(kept_palettes)):
+            if len(kept_palettes[index] | palette) <= budget:
+                kept_palettes[index] |= palette
+                kept_members[index].extend(indices)
+                break
+        else:
+            kept_palettes.append(palette)
+            kept_members.append(indices)
+
+    assignment = np.zeros(len(sets), dtype=np.int64)
+    for index, indices in enumerate(kept_members):
+        assignment[indices] = index
+    return assignment, kept_palettes
+
+
+def palette_partition(loop_starts, loop_totals, loop_verts, table, budget, face_groups=None, threshold=0.0):
+    """Assign every face a cluster index so each cluster of each face group fits the bone budget.
+
+    ``face_groups`` (e.g. material indices) are clustered separately, since
+    each of them is drawn on its own anyway, and cluster ``k`` of every
+    group ends up in the same piece. Returns the face clusters and the
+    palettes of every group, keyed by group.
+    """
+    face_count = len(loop_starts)
+    pair_faces, pair_bones = face_bones(loop_starts, loop_totals, loop_verts, table, threshold)
+    set_ids, sets, lowest, means = bone_sets(face_count, pair_faces, pair_bones)
+    if face_groups is None:
+        face_groups = np.zeros(face_count, dtype=np.int64)
+
+    clusters = np.zeros(face_count, dtype=np.int64)
+    palettes = {}
+    for group in np.unique(face_groups).tolist():
+        faces = np.flatnonzero(face_groups == group)
+        group_firsts, local_ids = _unique(set_ids[faces])
+        group_sets = set_ids[faces][group_firsts]
+        # Visit the sets by lowest, then mean bone so the ones sharing bones come together
+        order = np.lexsort((means[group_sets], lowest[group_sets])).tolist()
+        assignment, palettes[group] = pack_palettes([sets[i] for i in group_sets.tolist()], order, budget)
+        clusters[faces] = assignment[local_ids]
+    return clusters, palettes
+
+
+def duplicated_vertices(face_clusters, loop_starts, loop_totals, loop_verts):
+    """Extra vertices created by splitting the faces along their cluster boundaries."""
+    loops, _starts, totals = face_loops(np.arange(len(loop_starts)), loop_starts, loop_totals)
+    verts = loop_verts[loops]
+    vert_count = int(verts.max()) + 1 if len(verts) else 0
+    corner_clusters = np.repeat(face_clusters, totals)
+    return len(np.unique(corner_clusters * vert_count + verts)) - len(np.unique(verts))
@@ -0,0 +1,130 @@
+"""Face partitioning and sub-mesh index maps.
+
+A sub-mesh is described by the original indices of the vertices, edges,
+faces and loops it keeps, plus its own topology arrays expressed in the
+new, compacted indices. Nothing in here imports bpy.
+"""
+import numpy as np
+
+
+class SubMesh:
+    """Index maps and remapped topology of a subset of a mesh's faces."""
+
+    __slots__ = ("faces", "loops", "verts", "edges", "loop_starts", "loop_totals",
+                 "loop_verts", "loop_edges", "edge_verts")
+
+    def __init__(self, faces, loops, verts, edges, loop_starts, loop_totals,
+                 loop_verts, loop_edges, edge_verts):
+        self.faces = faces
+        self.loops = loops
+        self.verts = verts
+        self.edges = edges
+        self.loop_starts = loop_starts
+        self.loop_totals = loop_totals
+        self.loop_verts = loop_verts
+        self.loop_edges = loop_edges
+        self.edge_verts = edge_verts
+
+
+def group_faces(face_keys):
+    """Group face indices by key, returning the sorted keys and the faces of each."""
+    face_keys = np.asarray(face_keys)
+    order = np.argsort(face_keys, kind="stable")
+    keys, starts = np.unique(face_keys[order], return_index=True)
+    return keys, np.split(order, starts[1:])
+
+
+def face_loops(faces, loop_starts, loop_totals):
+    """Loop indices of ``faces`` in face order, with the new start and size of each face."""
+    totals = loop_totals[faces]
+    new_starts = np.cumsum(totals) - totals
+    offsets = np.arange(int(totals.sum())) - np.repeat(new_starts, totals)
+    loops = np.repeat(loop_starts[faces], totals) + offsets
+    return loops, new_starts, totals
+
+
+def loose_elements(vertex_count, loop_verts, loop_edges, edge_verts):
+    """Edges no face uses and vertices no edge or face uses."""
+    used_edges = np.zeros(len(edge_verts), dtype=bool)
+    used_edges[loop_edges] = True
+    used_verts = np.zeros(vertex_count, dtype=bool)
+    used_verts[loop_verts] = True
+    used_verts[edge_verts.ravel()] = True
+    return np.flatnonzero(~used_edges), np.flatnonzero(~used_verts)
+
+
+def submesh(faces, loop_starts, loop_totals, loop_verts, loop_edges, edge_verts, loose_edges=(), loose_verts=()):
+    """Build the SubMesh keeping ``faces`` and only the vertices and edges they use.
+
+    ``loose_edges`` and ``loose_verts`` (see loose_elements) are kept as
+    well, along with the vertices of those edges.
+    """
+    faces = np.asarray(faces, dtype=np.int64)
+    loose_edges = np.asarray(loose_edges, dtype=np.int64)
+    loose_verts = np.asarray(loose_verts, dtype=np.int64)
+    loops, new_starts, totals = face_loops(faces, loop_starts, loop_totals)
+    edges = np.unique(np.concatenate((loop_edges[loops], loose_edges)))
+    verts = np.unique(np.concatenate((loop_verts[loops], edge_verts[loose_edges].ravel(), loose_verts)))
+
+    vert_map = np.full(int(verts[-1]) + 1 if len(verts) else 0, -1, dtype=np.int64)
+    vert_map[verts] = np.arange(len(verts))
+    edge_map = np.full(int(edges[-1]) + 1 if len(edges) else 0, -1, dtype=np.int64)
+    edge_map[edges] = np.arange(len(edges))
+
+    return SubMesh(faces, loops, verts, edges,
+                   new_starts.astype(np.int32), totals.astype(np.int32),
+                   vert_map[loop_verts[loops]].astype(np.int32), edge_map[loop_edges[loops]].astype(np.int32),
+                   vert_map[edge_verts[edges]].astype(np.int32))
+
+
+def tiled_submesh(count, vertex_count, loop_starts, loop_totals, loop_verts, loop_edges, edge_verts):
+    """Build the SubMesh of ``count`` back to back copies of a whole mesh.
+
+    Copy ``k`` reuses every vertex, edge, face and loop of the source with
+    its indices offset by ``k`` times the source's element counts.
+    """
+    edge_count = len(edge_verts)
+    loop_count = len(loop_verts)
+    face_count = len(loop_starts)
+    copies = np.arange(count, dtype=np.int64)
+
+    def tiled(values, stride):
+        return (np.tile(values, (count,) + (1,) * (values.ndim - 1))
+                + np.repeat(copies * stride, len(values)).reshape((-1,) + (1,) * (values.ndim - 1)))
+
+    return SubMesh(
+        np.tile(np.arange(face_count), count),
+        np.tile(np.arange(loop_count), count),
+        np.tile(np.arange(vertex_count), count),
+        np.tile(np.arange(edge_count), count),
+        tiled(loop_starts, loop_count).astype(np.int32),
+        np.tile(loop_totals, count).astype(np.int32),
+        tiled(loop_verts, vertex_count).astype(np.int32),
+        tiled(loop_edges, edge_count).astype(np.int32),
+        tiled(edge_verts, vertex_count).astype(np.int32),
+    )
+
+
+def merge_slots(face_slots, slot_keys):
+    """Fold material slots that share a key and drop slots no face uses.
+
+    ``slot_keys`` holds one hashable per slot, ``face_slots`` the slot index
+    of every face. Returns the keys of the kept slots, in order of their
+    first slot, and the faces' new slot indices.
+    """
+    face_slots = np.asarray(face_slots, dtype=np.int64)
+    if not slot_keys:
+        return [], np.zeros_like(face_slots)
+    face_slots = np.clip(face_slots, 0, len(slot_keys) - 1)
+    counts = np.bincount(face_slots, minlength=len(slot_keys))
+    kept = []
+    positions = {}
+    remap = np.zeros(len(slot_keys), dtype=np.int64)
+    for slot, key in enumerate(slot_keys):
+        if not counts[slot]:
+            continue
+        if key not in positions:
+            positions[key] = len(kept)
+            kept.append(key)
+        remap[slot] = positions[key]
+    return kept, remap[face_slots]
@@ -0,0 +1,130 @@
+"""Skeleton hierarchy export and comparison.
+
+Bones are plain dicts with a name, a parent name (None for roots) and the
+rest pose head, tail and 4x4 matrix in armature space, listed in the order
+the armature stores them. Nothing in here imports bpy.
+"""
+import json
+import math
+
+# Sign applied to each channel when a pose value is copied to the opposite
+# side: X and Y rotation flip, location and scale are copied as they are.
+MIRROR_SIGNS = {
+    "location": (1.0, 1.0, 1.0),
+    "rotation_euler": (-1.0, -1.0, 1.0),
+    "rotation_quaternion": (1.0, -1.0, -1.0, 1.0),
+    "rotation_axis_angle": (1.0, -1.0, -1.0, 1.0),
+    "scale": (1.0, 1.0, 1.0),
+}
+
+
+def children_index(bones):
+    """Map each parent name (None for roots) to its child bones, keeping bone order."""
+    children = {}
+    for bone in bones:
+        children.setdefault(bone["parent"], []).append(bone)
+    return children
+
+
+def walk(bones):
+    """Yield (depth, bone) depth first, roots at depth 0, without recursion."""
+    children = children_index(bones)
+    stack = [(0, bone) for bone in reversed(children.get(None, []))]
+    while stack:
+        depth, bone = stack.pop()
+        yield depth, bone
+        stack.extend((depth + 1, child) for child in reversed(children.get(bone["name"], [])))
+
+
+def _vector(values):
+    return "(" + ", ".join(f"{value:.4f}" for value in values) + ")"
+
+
+def hierarchy_text(name, bones, transforms=True, indent=1):
+    """Indented hierarchy of an armature as one string, roots at ``indent`` tabs."""
+    lines = [f"Hierarchy for Armature: {name}"]
+    for depth, bone in walk(bones):
+        line = "\t" * (depth + indent) + bone["name"]
+        if transforms:
+            line += f"  head={_vector(bone['head'])} tail={_vector(bone['tail'])} roll={bone['roll']:.4f}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def hierarchy_json(name, bones):
+    """Armature as JSON, every bone listing its parent, depth and rest transform."""
+    entries = []
+    for depth, bone in walk(bones):
+        entry = dict(bone)
+        entry["depth"] = depth
+        entries.append(entry)
+    return json.dumps({"armature": name, "bones": entries}, indent=2)
+
+
+def diff(reference, other, tolerance=1e-4):
+    """Compare two bone lists by name in linear time.
+
+    Returns a dict listing the bones of ``reference`` missing from
+    ``other``, the extra bones of ``other``, bones whose parent changed and
+    bones whose rest head or tail moved by more than ``tolerance``.
+    """
+    index = {bone["name"]: bone for bone in other}
+    seen = set()
+    report = {"missing": [], "extra": [], "reparented": [], "moved": []}
+    for bone in reference:
+        match = index.get(bone["name"])
+        if match is None:
+            report["missing"].append(bone["name"])
+            continue
+        seen.add(bone["name"])
+        if match["parent"] != bone["parent"]:
+            report["reparented"].append({"name": bone["name"], "from": bone["parent"], "to": match["parent"]})
+        head = math.dist(bone["head"], match["head"])
+        tail = math.dist(bone["tail"], match["tail"])
+        if head > tolerance or tail > tolerance:
+            report["moved"].append({"name": bone["name"], "head": head, "tail": tail})
+    report["extra"] = [bone["name"] for bone in other if bone["name"] not in seen]
+    return report
+
+
+def diff_text(reference_name, other_name, report):
+    lines = [f"Skeleton diff: {reference_name} -> {other_name}"]
+    lines.append(f"Missing ({len(report['missing'])}):")
+    lines.extend(f"\t{name}" for name in report["missing"])
+    lines.append(f"Extra ({len(report['extra'])}):")
+    lines.extend(f"\t{name}" for name in report["extra"])
+    lines.append(f"Reparented ({len(report['reparented'])}):")
+    lines.extend(f"\t{entry['name']}: {entry['from']} -> {entry['to']}" for entry in report["reparented"])
+    lines.append(f"Moved ({len(report['moved'])}):")
+    lines.extend(f"\t{entry['name']}: head {entry['head']:.4f}, tail {entry['tail']:.4f}" for entry in report["moved"])
+    return "\n".join(lines) + "\n"
+
+
+def diff_json(reference_name, other_name, report):
+    return json.dumps({"reference": reference_name, "other": other_name, **report}, indent=2)
+
+
+def mirror_name(name, left_suffix, right_suffix):
+    """Name of the bone on the other side, or None when ``name`` has no side."""
+    if not left_suffix or not right_suffix:
+        return None
+    if name.endswith(left_suffix):
+        return name[:-len(left_suffix)] + right_suffix
+    elif name.endswith(right_suffix):
+        return name[:-len(right_suffix)] + left_suffix
+    elif f" {left_suffix}" in name:
+        return name.replace(f" {left_suffix}", f" {right_suffix}")
+    elif f" {right_suffix}" in name:
+        return name.replace(f" {right_suffix}", f" {left_suffix}")
+    return None
+
+
+def mirror_pairs(names, left_suffix, right_suffix):
+    """Map every bone name that has a counterpart among ``names`` to it."""
+    present = set(names)
+    pairs = {}
+    for name in names:
+        other = mirror_name(name, left_suffix, right_suffix)
+        if other and other != name and other in present:
+            pairs[name] = other
+    return pairs
@@ -0,0 +1,262 @@
+"""Attribute transfer between meshes without going through a render engine.
+
+The UV transfer rasterizes per-loop values of a source mesh into a float
+grid in UV space and samples it bilinearly at the loop UVs of a target.
+The surface transfers interpolate values over the source triangle closest
+to each target point. Nothing in here imports bpy.
+"""
+import numpy as np
+
+from .normals import normalize_rows
+from .weights import WeightTable, interpolate_weights, run_weight_steps
+
+RASTER_CHUNK = 1 << 20
+
+
+def auto_resolution(uvs, triangles, texels_per_triangle=2, minimum=256, maximum=8192):
+    """Pick a power of two grid size giving each triangle about ``texels_per_triangle`` texels."""
+    a, b, c = (uvs[triangles[:, i]] for i in range(3))
+    ab = b - a
+    ac = c - a
+    area = 0.5 * np.abs(ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0]).sum()
+    if area <= 0.0:
+        return minimum
+    size = np.sqrt(texels_per_triangle * len(triangles) / area)
+    size = 1 << int(np.ceil(np.log2(max(size, 1.0))))
+    return int(min(max(size, minimum), maximum))
+
+
+def _chunks(costs, budget):
+    """Split a range of items into consecutive chunks whose summed cost stays near ``budget``."""
+    ends = np.cumsum(costs)
+    start = 0
+    while start < len(costs):
+        base = ends[start - 1] if start else 0
+        end = int(np.searchsorted(ends, base + budget, side="right"))
+        end = max(end, start + 1)
+        yield start, end
+        start = end
+
+
+def rasterize(uvs, values, triangles, resolution, chunk_size=RASTER_CHUNK):
+    """Rasterize per-loop ``values`` over ``triangles`` (loop indices) into a UV grid.
+
+    Returns a (resolution, resolution, C) float32 grid indexed [row, column]
+    with row 0 at v = 0, and a boolean coverage mask of the same size.
+    """
+    channels = values.shape[1]
+    grid = np.zeros((resolution, resolution, channels), dtype=np.float32)
+    covered = np.zeros((resolution, resolution), dtype=bool)
+    if len(triangles) == 0:
+        return grid, covered
+
+    # Pixel centers sit at (i + 0.5) / resolution
+    points = uvs.astype(np.float64) * resolution - 0.5
+    corners = points[triangles]
+    origin = corners[:, 0]
+    v0 = corners[:, 1] - origin
+    v1 = corners[:, 2] - origin
+    denom = v0[:, 0] * v1[:, 1] - v1[:, 0] * v0[:, 1]
+    valid = np.abs(denom) > 1e-12
+    denom = np.where(valid, denom, 1.0)
+
+    # Barycentric weights 1 and 2 as affine functions of the pixel position
+    coefficients = np.stack((
+        np.stack((v1[:, 1], -v1[:, 0], v1[:, 0] * origin[:, 1] - v1[:, 1] * origin[:, 0]), axis=1),
+        np.stack((-v0[:, 1], v0[:, 0], v0[:, 1] * origin[:, 0] - v0[:, 0] * origin[:, 1]), axis=1),
+    ), axis=1) / denom[:, None, None]
+    coefficients = coefficients.astype(np.float32)
+
+    lower = np.clip(np.ceil(corners.min(axis=1)), 0, resolution - 1).astype(np.int32)
+    upper = np.clip(np.floor(corners.max(axis=1)), -1, resolution - 1).astype(np.int32)
+    extent = np.maximum(upper - lower + 1, 0)
+    extent[~valid] = 0
+    costs = extent[:, 0] * extent[:, 1]
+
+    for start, end in _chunks(costs, chunk_size):
+        counts = costs[start:end]
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        tri = np.repeat(np.arange(start, end, dtype=np.int32), counts)
+        offsets = np.arange(total, dtype=np.int32) - np.repeat((np.cumsum(counts) - counts).astype(np.int32), counts)
+        width = extent[tri, 0]
+        x = lower[tri, 0] + offsets % width
+        y = lower[tri, 1] + offsets // width
+
+        coefficient = coefficients[tri]
+        xf = x.astype(np.float32)
+        yf = y.astype(np.float32)
+        w1 = coefficient[:, 0, 0] * xf + coefficient[:, 0, 1] * yf + coefficient[:, 0, 2]
+        w2 = coefficient[:, 1, 0] * xf + coefficient[:, 1, 1] * yf + coefficient[:, 1, 2]
+        w0 = 1.0 - w1 - w2
+        inside = np.flatnonzero((w0 >= -1e-5) & (w1 >= -1e-5) & (w2 >= -1e-5))
+
+        tri_loops = triangles[tri[inside]]
+        sample = (values[tri_loops[:, 0]] * w0[inside, None]
+                  + values[tri_loops[:, 1]] * w1[inside, None]
+                  + values[tri_loops[:, 2]] * w2[inside, None])
+        pixels = y[inside] * resolution + x[inside]
+        grid.reshape(-1, channels)[pixels] = sample
+        covered.reshape(-1)[pixels] = True
+    return grid, covered
+
+
+def dilate(grid, covered, iterations=16):
+    """Grow covered texels outwards, like a bake margin, so seams sample clean values."""
+    covered = covered.copy()
+    for _ in range(iterations):
+        if covered.all():
+            break
+        padded = np.pad(grid * covered[..., None], ((1, 1), (1, 1), (0, 0)))
+        weights = np.pad(covered.astype(np.float32), 1)
+        total = padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+        count = weights[:-2, 1:-1] + weights[2:, 1:-1] + weights[1:-1, :-2] + weights[1:-1, 2:]
+        grow = ~covered & (count > 0)
+        if not grow.any():
+            break
+        grid[grow] = total[grow] / count[grow, None]
+        covered |= grow
+    return grid, covered
+
+
+def sample_bilinear(grid, uvs):
+    """Sample a grid from rasterize at ``uvs`` with bilinear filtering and clamped edges."""
+    height, width = grid.shape[:2]
+    x = np.clip(uvs[:, 0].astype(np.float32) * width - 0.5, 0.0, width - 1)
+    y = np.clip(uvs[:, 1].astype(np.float32) * height - 0.5, 0.0, height - 1)
+    x0 = np.floor(x).astype(np.int32)
+    y0 = np.floor(y).astype(np.int32)
+    x1 = np.minimum(x0 + 1, width - 1)
+    y1 = np.minimum(y0 + 1, height - 1)
+    fx = (x - x0)[:, None]
+    fy = (y - y0)[:, None]
+    flat = grid.reshape(height * width, -1)
+    row0 = y0 * width
+    row1 = y1 * width
+    top = flat[row0 + x0] * (1.0 - fx) + flat[row0 + x1] * fx
+    bottom = flat[row1 + x0] * (1.0 - fx) + flat[row1 + x1] * fx
+    return top * (1.0 - fy) + bottom * fy
+
+
+def transform_normals(normals, matrix):
+    """Transform (N, 3) normals by the inverse transpose of a 3x3 ``matrix`` and renormalize."""
+    normal_matrix = np.linalg.inv(np.asarray(matrix, dtype=np.float64)).T
+    return normalize_rows((normals @ normal_matrix.T).astype(np.float32))
+
+
+def uv_transfer_normals(source_uvs, source_normals, source_triangles, target_uvs,
+                        resolution=0, margin=16):
+    """Transfer per-loop normals from a source to a target with matching UV layouts."""
+    if resolution <= 0:
+        resolution = auto_resolution(source_uvs, source_triangles)
+    grid, covered = rasterize(source_uvs, source_normals, source_triangles, resolution)
+    grid, covered = dilate(grid, covered, margin)
+    return normalize_rows(sample_bilinear(grid, target_uvs).astype(np.float32))
+
+
+def barycentric(points, a, b, c):
+    """Barycentric weights of (N, 3) ``points`` in the triangles (a, b, c).
+
+    Points off the triangle plane are projected onto it, and weights are
+    clamped to the triangle so they always sum to 1.
+    """
+    v0 = b - a
+    v1 = c - a
+    v2 = points - a
+    d00 = np.einsum("ij,ij->i", v0, v0)
+    d01 = np.einsum("ij,ij->i", v0, v1)
+    d11 = np.einsum("ij,ij->i", v1, v1)
+    d20 = np.einsum("ij,ij->i", v2, v0)
+    d21 = np.einsum("ij,ij->i", v2, v1)
+    denom = d00 * d11 - d01 * d01
+    degenerate = np.abs(denom) < 1e-20
+    denom = np.where(degenerate, 1.0, denom)
+    w1 = (d11 * d20 - d01 * d21) / denom
+    w2 = (d00 * d21 - d01 * d20) / denom
+    weights = np.stack((1.0 - w1 - w2, w1, w2), axis=1)
+    weights[degenerate] = 1.0 / 3.0
+    np.clip(weights, 0.0, None, out=weights)
+    weights /= np.maximum(weights.sum(axis=1), 1e-20)[:, None]
+    return weights
+
+
+def interpolate_triangles(points, faces, coords, tri_verts, corner_values):
+    """Interpolate per-corner values of the hit triangles at ``points``.
+
+    ``faces`` holds the triangle hit by each point, ``tri_verts`` the vertex
+    indices of every triangle into ``coords`` and ``corner_values`` a
+    (T, 3, C) array of the values at each triangle corner.
+    """
+    corners = tri_verts[faces]
+    weights = barycentric(points, coords[corners[:, 0]], coords[corners[:, 1]], coords[corners[:, 2]])
+    return np.einsum("ij,ijk->ik", weights, corner_values[faces]).astype(np.float32)
+
+
+def transfer_weights(table, points, faces, coords, tri_verts, steps=()):
+    """Vertex-group weights of a source mesh at the surface points hit by a target's vertices.
+
+    ``points`` are the closest points on the source, ``faces`` the triangle
+    each of them lies on, -1 for no hit, and ``table`` the source weights
+    over ``coords``. Weight ``steps`` (see run_weight_steps), such as a
+    limit and normalize, run on the result before anything is returned, so
+    the interpolated weights never need a second pass. Returns a table
+    with one vertex per point, holding only the weights left above 0.
+    """
+    hit = np.flatnonzero(faces >= 0)
+    corners = np.zeros((len(points), 3), dtype=np.int64)
+    blend = np.zeros((len(points), 3), dtype=np.float32)
+    if len(hit):
+        corners[hit] = tri_verts[faces[hit]]
+        a, b, c = (coords[corners[hit, k]] for k in range(3))
+        blend[hit] = barycentric(points[hit], a, b, c)
+    result = interpolate_weights(table, corners, blend)
+    if steps:
+        keep, weights, _unused = run_weight_steps(result, steps)
+    else:
+        keep, weights = np.ones(len(result), dtype=bool), result.weights
+    keep &= weights > 0.0
+    return WeightTable(result.verts[keep], result.groups[keep], weights[keep], result.vertex_count, result.group_count)
+
+
+def merge_weights(existing, incoming, replaced, steps=(), locked=None):
+    """Merge transferred weights into the weights a target already has, in the target's groups.
+
+    ``existing`` is the target's table and ``incoming`` the transferred
+    one, over the same vertices and groups. The existing weights of the
+    ``replaced`` groups give way to the incoming ones, except in
+    ``locked`` groups, which keep their weights and take nothing in. The
+    ``steps`` then run over all of each vertex's weights together, so a
+    vertex adds up to 1 across every group it ends up in. Returns the
+    mask of existing entries to keep, their new weights, and a table of the
+    incoming weights left above 0.
+    """
+    replace = np.asarray(replaced, dtype=bool)
+    taken = np.ones(len(incoming), dtype=bool)
+    if locked is not None:
+        locked = np.asarray(locked, dtype=bool)
+        replace = replace & ~locked
+        taken = ~locked[incoming.groups]
+    kept = ~replace[existing.groups]
+
+    merged = WeightTable(np.concatenate((existing.verts[kept], incoming.verts[taken])),
+                         np.concatenate((existing.groups[kept], incoming.groups[taken])),
+                         np.concatenate((existing.weights[kept], incoming.weights[taken])),
+                         existing.vertex_count, existing.group_count)
+    entry_locked = None if locked is None else locked[merged.groups]
+    if steps:
+        keep, weights, _unused = run_weight_steps(merged, steps, entry_locked)
+    else:
+        keep, weights = np.ones(len(merged), dtype=bool), merged.weights
+
+    split = int(kept.sum())
+    existing_keep = np.zeros(len(existing), dtype=bool)
+    existing_keep[kept] = keep[:split]
+    existing_weights = existing.weights.copy()
+    existing_weights[kept] = weights[:split]
+    existing_weights[~existing_keep] = 0.0
+
+    added = keep[split:] & (weights[split:] > 0.0)
+    result = WeightTable(merged.verts[split:][added], merged.groups[split:][added], weights[split:][added],
+                         existing.vertex_count, existing.group_count)
+    return existing_keep, existing_weights, result
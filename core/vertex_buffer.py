@@ -0,0 +1,273 @@
+"""Interleaved vertex and index buffers for game exporters.
+
+A layout describes one game's vertex: its attributes in order with the
+component type and count of each, plus the index type. Vertices are
+packed into a NumPy structured array of that vertex, welded on their
+packed bytes, and written as a small JSON header followed by the raw
+vertex and index buffers. Nothing in here imports bpy, so buffers can be
+written and read back outside of Blender.
+"""
+import json
+import struct
+
+import numpy as np
+
+from .weights import normalize, quantize_levels, vertex_ranks
+
+MAGIC = b"NAOVB\x00\x00\x01"
+ALIGNMENT = 16
+
+# Component type -> (little-endian NumPy type, whether float input is scaled to the integer range)
+COMPONENT_TYPES = {
+    "float32": ("<f4", False),
+    "float16": ("<f2", False),
+    "uint8": ("u1", False),
+    "uint16": ("<u2", False),
+    "uint32": ("<u4", False),
+    "unorm8": ("u1", True),
+    "unorm16": ("<u2", True),
+    "snorm8": ("i1", True),
+    "snorm16": ("<i2", True),
+}
+INDEX_TYPES = {"uint16": "<u2", "uint32": "<u4"}
+SEMANTICS = ("position", "normal", "uv0", "uv1", "bone_indices", "bone_weights")
+
+
+class VertexLayout:
+    """Attributes of one vertex format and the index type it is drawn with."""
+
+    __slots__ = ("name", "attributes", "index_type", "flip_v")
+
+    def __init__(self, name, attributes, index_type="uint16", flip_v=False):
+        self.name = name
+        self.attributes = [(semantic, component, int(count)) for semantic, component, count in attributes]
+        self.index_type = index_type
+        self.flip_v = bool(flip_v)
+        for semantic, component, count in self.attributes:
+            if semantic not in SEMANTICS:
+                raise ValueError(f"Unknown vertex attribute '{semantic}'")
+            if component not in COMPONENT_TYPES:
+                raise ValueError(f"Unknown component type '{component}' for '{semantic}'")
+            if not 1 <= count <= 8:
+                raise ValueError(f"'{semantic}' needs 1 to 8 components, not {count}")
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{index_type}'")
+
+    @classmethod
+    def from_dict(cls, data):
+        attributes = [(entry["semantic"], entry["type"], entry.get("count", 1)) for entry in data["attributes"]]
+        return cls(data.get("name", ""), attributes, data.get("index_type", "uint16"), data.get("flip_v", False))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "attributes": [{"semantic": semantic, "type": component, "count": count}
+                           for semantic, component, count in self.attributes],
+            "index_type": self.index_type,
+            "flip_v": self.flip_v,
+        }
+
+    @property
+    def dtype(self):
+        """Packed structured dtype of one vertex, attributes in layout order without padding."""
+        return np.dtype([(semantic, COMPONENT_TYPES[component][0], (count,))
+                         for semantic, component, count in self.attributes])
+
+    def influences(self):
+        """Bone slots per vertex, 0 when the layout isn't skinned."""
+        return max((count for semantic, _component, count in self.attributes
+                    if semantic in ("bone_indices", "bone_weights")), default=0)
+
+    def component(self, semantic):
+        return next((component for name, component, _count in self.attributes if name == semantic), None)
+
+
+def bone_streams(table, influences, weight_type="float32"):
+    """Per-vertex bone indices and weights of a WeightTable, heaviest first.
+
+    Only the ``influences`` heaviest weights of a vertex are kept and they
+    are renormalized. For normalized integer weight types the weights come
+    back as integer levels that sum exactly to the type's maximum, so they
+    are stored without any rounding drift.
+    """
+    count = table.vertex_count
+    indices = np.zeros((count, influences), dtype=np.int64)
+    ranks = vertex_ranks(table.verts, table.weights)
+    kept = ranks < influences
+    cells = table.verts[kept].astype(np.int64) * influences + ranks[kept]
+    indices.ravel()[cells] = table.groups[kept]
+
+    numpy_type, scaled = COMPONENT_TYPES[weight_type]
+    if scaled:
+        target = np.dtype(numpy_type)
+        bits = target.itemsize * 8 - (target.kind == "i")
+        weights = np.zeros((count, influences), dtype=np.int64)
+        weights.ravel()[cells] = quantize_levels(table.verts, table.weights, count, bits, kept)[kept]
+    else:
+        weights = np.zeros((count, influences), dtype=np.float32)
+        weights.ravel()[cells] = normalize(table.verts, table.weights, count, kept)[kept]
+    return indices, weights
+
+
+def pack_component(values, component, count):
+    """Convert an (N, C) stream to a component type, padding or dropping columns to ``count``.
+
+    Float input to a normalized type is clipped and scaled to its integer
+    range, integer input is stored as it is. Integers that don't fit the
+    type raise ValueError.
+    """
+    numpy_type, scaled = COMPONENT_TYPES[component]
+    target = np.dtype(numpy_type)
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, None]
+    if values.shape[1] != count:
+        padded = np.zeros((len(values), count), dtype=values.dtype)
+        columns = min(count, values.shape[1])
+        padded[:, :columns] = values[:, :columns]
+        values = padded
+
+    if target.kind == "f":
+        return values.astype(target)
+    limits = np.iinfo(target)
+    if scaled and values.dtype.kind == "f":
+        low = -1.0 if target.kind == "i" else 0.0
+        return np.rint(np.clip(values, low, 1.0) * limits.max).astype(target)
+    if len(values) and (values.min() < limits.min or values.max() > limits.max):
+        raise ValueError(f"Values from {values.min()} to {values.max()} don't fit {component}")
+    return values.astype(target)
+
+
+def pack_vertices(layout, streams, count):
+    """Fill a structured array of ``count`` vertices from per-attribute (N, C) streams.
+
+    Attributes without a stream are left 0.
+    """
+    vertices = np.zeros(count, dtype=layout.dtype)
+    for semantic, component, components in layout.attributes:
+        values = streams.get(semantic)
+        if values is None:
+            continue
+        if layout.flip_v and semantic.startswith("uv"):
+            values = np.column_stack((values[:, 0], 1.0 - values[:, 1]))
+        vertices[semantic] = pack_component(values, component, components)
+    return vertices
+
+
+def weld(vertices):
+    """Merge vertices whose packed bytes are equal.
+
+    Returns the distinct vertices in the order they are first used and
+    the index of every input vertex among them, so an index buffer keeps
+    whatever vertex cache order its triangles already had. Vertices are
+    sorted by a 64-bit hash of their bytes, much faster than NumPy's
+    unique over raw bytes. Rows are still compared exactly, so a hash
+    collision can at worst leave a duplicate vertex, never a wrong one.
+    """
+    count = len(vertices)
+    if count == 0:
+        return vertices, np.zeros(0, dtype=np.int64)
+    size = vertices.dtype.itemsize
+    words = np.zeros((count, -(-size // 8) * 8), dtype=np.uint8)
+    words[:, :size] = np.ascontiguousarray(vertices).view(np.uint8).reshape(count, size)
+    words = words.view("<u8")
+    keys = np.random.default_rng(0x6E616F).integers(1, np.iinfo(np.int64).max, size=words.shape[1],
+                                                    dtype=np.int64).view(np.uint64) | np.uint64(1)
+    hashes = (words * keys).sum(axis=1, dtype=np.uint64)
+    order = np.argsort(hashes)
+    ordered = np.take(words, order, axis=0)
+    new = np.r_[True, np.any(ordered[1:] != ordered[:-1], axis=1)]
+    starts = np.flatnonzero(new)
+    first = np.minimum.reduceat(order, starts)
+    # Number the distinct vertices by first use without sorting again
+    used = np.zeros(count, dtype=bool)
+    used[first] = True
+    rank = (np.cumsum(used) - 1)[first]
+    inverse = np.empty(count, dtype=np.int64)
+    inverse[order] = rank[np.cumsum(new) - 1]
+    first_order = np.flatnonzero(used)
+    rows = np.ascontiguousarray(vertices).view(np.dtype((np.void, size)))
+    return rows[first_order].view(vertices.dtype), inverse
+
+
+def build_buffers(layout, corner_streams, triangles, triangle_groups=None):
+    """Vertex and index buffers of a triangle mesh.
+
+    ``corner_streams`` hold one row per corner (loop) and ``triangles`` the
+    corners of every triangle. Triangles are grouped by ``triangle_groups``
+    (e.g. material indices) with their order kept inside each group.
+    Returns the vertices, the indices and a (group, first index, index
+    count) entry per group.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64)
+    groups = np.zeros(len(triangles), dtype=np.int64) if triangle_groups is None else np.asarray(triangle_groups)
+    order = np.argsort(groups, kind="stable")
+    triangles = triangles[order]
+    groups = groups[order]
+
+    # Pack every corner once and gather whole vertices, rather than gathering each stream before packing
+    corners = triangles.ravel()
+    if corner_streams:
+        corner_count = len(next(iter(corner_streams.values())))
+    else:
+        corner_count = int(corners.max()) + 1 if len(corners) else 0
+    packed = pack_vertices(layout, corner_streams, corner_count)
+    vertices, indices = weld(np.take(packed, corners))
+    index_type = np.dtype(INDEX_TYPES[layout.index_type])
+    if len(vertices) > np.iinfo(index_type).max + 1:
+        raise ValueError(f"{len(vertices)} vertices don't fit {layout.index_type} indices")
+
+    keys, starts = np.unique(groups, return_index=True)
+    ends = np.r_[starts[1:], len(groups)]
+    submeshes = [(int(key), int(start) * 3, int(end - start) * 3)
+                 for key, start, end in zip(keys.tolist(), starts.tolist(), ends.tolist())]
+    return vertices, indices.astype(index_type), submeshes
+
+
+def _padding(size):
+    return b"\x00" * (-size % ALIGNMENT)
+
+
+def write_buffers(path, layout, vertices, indices, **header):
+    """Write a header and the raw vertex and index buffers to ``path`` in one sequential pass.
+
+    The file holds ``MAGIC``, the little-endian uint32 length of a JSON
+    header padded to 16 bytes, then the vertex and index buffers, each
+    starting on a 16 byte boundary. ``header`` adds entries to the JSON
+    header, such as submeshes or bone names. Nothing is copied, the
+    buffers are written straight from the arrays.
+    """
+    vertex_bytes = vertices.nbytes
+    header = dict(header, layout=layout.to_dict(), stride=layout.dtype.itemsize,
+                  vertex_count=len(vertices), index_count=len(indices),
+                  vertex_offset=0, index_offset=vertex_bytes + len(_padding(vertex_bytes)))
+    text = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    text += b" " * (-(len(MAGIC) + 4 + len(text)) % ALIGNMENT)
+    with open(path, "wb") as file:
+        file.writelines((
+            MAGIC, struct.pack("<I", len(text)), text,
+            np.ascontiguousarray(vertices).view(np.uint8), _padding(vertex_bytes),
+            np.ascontiguousarray(indices).view(np.uint8),
+        ))
+
+
+def read_buffers(path):
+    """Read a file written by :func:`write_buffers`.
+
+    Returns the header, its layout, and the vertex and index arrays as
+    views over the bytes read.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a NaoTools vertex buffer file")
+    start = len(MAGIC) + 4
+    length, = struct.unpack_from("<I", data, len(MAGIC))
+    header = json.loads(data[start:start + length])
+    layout = VertexLayout.from_dict(header["layout"])
+    body = start + length
+    vertices = np.frombuffer(data, dtype=layout.dtype, count=header["vertex_count"],
+                             offset=body + header["vertex_offset"])
+    indices = np.frombuffer(data, dtype=INDEX_TYPES[layout.index_type], count=header["index_count"],
+                            offset=body + header["index_offset"])
+    return header, layout, vertices, indices
@@ -0,0 +1,114 @@
+"""Triangle and vertex reordering for post-transform vertex cache locality.
+
+Triangles are reordered with Tipsify (Sander, Nehab and Barczak, "Fast
+Triangle Reordering for Vertex Locality and Reduced Overdraw", 2007),
+then vertices are renumbered in the order the new index buffer first uses
+them. Cache behaviour is measured against a FIFO cache, as ACMR (cache
+misses per triangle) and ATVR (cache misses per vertex, 1.0 at best).
+Nothing in here imports bpy.
+"""
+import numpy as np
+
+
+def fifo_misses(indices, cache_size=32):
+    """Cache misses of an index buffer drawn through a FIFO cache of ``cache_size`` entries."""
+    if len(indices) == 0:
+        return 0
+    stamps = [-cache_size - 1] * (int(indices.max()) + 1)
+    misses = 0
+    for vertex in indices.tolist():
+        if misses - stamps[vertex] > cache_size:
+            stamps[vertex] = misses
+            misses += 1
+    return misses
+
+
+def cache_stats(misses, triangle_count, vertex_count):
+    """ACMR and ATVR for ``misses`` over a mesh of that many triangles and used vertices."""
+    return {
+        "acmr": misses / triangle_count if triangle_count else 0.0,
+        "atvr": misses / vertex_count if vertex_count else 0.0,
+    }
+
+
+def tipsify(triangles, vertex_count, cache_size=32):
+    """Order triangles for a FIFO vertex cache of ``cache_size`` entries.
+
+    Fans around one vertex at a time, moving on to the vertex of the last
+    fan that is most likely to still be cached, or to the most recently
+    used vertex with triangles left when none is. Returns the new triangle
+    order and the cache misses it causes, so the result needs no second
+    simulation.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64)
+    triangle_count = len(triangles)
+    if triangle_count == 0:
+        return np.zeros(0, dtype=np.int64), 0
+
+    corners = triangles.ravel()
+    counts = np.bincount(corners, minlength=vertex_count)
+    starts = np.r_[0, np.cumsum(counts)].tolist()
+    vertex_triangles = (np.argsort(corners, kind="stable") // 3).tolist()
+    triangle_verts = triangles.tolist()
+    live = counts.tolist()
+
+    stamps = [-cache_size - 1] * vertex_count
+    emitted = bytearray(triangle_count)
+    order = []
+    dead_ends = []
+    emit = order.append
+    time = cache_size + 1
+    cursor = 0
+    fan = 0
+    while fan >= 0:
+        candidates = []
+        for triangle in vertex_triangles[starts[fan]:starts[fan + 1]]:
+            if emitted[triangle]:
+                continue
+            emitted[triangle] = 1
+            emit(triangle)
+            verts = triangle_verts[triangle]
+            candidates += verts
+            for vertex in verts:
+                live[vertex] -= 1
+                if time - stamps[vertex] > cache_size:
+                    stamps[vertex] = time
+                    time += 1
+        dead_ends += candidates
+
+        # Next fan: the candidate that stays cached longest while its fan is drawn
+        fan = -1
+        best = -1
+        for vertex in candidates:
+            if live[vertex] > 0:
+                age = time - stamps[vertex]
+                priority = age if age + 2 * live[vertex] <= cache_size else 0
+                if priority > best:
+                    best = priority
+                    fan = vertex
+        if fan == -1:
+            while dead_ends:
+                vertex = dead_ends.pop()
+                if live[vertex] > 0:
+                    fan = vertex
+                    break
+            else:
+                while cursor < vertex_count:
+                    if live[cursor] > 0:
+                        fan = cursor
+                        break
+                    cursor += 1
+
+    return np.asarray(order, dtype=np.int64), time - cache_size - 1
+
+
+def first_use_order(triangles, vertex_count):
+    """Vertex order (new index to old index) in which ``triangles`` first use them.
+
+    Vertices no triangle uses go last, in their original order.
+    """
+    corners = np.asarray(triangles, dtype=np.int64).ravel()
+    used, first_corner = np.unique(corners, return_index=True)
+    first = np.full(vertex_count, len(corners), dtype=np.int64)
+    first[used] = first_corner
+    return np.argsort(first, kind="stable")
@@ -0,0 +1,288 @@
+"""Vectorized vertex-group weight operations.
+
+Weights are stored in a sparse coordinate layout: three parallel arrays
+holding the vertex index, vertex-group index and weight of every
+assignment. Nothing in here imports bpy, so these functions can be run
+and benchmarked outside of Blender.
+"""
+import numpy as np
+
+
+class WeightTable:
+    """Flat vertex-group assignments of one or more meshes."""
+
+    __slots__ = ("verts", "groups", "weights", "vertex_count", "group_count")
+
+    def __init__(self, verts, groups, weights, vertex_count, group_count):
+        self.verts = np.asarray(verts, dtype=np.int32)
+        self.groups = np.asarray(groups, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.vertex_count = int(vertex_count)
+        self.group_count = int(group_count)
+
+    def __len__(self):
+        return len(self.weights)
+
+    @classmethod
+    def from_counts(cls, counts, groups, weights, group_count):
+        """Build a table from per-vertex assignment counts, as read vertex by vertex."""
+        counts = np.asarray(counts, dtype=np.int32)
+        verts = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+        return cls(verts, groups, weights, len(counts), group_count)
+
+    @classmethod
+    def concatenate(cls, tables):
+        """Stack several tables into one, offsetting vertex and group indices.
+
+        Returns the combined table and the entry offsets needed by :meth:`split`.
+        """
+        vert_offset = 0
+        group_offset = 0
+        verts, groups, weights, offsets = [], [], [], [0]
+        for table in tables:
+            verts.append(table.verts + vert_offset)
+            groups.append(table.groups + group_offset)
+            weights.append(table.weights)
+            offsets.append(offsets[-1] + len(table))
+            vert_offset += table.vertex_count
+            group_offset += table.group_count
+        if not tables:
+            return cls([], [], [], 0, 0), np.zeros(1, dtype=np.int64)
+        combined = cls(np.concatenate(verts), np.concatenate(groups), np.concatenate(weights),
+                       vert_offset, group_offset)
+        return combined, np.asarray(offsets, dtype=np.int64)
+
+
+def subset(table, verts):
+    """Restrict a table to the sorted vertex ids ``verts``, renumbering them from 0."""
+    vert_map = np.full(table.vertex_count, -1, dtype=np.int64)
+    vert_map[verts] = np.arange(len(verts))
+    new_verts = vert_map[table.verts]
+    mask = new_verts >= 0
+    return WeightTable(new_verts[mask], table.groups[mask], table.weights[mask], len(verts), table.group_count)
+
+
+def split(array, offsets):
+    """Split a per-entry array of a concatenated table back into per-table views."""
+    return [array[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def interpolate_weights(table, corner_verts, corner_weights):
+    """Blend the weights of source vertices into a table of new points.
+
+    Point ``i`` gets ``corner_weights[i, k]`` times the weights of source
+    vertex ``corner_verts[i, k]`` for every ``k``, such as the corners of a
+    hit triangle and their barycentric weights. Each source entry is
+    expanded once per corner it feeds and the (point, group) duplicates
+    are summed after one sort, so no per-point Python runs. Returns a table
+    with one vertex per point and the source's groups.
+    """
+    point_count, width = corner_verts.shape
+    verts = np.asarray(corner_verts, dtype=np.int64).ravel()
+    blend = np.asarray(corner_weights, dtype=np.float32).ravel()
+    points = np.repeat(np.arange(point_count, dtype=np.int64), width)
+    live = blend > 0.0
+    verts, blend, points = verts[live], blend[live], points[live]
+
+    order = np.argsort(table.verts, kind="stable")
+    counts = np.bincount(table.verts, minlength=table.vertex_count)
+    starts = np.cumsum(counts) - counts
+    per_corner = counts[verts]
+    offsets = np.arange(int(per_corner.sum())) - np.repeat(np.cumsum(per_corner) - per_corner, per_corner)
+    entries = order[np.repeat(starts[verts], per_corner) + offsets]
+
+    stride = max(table.group_count, 1)
+    keys = np.repeat(points, per_corner) * stride + table.groups[entries]
+    values = table.weights[entries] * np.repeat(blend, per_corner)
+    key_order = np.argsort(keys)
+    keys = keys[key_order]
+    if len(keys) == 0:
+        return WeightTable([], [], [], point_count, table.group_count)
+    run_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sums = np.add.reduceat(values[key_order], run_starts)
+    keys = keys[run_starts]
+    return WeightTable(keys // stride, keys % stride, sums, point_count, table.group_count)
+
+
+def vertex_ranks(verts, weights):
+    """Rank each entry within its vertex, 0 being the heaviest influence.
+
+    Ties keep their original order, matching Blender's stable sort. Entries
+    are laid out in a vertex by max-influences grid so only the short rows
+    get sorted, falling back to a full lexsort when a few vertices with a
+    lot of influences would make the grid too sparse.
+    """
+    count = len(verts)
+    if count == 0:
+        return np.zeros(0, dtype=np.int32)
+    order = np.argsort(verts, kind="stable")
+    sorted_verts = verts[order]
+    starts = np.flatnonzero(np.r_[True, sorted_verts[1:] != sorted_verts[:-1]])
+    lengths = np.diff(np.r_[starts, count])
+    width = int(lengths.max())
+    ranks = np.empty(count, dtype=np.int32)
+    if len(starts) * width > 4 * count:
+        order = np.lexsort((-weights, verts))
+        ranks[order] = np.arange(count) - np.repeat(starts, lengths)
+        return ranks
+
+    cells = np.arange(count) + np.repeat(np.arange(len(starts)) * width - starts, lengths)
+    grid = np.full(len(starts) * width, np.inf, dtype=np.result_type(weights, np.float32))
+    grid[cells] = -weights[order]
+    grid_order = np.argsort(grid.reshape(-1, width), axis=1, kind="stable")
+    grid_ranks = np.empty_like(grid_order)
+    np.put_along_axis(grid_ranks, grid_order, np.arange(width)[None, :], axis=1)
+    ranks[order] = grid_ranks.ravel()[cells]
+    return ranks
+
+
+def vertex_totals(verts, weights, vertex_count, mask=None):
+    """Sum the weights of every vertex, optionally over the masked entries only."""
+    if mask is not None:
+        verts = verts[mask]
+        weights = weights[mask]
+    # bincount gives ints on empty input, which the in-place divisions below can't take
+    return np.bincount(verts, weights=weights, minlength=vertex_count).astype(np.float64, copy=False)
+
+
+def _split_locked(mask, locked):
+    """Entries that get rescaled and entries that keep their weight, both limited to ``mask``."""
+    if locked is None:
+        return mask, None
+    free = ~locked if mask is None else mask & ~locked
+    fixed = locked if mask is None else mask & locked
+    return free, fixed
+
+
+def normalize(verts, weights, vertex_count, mask=None, locked=None):
+    """Scale weights so every vertex sums to 1.
+
+    Entries outside ``mask`` are ignored and come back as 0. ``locked``
+    entries keep their weight and the others share what the locked ones
+    leave of 1, nothing once they reach it, as Blender's Normalize All does
+    with locked groups. Vertices whose free weights sum to 0 are left
+    untouched.
+    """
+    free, fixed = _split_locked(mask, locked)
+    totals = vertex_totals(verts, weights, vertex_count, free)
+    target = 1.0 if fixed is None else np.maximum(1.0 - vertex_totals(verts, weights, vertex_count, fixed), 0.0)
+    scale = np.ones_like(totals)
+    np.divide(target, totals, out=scale, where=totals > 0.0)
+    result = (weights * scale[verts]).astype(np.float32)
+    if fixed is not None:
+        result[fixed] = weights[fixed]
+    if mask is not None:
+        result[~mask] = 0.0
+    return result
+
+
+def quantize_levels(verts, weights, vertex_count, bits=8, mask=None, locked=None):
+    """Normalize weights straight to integer levels that sum to ``2 ** bits - 1`` per vertex.
+
+    Each weight is scaled and rounded down, then the levels still missing
+    from every vertex's total go to its entries with the largest remainders.
+    ``locked`` entries are rounded on their own and the others share the
+    levels they leave. Entries outside ``mask`` and vertices whose free
+    weights sum to 0 get 0, apart from their locked entries.
+    """
+    full = (1 << bits) - 1
+    free, fixed = _split_locked(mask, locked)
+    totals = vertex_totals(verts, weights, vertex_count, free)
+    target = np.full(vertex_count, full, dtype=np.int64)
+    if fixed is not None:
+        fixed_levels = np.where(fixed, np.rint(weights.astype(np.float64) * full), 0.0).astype(np.int64)
+        target = np.maximum(target - np.bincount(verts, weights=fixed_levels, minlength=vertex_count).astype(np.int64), 0)
+    scale = np.zeros_like(totals)
+    np.divide(target, totals, out=scale, where=totals > 0.0)
+    scaled = weights.astype(np.float64) * scale[verts]
+    if free is not None:
+        scaled[~free] = 0.0
+    levels = np.floor(scaled)
+    remainders = scaled - levels
+    levels = levels.astype(np.int64)
+    missing = np.where(totals > 0.0, target, 0) - np.bincount(verts, weights=levels, minlength=vertex_count).astype(np.int64)
+    if free is not None:
+        remainders[~free] = -1.0
+    levels += vertex_ranks(verts, remainders) < missing[verts]
+    if fixed is not None:
+        levels[fixed] = fixed_levels[fixed]
+    return levels
+
+
+def quantize(verts, weights, vertex_count, bits=8, mask=None, locked=None):
+    """Normalize weights to the nearest values a ``bits`` deep integer format stores exactly.
+
+    Every vertex sums exactly to 1 once quantized, see :func:`quantize_levels`.
+    """
+    levels = quantize_levels(verts, weights, vertex_count, bits, mask, locked)
+    return (levels / ((1 << bits) - 1)).astype(np.float32)
+
+
+def limit_total(table, limit, renormalize=True):
+    """Keep the ``limit`` heaviest influences of every vertex.
+
+    Returns a boolean mask of the surviving entries and the new weight of
+    every entry, both in the table's original order.
+    """
+    keep = vertex_ranks(table.verts, table.weights) < limit
+    if renormalize:
+        weights = normalize(table.verts, table.weights, table.vertex_count, keep)
+    else:
+        weights = np.where(keep, table.weights, 0.0).astype(np.float32)
+    return keep, weights
+
+
+def used_groups(table, threshold=0.0):
+    """Flag the vertex groups referenced by at least one weight of ``threshold`` or more."""
+    used = np.zeros(table.group_count, dtype=bool)
+    if threshold > 0.0:
+        used[table.groups[table.weights >= threshold]] = True
+    else:
+        used[table.groups] = True
+    return used
+
+
+def tile(table, count):
+    """Repeat a table for ``count`` back to back copies of its mesh."""
+    offsets = np.repeat(np.arange(count, dtype=np.int32) * table.vertex_count, len(table))
+    return WeightTable(np.tile(table.verts, count) + offsets, np.tile(table.groups, count),
+                       np.tile(table.weights, count), table.vertex_count * count, table.group_count)
+
+
+# Recipe steps that only touch weights and can run together in one pass
+WEIGHT_STEPS = ("limit_weights", "normalize", "quantize_weights", "clear_unused_weights")
+
+
+def run_weight_steps(table, steps, locked=None):
+    """Run a sequence of weight steps on a table without writing anything back in between.
+
+    ``steps`` is a list of (name, options) pairs using the names in
+    WEIGHT_STEPS. ``locked`` marks entries the steps keep as they are:
+    limit never drops them and normalize and quantize leave their weight.
+    Returns the mask of surviving entries, the final
+    weight of every entry and a mask of the vertex groups left unused.
+    """
+    keep = np.ones(len(table), dtype=bool)
+    weights = table.weights.copy()
+    unused = np.zeros(table.group_count, dtype=bool)
+    for name, options in steps:
+        if name == "limit_weights":
+            ranked = np.where(keep, weights, -1.0)
+            if locked is not None:
+                # Locked entries rank first, so they are the last thing a limit drops
+                ranked[keep & locked] = np.inf
+            keep &= vertex_ranks(table.verts, ranked) < options.get("limit", 4)
+            if options.get("normalize", True):
+                weights = normalize(table.verts, weights, table.vertex_count, keep, locked)
+        elif name == "normalize":
+            weights = normalize(table.verts, weights, table.vertex_count, keep, locked)
+        elif name == "quantize_weights":
+            weights = quantize(table.verts, weights, table.vertex_count, options.get("bits", 8), keep, locked)
+        elif name == "clear_unused_weights":
+            kept = WeightTable(table.verts[keep], table.groups[keep], weights[keep],
+                               table.vertex_count, table.group_count)
+            unused |= ~used_groups(kept, options.get("threshold", 0.0))
+        else:
+            raise ValueError(f"'{name}' is not a weight step")
+    weights[~keep] = 0.0
+    return keep, weights, unused
@@ -1,67 +1,172 @@
 import bpy
+import numpy as np
+
+from ..core.fingerprint import array_fingerprint
+from ..core.normals import normalize_rows
+from ..core.transfer import (auto_resolution, dilate, interpolate_triangles, rasterize,
+                             sample_bilinear, transform_normals)
+from .mesh_io import read_loop_normals, read_loop_triangles, read_uvs, set_custom_normals
+from .profiling import phase
+from .surface_query import loop_query_points, source_surface
+from .vertex_colors_to_normals import vertex_colors_to_normals
+
+# Rasterized UV grids and baked source images, keyed by source object pointer
+# and image name. Entries are reused while the source fingerprint matches.
+_grid_cache = {}
+_baked_sources = {}
+
+
+def read_world_normals(obj, depsgraph):
+    """Read the evaluated loop normals, UVs and triangles of ``obj`` with normals in world space."""
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        uvs = read_uvs(mesh)
+        normals = read_loop_normals(mesh)
+        triangles = read_loop_triangles(mesh)
+    finally:
+        evaluated.to_mesh_clear()
+    return uvs, transform_normals(normals, np.array(obj.matrix_world.to_3x3())), triangles
+
+
+def source_fingerprint(uvs, normals, triangles):
+    return array_fingerprint(uvs if uvs is not None else np.zeros(0), normals, triangles)
+
+
+def to_object_normals(obj, normals):
+    """Bring world space normals into the object space of ``obj``."""
+    return transform_normals(normals, np.array(obj.matrix_world.inverted().to_3x3()))
+
+
+def source_grid(obj, depsgraph, resolution):
+    """Return the rasterized UV normal grid of a source, reusing it while the source is unchanged."""
+    uvs, normals, triangles = read_world_normals(obj, depsgraph)
+    if uvs is None:
+        return None
+    if resolution <= 0:
+        resolution = auto_resolution(uvs, triangles)
+    fingerprint = (source_fingerprint(uvs, normals, triangles), resolution)
+
+    key = obj.as_pointer()
+    cached = _grid_cache.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    grid, covered = rasterize(uvs, normals, triangles, resolution)
+    grid, _covered = dilate(grid, covered)
+    _grid_cache[key] = (fingerprint, grid)
+    return grid
+
+
+def clear_bake_cache():
+    _grid_cache.clear()
+    _baked_sources.clear()
+
 
 class NaoBakeNormalsWorkflowOperator(bpy.types.Operator):
     bl_idname = "wm.nao_bake_normals_workflow_operator"
     bl_label = "Transfer Normals (Bake)"
-    bl_description = "Click 2 meshes, the first will have it's normals converted to a texture, the second will be baking that to the normals. This is NOT a normal map, its taking actual normals from a model. Assuming the uvs are 1:1, the normals should roughly be 1:1."
+    bl_description = "Click 2 meshes, the first will have it's normals converted to a texture, the second will be baking that to the normals. This is NOT a normal map, its taking actual normals from a model. Assuming the uvs are 1:1, the normals should roughly be 1:1. Set a Transfer Source to send one mesh's normals to every other selected mesh."
     bl_options = {'REGISTER', 'UNDO'}
 
-    def execute(self, context):
-        # 1. Validation
-        selected = context.selected_objects
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=[
+            ('BAKE', "Cycles Bake", "Bake the source normals to an image and back into vertex colors with Cycles"),
+            ('UV', "UV Transfer", "Rasterize the source normals in UV space and sample them directly, no render engine needed"),
+            ('SPATIAL', "Nearest Surface", "Take the normals of the closest point on the source surface, UVs don't need to match"),
+        ],
+        default='BAKE'
+    )
+
+    def pick_meshes(self, context):
+        """Return the source and target meshes, or None after reporting what is wrong.
+
+        Selected objects that aren't meshes, such as the armature of a rig,
+        are ignored.
+        """
+        selected = [obj for obj in context.selected_objects if obj.type == 'MESH']
         active = context.active_object
-        
-        if len(selected) != 2:
-            self.report({'ERROR'}, "Please select exactly 2 meshes.")
-            return {'CANCELLED'}
-        
-        if not active or active not in selected:
-            self.report({'ERROR'}, "One object must be Active.")
+        source_mesh = context.scene.nao_props.transfer_source
+
+        if source_mesh is not None:
+            if source_mesh.type != 'MESH':
+                self.report({'ERROR'}, "The Transfer Source must be a mesh.")
+                return None
+            target_meshes = [obj for obj in selected if obj != source_mesh]
+            if not target_meshes:
+                self.report({'ERROR'}, "Please select at least one mesh to transfer to.")
+                return None
+        else:
+            if len(selected) != 2:
+                self.report({'ERROR'}, "Please select exactly 2 meshes, or set a Transfer Source.")
+                return None
+
+            if not active or active not in selected:
+                self.report({'ERROR'}, "One of the meshes must be Active.")
+                return None
+
+            target_meshes = [active]
+            source_mesh = [obj for obj in selected if obj != active][0]
+        return source_mesh, target_meshes
+
+    def transfer_uv(self, context, source_mesh, target_meshes):
+        with phase("source grid"):
+            grid = source_grid(source_mesh, context.evaluated_depsgraph_get(), context.scene.nao_props.transfer_resolution)
+        if grid is None:
+            self.report({'ERROR'}, "The source mesh needs a UV map.")
             return {'CANCELLED'}
-            
-        target_mesh = active
-        source_mesh = [obj for obj in selected if obj != active][0]
-        
-        if target_mesh.type != 'MESH' or source_mesh.type != 'MESH':
-            self.report({'ERROR'}, "Both objects must be Meshes.")
+
+        skipped = 0
+        for target_mesh in target_meshes:
+            target_uvs = read_uvs(target_mesh.data)
+            if target_uvs is None:
+                skipped += 1
+                continue
+            with phase(f"sample {target_mesh.name}"):
+                normals = normalize_rows(sample_bilinear(grid, target_uvs).astype(np.float32))
+                set_custom_normals(target_mesh.data, to_object_normals(target_mesh, normals))
+
+        if skipped:
+            self.report({'WARNING'}, f"Skipped {skipped} mesh(es) without a UV map.")
+        else:
+            self.report({'INFO'}, "Normal Transfer Complete.")
+        return {'FINISHED'}
+
+    def transfer_spatial(self, context, source_mesh, target_meshes):
+        with phase("source surface"):
+            surface = source_surface(source_mesh, context.evaluated_depsgraph_get())
+        if len(surface.tri_verts) == 0:
+            self.report({'ERROR'}, "The source mesh has no faces to transfer from.")
             return {'CANCELLED'}
+        corner_normals = surface.loop_normals[surface.tri_loops]
 
-        # 2. Stash Settings
-        scene = context.scene
-        stashed_settings = {}
-        stashed_materials = {}
-        
-        try:
-            stashed_settings['engine'] = scene.render.engine
-            stashed_settings['samples'] = scene.cycles.samples
-            stashed_settings['preview_samples'] = scene.cycles.preview_samples
-            stashed_settings['adaptive'] = scene.cycles.use_adaptive_sampling
-            stashed_settings['denoise'] = scene.cycles.use_denoising
-            
-            stashed_settings['bake_type'] = scene.cycles.bake_type
-            stashed_settings['bake_target'] = scene.render.bake.target
-            stashed_settings['bake_margin'] = scene.render.bake.margin
-            
-            stashed_materials[source_mesh.name] = source_mesh.data.materials[0] if source_mesh.data.materials else None
-            stashed_materials[target_mesh.name] = target_mesh.data.materials[0] if target_mesh.data.materials else None
-        except Exception:
-            pass 
+        for target_mesh in target_meshes:
+            with phase(f"query {target_mesh.name}"):
+                points = loop_query_points(target_mesh)
+                locations, faces = surface.nearest(points)
+            with phase(f"interpolate {target_mesh.name}"):
+                hit = faces >= 0
+                normals = np.zeros((len(points), 3), dtype=np.float32)
+                normals[hit] = interpolate_triangles(locations[hit], faces[hit], surface.coords,
+                                                     surface.tri_verts, corner_normals)
+                normals = to_object_normals(target_mesh, normalize_rows(normals))
+                set_custom_normals(target_mesh.data, normals)
 
-        # 3. Apply Low Specs
-        scene.render.engine = 'CYCLES'
-        scene.cycles.use_preview_adaptive_sampling = False
-        scene.cycles.preview_samples = 1
-        scene.cycles.use_preview_denoising = False
-        scene.cycles.use_adaptive_sampling = False
-        scene.cycles.samples = 1
-        scene.cycles.use_denoising = False
+        self.report({'INFO'}, "Normal Transfer Complete.")
+        return {'FINISHED'}
+
+    def bake_source(self, context, source_mesh, img_name):
+        """Bake the source normals into ``img_name`` unless an up to date bake already exists."""
+        uvs, normals, triangles = read_world_normals(source_mesh, context.evaluated_depsgraph_get())
+        fingerprint = source_fingerprint(uvs, normals, triangles)
+        if img_name in bpy.data.images and _baked_sources.get(img_name) == fingerprint:
+            return bpy.data.images[img_name]
 
-        # 4. Process Mesh 1 (Source) -> Bake Map Range
+        scene = context.scene
         bpy.ops.object.select_all(action='DESELECT')
         source_mesh.select_set(True)
         context.view_layer.objects.active = source_mesh
-        
-        img_name = f"Bake_Result_MapRange_{source_mesh.name}"
+
         if img_name in bpy.data.images:
             bpy.data.images.remove(bpy.data.images[img_name])
         bake_image = bpy.data.images.new(img_name, width=2048, height=2048)
@@ -85,6 +190,7 @@ class NaoBakeNormalsWorkflowOperator(bpy.types.Operator):
         links.new(geo_node.outputs['Normal'], map_node.inputs['Vector'])
         links.new(map_node.outputs['Vector'], out_node.inputs['Surface'])
         
+        stashed_materials = list(source_mesh.data.materials)
         source_mesh.data.materials.clear()
         source_mesh.data.materials.append(mat)
 
@@ -100,7 +206,17 @@ class NaoBakeNormalsWorkflowOperator(bpy.types.Operator):
         if len(bake_image.pixels) > 0:
             bake_image.pixels[0] = bake_image.pixels[0]
 
-        # 5. Process Mesh 2 (Target) -> Bake to Vertex Colors
+        source_mesh.data.materials.clear()
+        for material in stashed_materials:
+            source_mesh.data.materials.append(material)
+        bpy.data.materials.remove(mat)
+
+        _baked_sources[img_name] = fingerprint
+        return bake_image
+
+    def bake_target(self, context, target_mesh, bake_image):
+        """Bake the source image into a temporary color layer of the target and turn it into normals."""
+        scene = context.scene
         bpy.ops.object.select_all(action='DESELECT')
         target_mesh.select_set(True)
         context.view_layer.objects.active = target_mesh
@@ -122,7 +238,7 @@ class NaoBakeNormalsWorkflowOperator(bpy.types.Operator):
             target_mesh.data.color_attributes.remove(target_mesh.data.color_attributes[temp_layer_name])
 
         # Create new temporary layer
-        target_mesh.data.color_attributes.new(name=temp_layer_name, type='BYTE_COLOR', domain='CORNER')
+        temp_layer = target_mesh.data.color_attributes.new(name=temp_layer_name, type='BYTE_COLOR', domain='CORNER')
 
         # Set the new temporary layer as active
         for i, layer in enumerate(target_mesh.data.color_attributes):
@@ -147,6 +263,7 @@ class NaoBakeNormalsWorkflowOperator(bpy.types.Operator):
         links_t.new(tex_node_t.outputs['Color'], emit_node.inputs['Color'])
         links_t.new(emit_node.outputs['Emission'], out_node_t.inputs['Surface'])
         
+        stashed_materials = list(target_mesh.data.materials)
         target_mesh.data.materials.clear()
         target_mesh.data.materials.append(mat_target)
         
@@ -157,27 +274,14 @@ class NaoBakeNormalsWorkflowOperator(bpy.types.Operator):
         bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
         bpy.ops.object.bake(type='EMIT')
 
-        # 6. Restoration
-        source_mesh.data.materials.clear()
-        if stashed_materials.get(source_mesh.name):
-            source_mesh.data.materials.append(stashed_materials[source_mesh.name])
-
         target_mesh.data.materials.clear()
-        if stashed_materials.get(target_mesh.name):
-            target_mesh.data.materials.append(stashed_materials[target_mesh.name])
-
-        try:
-            scene.render.engine = stashed_settings.get('engine', 'CYCLES')
-            scene.cycles.samples = stashed_settings.get('samples', 128)
-            scene.cycles.bake_type = stashed_settings.get('bake_type', 'COMBINED')
-            scene.render.bake.target = stashed_settings.get('bake_target', 'IMAGE_TEXTURES')
-        except Exception:
-            pass
+        for material in stashed_materials:
+            target_mesh.data.materials.append(material)
+        bpy.data.materials.remove(mat_target)
 
-        # 7. Final Step: Convert Vertex Colors to Normals (Logic Chain)
-        # Ensure target is active
-        context.view_layer.objects.active = target_mesh
-        bpy.ops.wm.nao_vertex_colors_to_normals_operator()
+        # Convert Vertex Colors to Normals (Logic Chain)
+        temp_layer = target_mesh.data.color_attributes[temp_layer_name]
+        vertex_colors_to_normals(target_mesh.data, temp_layer, 'CORNER', True)
 
         # --- MODIFICATION START: Cleanup ---
         # Remove the temporary layer
@@ -189,5 +293,66 @@ class NaoBakeNormalsWorkflowOperator(bpy.types.Operator):
             target_mesh.data.color_attributes.active_color_index = original_active_index
         # --- MODIFICATION END ---
 
+    def execute(self, context):
+        # 1. Validation
+        meshes = self.pick_meshes(context)
+        if meshes is None:
+            return {'CANCELLED'}
+        source_mesh, target_meshes = meshes
+
+        if self.mode == 'UV':
+            return self.transfer_uv(context, source_mesh, target_meshes)
+        if self.mode == 'SPATIAL':
+            return self.transfer_spatial(context, source_mesh, target_meshes)
+
+        # 2. Stash Settings
+        scene = context.scene
+        stashed_settings = {}
+        
+        try:
+            stashed_settings['engine'] = scene.render.engine
+            stashed_settings['samples'] = scene.cycles.samples
+            stashed_settings['preview_samples'] = scene.cycles.preview_samples
+            stashed_settings['adaptive'] = scene.cycles.use_adaptive_sampling
+            stashed_settings['denoise'] = scene.cycles.use_denoising
+            
+            stashed_settings['bake_type'] = scene.cycles.bake_type
+            stashed_settings['bake_target'] = scene.render.bake.target
+            stashed_settings['bake_margin'] = scene.render.bake.margin
+        except Exception:
+            pass 
+
+        # 3. Apply Low Specs
+        scene.render.engine = 'CYCLES'
+        scene.cycles.use_preview_adaptive_sampling = False
+        scene.cycles.preview_samples = 1
+        scene.cycles.use_preview_denoising = False
+        scene.cycles.use_adaptive_sampling = False
+        scene.cycles.samples = 1
+        scene.cycles.use_denoising = False
+
+        # 4. Process Mesh 1 (Source) -> Bake Map Range, once for every target
+        with phase("source bake"):
+            bake_image = self.bake_source(context, source_mesh, f"Bake_Result_MapRange_{source_mesh.name}")
+
+        # 5. Process Targets -> Bake to Vertex Colors -> Normals
+        for target_mesh in target_meshes:
+            with phase(f"target bake {target_mesh.name}"):
+                self.bake_target(context, target_mesh, bake_image)
+
+        # 6. Restoration
+        try:
+            scene.render.engine = stashed_settings.get('engine', 'CYCLES')
+            scene.cycles.samples = stashed_settings.get('samples', 128)
+            scene.cycles.bake_type = stashed_settings.get('bake_type', 'COMBINED')
+            scene.render.bake.target = stashed_settings.get('bake_target', 'IMAGE_TEXTURES')
+        except Exception:
+            pass
+
+        bpy.ops.object.select_all(action='DESELECT')
+        for target_mesh in target_meshes:
+            target_mesh.select_set(True)
+        context.view_layer.objects.active = target_meshes[-1]
+
         self.report({'INFO'}, "Normal Transfer & Conversion Complete.")
         return {'FINISHED'}
@@ -0,0 +1,102 @@
+import bpy
+from bpy.app.handlers import persistent
+
+# Operation name -> {mesh pointer: fingerprint} of the meshes it processed and that haven't changed since
+_clean = {}
+# Meshes a NaoTools operator just wrote, so the depsgraph update that follows isn't an edit.
+# Each entry is consumed by that update, any later update of the mesh is an edit again.
+_pending = set()
+
+
+def quick_fingerprint(obj):
+    """Cheap fingerprint of a mesh object's data: element counts plus vertex group and UV map names.
+
+    It doesn't see edits on its own, those come from the depsgraph handler,
+    but catches a pointer that now belongs to different mesh data.
+    """
+    mesh = obj.data
+    return (mesh.name_full, len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons),
+            tuple(group.name for group in obj.vertex_groups), tuple(layer.name for layer in mesh.uv_layers))
+
+
+def changed_objects(operation, objects):
+    """Mesh objects that changed, or were never processed, since ``operation`` last ran on them."""
+    clean = _clean.get(operation, {})
+    return [obj for obj in objects
+            if obj.type == 'MESH' and clean.get(obj.data.as_pointer()) != quick_fingerprint(obj)]
+
+
+def mark_clean(operation, objects):
+    """Record that ``operation`` processed ``objects``, which invalidates them for every other operation."""
+    clean = _clean.setdefault(operation, {})
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        key = obj.data.as_pointer()
+        for other, entries in _clean.items():
+            if other != operation:
+                entries.pop(key, None)
+        clean[key] = quick_fingerprint(obj)
+        _pending.add(key)
+    if _pending and not bpy.app.timers.is_registered(_clear_pending):
+        # Timers run after the depsgraph update that follows the operator, this
+        # only drops the writes that didn't cause one
+        bpy.app.timers.register(_clear_pending, first_interval=0.0)
+
+
+def _clear_pending():
+    _pending.clear()
+    return None
+
+
+def mark_dirty(key):
+    for entries in _clean.values():
+        entries.pop(key, None)
+
+
+@persistent
+def track_changes(scene, depsgraph):
+    written = set()
+    for update in depsgraph.updates:
+        data = update.id.original
+        if isinstance(data, bpy.types.Object):
+            if data.type != 'MESH' or not update.is_updated_geometry:
+                continue
+            data = data.data
+        elif not isinstance(data, bpy.types.Mesh):
+            continue
+        key = data.as_pointer()
+        if key in _pending:
+            written.add(key)
+        else:
+            mark_dirty(key)
+    # The object and its mesh can both show up in one update, so consume them afterwards
+    _pending.difference_update(written)
+
+
+@persistent
+def reset_changes(*args):
+    """Forget everything, undo and file loads swap the mesh data out from under the pointers."""
+    _clean.clear()
+    _pending.clear()
+
+
+HANDLERS = (
+    (bpy.app.handlers.depsgraph_update_post, track_changes),
+    (bpy.app.handlers.undo_post, reset_changes),
+    (bpy.app.handlers.redo_post, reset_changes),
+    (bpy.app.handlers.load_post, reset_changes),
+)
+
+
+def register_handlers():
+    for handlers, handler in HANDLERS:
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def unregister_handlers():
+    for handlers, handler in HANDLERS:
+        if handler in handlers:
+            handlers.remove(handler)
+    reset_changes()
@@ -1,33 +1,67 @@
 import bpy
+import time
+import numpy as np
+
+from ..core.weights import used_groups
+from .weight_io import ensure_object_mode, read_weights
+
+
+def clear_unused_groups(obj, threshold=0.0):
+    """Remove the vertex groups of ``obj`` that no vertex is weighted to.
+
+    Weights below ``threshold`` don't count as a use. Returns a stats dict
+    with the number of groups before and after and the time taken.
+    """
+    start = time.perf_counter()
+    group_count = len(obj.vertex_groups)
+    used = used_groups(read_weights(obj), threshold)
+    unused = np.flatnonzero(~used).tolist()
+
+    # Remove from the back so the remaining indices stay valid
+    for index in reversed(unused):
+        obj.vertex_groups.remove(obj.vertex_groups[index])
+
+    return {
+        "object": obj.name,
+        "groups": group_count,
+        "removed": len(unused),
+        "seconds": time.perf_counter() - start,
+    }
+
 
 class NaoClearUnusedWeightsOperator(bpy.types.Operator):
     bl_idname = "wm.nao_clear_unused_weights_operator"
     bl_label = "Clear Unused Weights"
     bl_options = {'REGISTER', 'UNDO'}
 
+    threshold: bpy.props.FloatProperty(
+        name="Threshold",
+        description="Weights below this value don't count as using a vertex group",
+        default=0.0,
+        min=0.0,
+        max=1.0
+    )
+    batch: bpy.props.BoolProperty(
+        name="All Selected",
+        description="Clean every selected mesh instead of only the active one",
+        default=False
+    )
+
     def execute(self, context):
-        obj = context.active_object
-        if obj and obj.type == 'MESH':
-            vertex_groups = obj.vertex_groups[:]
-            groups_to_remove = []
-
-            for group in vertex_groups:
-                is_used = False
-                for vertex in obj.data.vertices:
-                    for group_info in vertex.groups:
-                        if group_info.group == group.index:
-                            is_used = True
-                            break
-                    if is_used:
-                        break
-                if not is_used:
-                    groups_to_remove.append(group.name)
-
-            for group_name in groups_to_remove:
-                obj.vertex_groups.remove(obj.vertex_groups[group_name])
-
-            self.report({'INFO'}, f"Removed {len(groups_to_remove)} unused vertex groups.")
-            return {'FINISHED'}
+        if self.batch:
+            objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
         else:
+            obj = context.active_object
+            objects = [obj] if obj and obj.type == 'MESH' else []
+
+        if not objects:
             self.report({'WARNING'}, "Please select a mesh object.")
             return {'CANCELLED'}
+
+        ensure_object_mode(context)
+        stats = [clear_unused_groups(obj, self.threshold) for obj in objects]
+
+        removed = sum(entry["removed"] for entry in stats)
+        seconds = sum(entry["seconds"] for entry in stats)
+        self.report({'INFO'}, f"Removed {removed} unused vertex groups from {len(stats)} mesh(es) in {seconds:.2f}s.")
+        return {'FINISHED'}
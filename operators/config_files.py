@@ -0,0 +1,24 @@
+import bpy
+import os
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def user_config_directory(subdir, create=False):
+    """Directory of the user's own JSON files in Blender's config folder.
+
+    Only pass ``create`` when about to save one, enum item callbacks run
+    on every redraw and shouldn't touch the disk.
+    """
+    return bpy.utils.user_resource('CONFIG', path=subdir, create=create)
+
+
+def config_files(subdir, builtin_dir):
+    """Map JSON file stems to paths, the user's files overriding the built-in ones."""
+    files = {}
+    for directory in (builtin_dir, user_config_directory(subdir)):
+        if directory and os.path.isdir(directory):
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith(".json"):
+                    files[filename[:-5]] = os.path.join(directory, filename)
+    return files
@@ -0,0 +1,202 @@
+import bpy
+import hashlib
+import re
+import numpy as np
+
+from ..core.partition import merge_slots
+from .mesh_io import read_array
+from .profiling import phase
+
+# Properties every node, material or ID has that say nothing about shading
+NODE_SKIP = frozenset(prop.identifier for prop in bpy.types.Node.bl_rna.properties) - {"mute"}
+MATERIAL_SKIP = frozenset(prop.identifier for prop in bpy.types.ID.bl_rna.properties) | {"node_tree", "preview"}
+SCALAR_TYPES = {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}
+DUPLICATE_SUFFIX = re.compile(r"\.\d{3,}$")
+
+
+def plain(value):
+    """RNA value as nested tuples of rounded floats, ints and strings."""
+    if isinstance(value, float):
+        return round(value, 5)
+    if isinstance(value, (bool, int, str)) or value is None:
+        return value
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    return tuple(plain(item) for item in value)
+
+
+def image_signature(image):
+    return ("image", image.filepath_raw or image.name, image.source, image.colorspace_settings.name)
+
+
+def rna_signature(struct, skip, trees, visited=None):
+    """Shading-relevant properties of an RNA struct, nested structs included.
+
+    Nested structs are walked all the way down, so curve points and color
+    ramp elements count. ``visited`` holds the pointers of the structs
+    being walked, a struct pointing back at one of them is cut short.
+    Nodes, sockets and links are compared by name, the tree signature
+    already covers them.
+    """
+    if visited is None:
+        visited = set()
+    key = struct.as_pointer()
+    visited.add(key)
+    entries = []
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in skip or identifier == "rna_type":
+            continue
+        value = getattr(struct, identifier, None)
+        if prop.type in SCALAR_TYPES:
+            entries.append((identifier, plain(value)))
+        elif prop.type == 'POINTER':
+            entries.append((identifier, pointer_signature(value, trees, visited)))
+        elif prop.type == 'COLLECTION':
+            entries.append((identifier, tuple(pointer_signature(item, trees, visited) for item in value)))
+    visited.discard(key)
+    return tuple(entries)
+
+
+def pointer_signature(value, trees, visited):
+    if value is None:
+        return None
+    if isinstance(value, bpy.types.Image):
+        return image_signature(value)
+    if isinstance(value, bpy.types.NodeTree):
+        return tree_signature(value, trees)
+    if isinstance(value, bpy.types.ID):
+        return ("id", value.name)
+    if isinstance(value, (bpy.types.Node, bpy.types.NodeSocket, bpy.types.NodeLink)):
+        return ("node", value.name)
+    if value.as_pointer() in visited:
+        return ("recursive", value.bl_rna.identifier)
+    return rna_signature(value, (), trees, visited)
+
+
+def node_signature(node, trees):
+    sockets = tuple((socket.identifier, plain(getattr(socket, "default_value", None))) for socket in node.inputs)
+    return (node.bl_idname, rna_signature(node, NODE_SKIP, trees), sockets)
+
+
+def tree_signature(tree, trees):
+    """Node types, settings and links of a node tree, independent of node names and layout.
+
+    ``trees`` caches the signature of every tree by pointer, so node groups
+    shared between materials are only walked once.
+    """
+    key = tree.as_pointer()
+    if key in trees:
+        return trees[key]
+    trees[key] = ("recursive", tree.name)
+    nodes = {node.name: node_signature(node, trees) for node in tree.nodes}
+    order = sorted(nodes, key=lambda name: (repr(nodes[name]), name))
+    index = {name: i for i, name in enumerate(order)}
+    links = sorted(
+        (index[link.from_node.name], link.from_socket.identifier,
+         index[link.to_node.name], link.to_socket.identifier, link.is_muted)
+        for link in tree.links
+    )
+    trees[key] = (tuple(nodes[name] for name in order), tuple(links))
+    return trees[key]
+
+
+def material_hash(material, trees):
+    """Hash of everything that affects how a material renders, but not its name."""
+    signature = (rna_signature(material, MATERIAL_SKIP, trees),
+                 tree_signature(material.node_tree, trees) if material.use_nodes and material.node_tree else None)
+    return hashlib.blake2b(repr(signature).encode(), digest_size=16).hexdigest()
+
+
+def canonical_materials(materials):
+    """Map the pointer of every material to the one it merges into.
+
+    Names without a ".001" style suffix win, so the original of a set of
+    copies is kept.
+    """
+    trees = {}
+    groups = {}
+    for material in materials:
+        groups.setdefault(material_hash(material, trees), []).append(material)
+    canonical = {}
+    for group in groups.values():
+        keep = min(group, key=lambda material: (DUPLICATE_SUFFIX.search(material.name) is not None, material.name))
+        for material in group:
+            canonical[material.as_pointer()] = keep
+    return canonical
+
+
+def consolidate_materials(objects):
+    """Merge identical materials across ``objects`` and compact their material slots.
+
+    Returns the number of distinct materials and of draw calls (used
+    material slots) before and after.
+    """
+    objects = [obj for obj in objects if obj.type == 'MESH']
+    materials = {slot.material.as_pointer(): slot.material
+                 for obj in objects for slot in obj.material_slots if slot.material}
+    with phase("hash"):
+        canonical = canonical_materials(materials.values())
+
+    def merged(material):
+        return canonical[material.as_pointer()] if material else None
+
+    users = {}
+    for obj in objects:
+        users.setdefault(obj.data.as_pointer(), (obj.data, []))[1].append(obj)
+
+    stats = {"materials": len(materials), "unique": len({m.as_pointer() for m in canonical.values()}),
+             "draw_calls": 0, "merged_draw_calls": 0}
+    with phase("remap"):
+        for mesh, mesh_objects in users.values():
+            face_slots = read_array(mesh.polygons, "material_index", np.int32)
+            slot_count = len(mesh_objects[0].material_slots)
+            used = np.unique(np.clip(face_slots, 0, max(slot_count - 1, 0))) if slot_count else []
+            stats["draw_calls"] += len(used) * len(mesh_objects)
+
+            if any(slot.link == 'OBJECT' for obj in mesh_objects for slot in obj.material_slots):
+                # Slots differ per object, so only swap the materials in place
+                for obj in mesh_objects:
+                    for slot in obj.material_slots:
+                        if slot.material and merged(slot.material) != slot.material:
+                            slot.material = merged(slot.material)
+                    keys = {merged(obj.material_slots[int(slot)].material) for slot in used}
+                    stats["merged_draw_calls"] += len(keys)
+                continue
+
+            slot_materials = [merged(material) for material in mesh.materials]
+            keys = [material.as_pointer() if material else None for material in slot_materials]
+            kept, new_slots = merge_slots(face_slots, keys)
+            stats["merged_draw_calls"] += len(kept) * len(mesh_objects)
+            lookup = dict(zip(keys, slot_materials))
+            if kept == [m.as_pointer() if m else None for m in mesh.materials] and np.array_equal(new_slots, face_slots):
+                continue
+            mesh.materials.clear()
+            for key in kept:
+                mesh.materials.append(lookup[key])
+            mesh.polygons.foreach_set("material_index", new_slots.astype(np.int32))
+            mesh.update()
+
+    for material in materials.values():
+        if material.users == 0:
+            bpy.data.materials.remove(material)
+    return stats
+
+
+class NaoConsolidateMaterialsOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_consolidate_materials_operator"
+    bl_label = "Consolidate Materials"
+    bl_description = "Merge materials with identical settings and node trees across every mesh in the scene"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        objects = [obj for obj in context.scene.objects if obj.type == 'MESH']
+        if not objects:
+            self.report({'WARNING'}, "No meshes in the scene.")
+            return {'CANCELLED'}
+
+        stats = consolidate_materials(objects)
+        saved = stats["draw_calls"] - stats["merged_draw_calls"]
+        self.report({'INFO'}, f"{stats['materials']} materials -> {stats['unique']} unique, "
+                              f"{saved} draw call(s) saved ({stats['draw_calls']} -> {stats['merged_draw_calls']}).")
+        return {'FINISHED'}
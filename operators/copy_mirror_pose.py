@@ -1,43 +1,223 @@
 import bpy
+import numpy as np
+
+from ..core.skeleton import MIRROR_SIGNS, mirror_name, mirror_pairs
+
+ROTATION_PATHS = {
+    'QUATERNION': "rotation_quaternion",
+    'AXIS_ANGLE': "rotation_axis_angle",
+}
+
+# Keyframe properties copied with every key: (name, components), enums being read as ints
+KEY_PROPERTIES = (
+    ("co", 2), ("handle_left", 2), ("handle_right", 2),
+    ("interpolation", 1), ("easing", 1), ("handle_left_type", 1), ("handle_right_type", 1),
+)
+KEY_VECTORS = ("co", "handle_left", "handle_right")
+
+# Armature data pointer -> ((bone names, left suffix, right suffix), pairs)
+_pair_cache = {}
+
+
+def bone_pairs(armature, left_suffix, right_suffix):
+    """Left/right bone name table of an armature, rebuilt only when its bone names change."""
+    names = tuple(armature.data.bones.keys())
+    key = (names, left_suffix, right_suffix)
+    pointer = armature.data.as_pointer()
+    cached = _pair_cache.get(pointer)
+    if cached is None or cached[0] != key:
+        cached = (key, mirror_pairs(names, left_suffix, right_suffix))
+        _pair_cache[pointer] = cached
+    return cached[1]
+
+
+def clear_pair_cache():
+    _pair_cache.clear()
+
+
+def rotation_path(mode):
+    return ROTATION_PATHS.get(mode, "rotation_euler")
+
+
+def mirrored_values(bone):
+    """Pose channels of a bone with the mirror signs applied, keyed by property name."""
+    values = {}
+    for path in ("location", rotation_path(bone.rotation_mode), "scale"):
+        signs = MIRROR_SIGNS[path]
+        values[path] = tuple(value * sign for value, sign in zip(getattr(bone, path), signs))
+    return values
+
+
+def bone_fcurves(action):
+    """Index the pose bone F-curves of an action by (escaped bone name, property, array index)."""
+    index = {}
+    prefix = 'pose.bones["'
+    for fcurve in action.fcurves:
+        path = fcurve.data_path
+        if not path.startswith(prefix) or '"].' not in path:
+            continue
+        name, prop = path[len(prefix):].rsplit('"].', 1)
+        index[name, prop, fcurve.array_index] = fcurve
+    return index
+
+
+def read_keys(fcurve):
+    """Every key of an F-curve as arrays of its position, handles, interpolation and handle types."""
+    points = fcurve.keyframe_points
+    keys = {}
+    for prop, width in KEY_PROPERTIES:
+        values = np.empty(len(points) * width, dtype=np.float32 if width > 1 else np.int32)
+        points.foreach_get(prop, values)
+        keys[prop] = values.reshape(-1, width) if width > 1 else values
+    return keys
+
+
+def select_keys(keys, mask):
+    return {prop: values[mask] for prop, values in keys.items()}
+
+
+def mirror_keys(keys, sign):
+    """Flip the values of keys and of their handles, leaving the frames alone."""
+    keys = dict(keys)
+    for prop in KEY_VECTORS:
+        keys[prop] = keys[prop] * np.array([1.0, sign], dtype=np.float32)
+    return keys
+
+
+def write_keys(fcurve, keys):
+    """Replace the keys of an F-curve with ``keys``, sorted by frame, in one bulk write per property.
+
+    Each key carries its own handles, interpolation and handle types along,
+    so nothing shifts onto a neighbouring key.
+    """
+    order = np.argsort(keys["co"][:, 0], kind="stable")
+    points = fcurve.keyframe_points
+    while len(points) > len(order):
+        points.remove(points[-1], fast=True)
+    if len(points) < len(order):
+        points.add(len(order) - len(points))
+    for prop, _width in KEY_PROPERTIES:
+        points.foreach_set(prop, np.ascontiguousarray(keys[prop][order]).ravel())
+    fcurve.update()
+
+
+def mirror_keyframes(armature, pairs, frame_start, frame_end):
+    """Copy the keys of each source bone inside the frame range onto its mirror bone.
+
+    Every source curve is read before anything is written, so pairs that
+    mirror onto each other swap their animation. Returns the number of keys
+    written.
+    """
+    animation = armature.animation_data
+    if not animation or not animation.action:
+        return 0
+    action = animation.action
+    curves = bone_fcurves(action)
+    bones = armature.pose.bones
+
+    writes = []
+    for source, target in pairs:
+        escaped = bpy.utils.escape_identifier(source)
+        path = rotation_path(bones[source].rotation_mode)
+        for prop in ("location", path, "scale"):
+            for index, sign in enumerate(MIRROR_SIGNS[prop]):
+                fcurve = curves.get((escaped, prop, index))
+                if fcurve is None:
+                    continue
+                keys = read_keys(fcurve)
+                frames = keys["co"][:, 0]
+                keys = select_keys(keys, (frames >= frame_start) & (frames <= frame_end))
+                writes.append((target, prop, index, mirror_keys(keys, sign)))
+
+    written = 0
+    for target, prop, index, keys in writes:
+        escaped = bpy.utils.escape_identifier(target)
+        fcurve = curves.get((escaped, prop, index))
+        if fcurve is None:
+            fcurve = action.fcurves.new(f'pose.bones["{escaped}"].{prop}', index=index, action_group=target)
+            curves[escaped, prop, index] = fcurve
+        kept = read_keys(fcurve)
+        frames = kept["co"][:, 0]
+        kept = select_keys(kept, (frames < frame_start) | (frames > frame_end))
+        write_keys(fcurve, {prop: np.concatenate((kept[prop], keys[prop])) for prop in keys})
+        written += len(keys["co"])
+    return written
+
 
 class NaoCopyMirrorPoseOperator(bpy.types.Operator):
     bl_idname = "wm.nao_copy_mirror_pose_operator"
     bl_label = "Copy & Mirror Pose"
     bl_options = {'REGISTER', 'UNDO'}
 
-    def find_mirror_name(self, name, left_suffix, right_suffix):
-        if name.endswith(left_suffix):
-            return name[:-len(left_suffix)] + right_suffix
-        elif name.endswith(right_suffix):
-            return name[:-len(right_suffix)] + left_suffix
-        elif f" {left_suffix}" in name:
-            return name.replace(f" {left_suffix}", f" {right_suffix}")
-        elif f" {right_suffix}" in name:
-            return name.replace(f" {right_suffix}", f" {left_suffix}")
-        return None
+    scope: bpy.props.EnumProperty(
+        name="Scope",
+        items=[
+            ('ACTIVE', "Active Bone", "Copy the active pose bone onto its mirror bone"),
+            ('SELECTED', "Selected Bones", "Copy every selected pose bone onto its mirror bone"),
+            ('ALL', "Whole Pose", "Flip the whole pose, swapping every left and right bone"),
+        ],
+        default='ACTIVE'
+    )
+    keyframes: bpy.props.BoolProperty(
+        name="Mirror Keyframes",
+        description="Also mirror the keyframes inside the frame range",
+        default=False
+    )
+    frame_start: bpy.props.IntProperty(name="Start Frame", default=1)
+    frame_end: bpy.props.IntProperty(name="End Frame", default=250)
+
+    def invoke(self, context, event):
+        if not self.properties.is_property_set("frame_start"):
+            self.frame_start = context.scene.frame_start
+        if not self.properties.is_property_set("frame_end"):
+            self.frame_end = context.scene.frame_end
+        return self.execute(context)
+
+    def source_bones(self, context, armature):
+        if self.scope == 'ACTIVE':
+            bone = context.active_pose_bone
+            return [bone] if bone else []
+        if self.scope == 'SELECTED':
+            return list(context.selected_pose_bones or [])
+        return list(armature.pose.bones)
 
     def execute(self, context):
         armature = context.active_object
-        active_bone = context.active_pose_bone
-        if not armature or not active_bone:
+        if not armature or armature.type != 'ARMATURE':
+            self.report({'WARNING'}, "No active armature selected.")
+            return {'CANCELLED'}
+        sources = self.source_bones(context, armature)
+        if not sources:
             self.report({'WARNING'}, "No active pose bone selected.")
             return {'CANCELLED'}
 
         left_suffix = context.scene.nao_left_suffix
         right_suffix = context.scene.nao_right_suffix
-        mirror_name = self.find_mirror_name(active_bone.name, left_suffix, right_suffix)
+        table = bone_pairs(armature, left_suffix, right_suffix)
+        pairs = [(bone.name, table[bone.name]) for bone in sources if bone.name in table]
+        if self.scope == 'ALL':
+            # Centre bones have no side, flipping the pose mirrors them onto themselves
+            pairs += [(bone.name, bone.name) for bone in sources
+                      if mirror_name(bone.name, left_suffix, right_suffix) is None]
+        if not pairs:
+            self.report({'WARNING'}, "Mirror bone not found.")
+            return {'CANCELLED'}
 
-        if mirror_name and mirror_name in armature.pose.bones:
-            mirror_bone = armature.pose.bones[mirror_name]
-            mirror_bone.location = (active_bone.location[0], active_bone.location[1], active_bone.location[2])
+        bones = armature.pose.bones
+        # Read every source first so bones mirrored onto each other swap cleanly
+        poses = [(target, bones[source].rotation_mode, mirrored_values(bones[source])) for source, target in pairs]
+        for target, mode, values in poses:
+            mirror_bone = bones[target]
+            mirror_bone.rotation_mode = mode
+            for path, value in values.items():
+                setattr(mirror_bone, path, value)
 
-            active_bone.rotation_mode = 'XYZ'
-            mirror_bone.rotation_mode = 'XYZ'
-            mirror_bone.rotation_euler = (-active_bone.rotation_euler[0], -active_bone.rotation_euler[1], active_bone.rotation_euler[2])
-            mirror_bone.scale = active_bone.scale
+        keys = 0
+        if self.keyframes:
+            keys = mirror_keyframes(armature, pairs, self.frame_start, self.frame_end)
 
-            self.report({'INFO'}, f"Pose values from {active_bone.name} have been effectively not inverted and copied to {mirror_bone.name}.")
-            return {'FINISHED'}
-        else:
-            self.report({'WARNING'}, "Mirror bone not found.")
-            return {'CANCELLED'}
+        message = f"Mirrored {len(pairs)} bone(s)"
+        if self.keyframes:
+            message += f" and {keys} key(s)"
+        self.report({'INFO'}, message + ".")
+        return {'FINISHED'}
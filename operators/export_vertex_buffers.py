@@ -0,0 +1,128 @@
+import bpy
+import json
+import os
+import numpy as np
+
+from ..core.vertex_buffer import VertexLayout, bone_streams, build_buffers, write_buffers
+from .config_files import ADDON_DIRECTORY, config_files
+from .mesh_io import read_array, read_loop_normals, read_loop_triangles, read_uvs
+from .profiling import phase
+from .weight_io import ensure_object_mode, read_weights
+
+BUILTIN_LAYOUTS = os.path.join(ADDON_DIRECTORY, "vertex_layouts")
+# Folder of the user's own files in Blender's config directory
+USER_LAYOUTS = "naotools_vertex_layouts"
+
+# Blender needs the enum items to outlive the callback that returns them
+_layout_items = []
+
+
+def layout_files():
+    """Map layout file stems to paths, user layouts overriding the built-in ones."""
+    return config_files(USER_LAYOUTS, BUILTIN_LAYOUTS)
+
+
+def layout_items(self, context):
+    _layout_items.clear()
+    for key in layout_files():
+        _layout_items.append((key, key.replace("_", " ").title(), ""))
+    if not _layout_items:
+        _layout_items.append(('NONE', "No Layouts", ""))
+    return _layout_items
+
+
+def load_layout(key):
+    path = layout_files().get(key)
+    if path is None:
+        raise ValueError(f"Unknown vertex layout '{key}'")
+    with open(path, encoding="utf-8") as f:
+        return VertexLayout.from_dict(json.load(f))
+
+
+def corner_streams(obj, layout):
+    """Per-corner arrays of every attribute the layout uses and the mesh has."""
+    mesh = obj.data
+    semantics = {semantic for semantic, _component, _count in layout.attributes}
+    loop_verts = read_array(mesh.loops, "vertex_index", np.int64)
+    streams = {}
+    if "position" in semantics:
+        streams["position"] = read_array(mesh.vertices, "co", np.float32, 3)[loop_verts]
+    if "normal" in semantics:
+        streams["normal"] = read_loop_normals(mesh)
+    for index, semantic in enumerate(("uv0", "uv1")):
+        if semantic in semantics and index < len(mesh.uv_layers):
+            streams[semantic] = read_uvs(mesh, mesh.uv_layers[index])
+    influences = layout.influences()
+    if influences and obj.vertex_groups:
+        indices, weights = bone_streams(read_weights(obj), influences, layout.component("bone_weights") or "float32")
+        streams["bone_indices"] = indices[loop_verts]
+        streams["bone_weights"] = weights[loop_verts]
+    return streams
+
+
+def material_name(mesh, index):
+    material = mesh.materials[index] if index < len(mesh.materials) else None
+    return material.name if material else None
+
+
+def export_vertex_buffers(obj, layout, path):
+    """Write the vertex and index buffers of a mesh object in ``layout`` to ``path``.
+
+    Triangles are grouped by material, each material becoming a submesh of
+    the header. Returns the vertex and index counts written.
+    """
+    mesh = obj.data
+    with phase("read"):
+        triangles = read_loop_triangles(mesh)
+        materials = read_array(mesh.loop_triangles, "material_index", np.int32)
+        streams = corner_streams(obj, layout)
+    with phase("pack"):
+        vertices, indices, submeshes = build_buffers(layout, streams, triangles, materials)
+    with phase("write"):
+        write_buffers(
+            path, layout, vertices, indices,
+            name=obj.name,
+            submeshes=[{"material": material_name(mesh, group), "first_index": first, "index_count": count}
+                       for group, first, count in submeshes],
+            bones=[group.name for group in obj.vertex_groups],
+        )
+    return len(vertices), len(indices)
+
+
+class NaoExportVertexBuffersOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_export_vertex_buffers_operator"
+    bl_label = "Export Vertex Buffers"
+    bl_description = "Write the selected meshes as raw interleaved vertex and index buffers in the chosen layout"
+
+    def execute(self, context):
+        props = context.scene.nao_props
+        objects = [obj for obj in context.selected_objects if obj.type == 'MESH' and obj.data.polygons]
+        if not objects:
+            self.report({'WARNING'}, "Please select a mesh object.")
+            return {'CANCELLED'}
+        try:
+            layout = load_layout(props.vertex_layout)
+        except (ValueError, KeyError, OSError) as error:
+            self.report({'ERROR'}, f"Could not load the vertex layout: {error}")
+            return {'CANCELLED'}
+
+        ensure_object_mode(context)
+        directory = bpy.path.abspath(props.vertex_buffer_directory)
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        for obj in objects:
+            path = os.path.join(directory, f"{bpy.path.clean_name(obj.name)}.nvb")
+            try:
+                vertex_count, index_count = export_vertex_buffers(obj, layout, path)
+            except ValueError as error:
+                self.report({'WARNING'}, f"{obj.name}: {error}")
+                continue
+            written.append((vertex_count, index_count))
+
+        if not written:
+            return {'CANCELLED'}
+        vertices = sum(vertex_count for vertex_count, _index_count in written)
+        triangles = sum(index_count for _vertex_count, index_count in written) // 3
+        self.report({'INFO'}, f"Exported {len(written)} mesh(es) as {layout.name} to {directory}: "
+                              f"{vertices} vertices, {triangles} triangles.")
+        return {'FINISHED'}
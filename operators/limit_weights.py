@@ -1,15 +1,33 @@
 import bpy
 
+from .change_tracking import changed_objects, mark_clean
+from .weight_io import apply_weight_steps, ensure_object_mode, limit_weights, weight_bits
+
 class NaoLimitWeightsOperator(bpy.types.Operator):
     bl_idname = "wm.nao_limit_weights_operator"
     bl_label = "Limit Weights"
 
+    normalize: bpy.props.BoolProperty(
+        name="Normalize",
+        description="Rescale the remaining weights of each vertex to add up to 1",
+        default=True
+    )
+
     def execute(self, context):
         max_vertex_groups = context.scene.nao_props.max_vertex_groups
-        for obj in bpy.context.scene.objects:
-            if obj.type == 'MESH' and obj.vertex_groups:
-                bpy.context.view_layer.objects.active = obj
-                obj.select_set(True)
-                bpy.ops.object.vertex_group_limit_total(limit=max_vertex_groups)
-                bpy.ops.object.select_all(action='DESELECT')
+        bits = weight_bits(context.scene.nao_props)
+        objects = [obj for obj in context.scene.objects if obj.type == 'MESH']
+        operation = f"limit_weights:{max_vertex_groups}:{self.normalize}:{bits}"
+        if context.scene.nao_props.only_changed:
+            objects = changed_objects(operation, objects)
+        ensure_object_mode(context)
+        if bits and self.normalize:
+            apply_weight_steps(objects, [("limit_weights", {"limit": max_vertex_groups, "normalize": False}),
+                                         ("quantize_weights", {"bits": bits})])
+            message = f"Limited {len(objects)} mesh(es) to {max_vertex_groups} weights quantized to {bits} bits."
+        else:
+            removed = limit_weights(objects, max_vertex_groups, self.normalize)
+            message = f"Removed {removed} weights over the limit of {max_vertex_groups} from {len(objects)} mesh(es)."
+        mark_clean(operation, objects)
+        self.report({'INFO'}, message)
         return {'FINISHED'}
@@ -0,0 +1,222 @@
+import bpy
+import numpy as np
+
+from ..core.fingerprint import array_fingerprint
+
+
+def read_array(collection, prop, dtype, width=1):
+    """foreach_get a property of a bpy collection into a new NumPy array."""
+    array = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(prop, array)
+    if width > 1:
+        array.shape = (len(collection), width)
+    return array
+
+
+def mesh_fingerprint(mesh):
+    """Fingerprint the topology and vertex positions of a mesh."""
+    return array_fingerprint(
+        read_array(mesh.vertices, "co", np.float32, 3),
+        read_array(mesh.loops, "vertex_index", np.int32),
+        read_array(mesh.polygons, "loop_total", np.int32),
+    )
+
+
+def read_loop_normals(mesh):
+    """Read the per-loop (corner) normals of a mesh as an (L, 3) array."""
+    if hasattr(mesh, "corner_normals"):
+        return read_array(mesh.corner_normals, "vector", np.float32, 3)
+    mesh.calc_normals_split()
+    return read_array(mesh.loops, "normal", np.float32, 3)
+
+
+def read_loop_triangles(mesh):
+    """Triangulate a mesh and return the loop indices of each triangle as a (T, 3) array."""
+    mesh.calc_loop_triangles()
+    return read_array(mesh.loop_triangles, "loops", np.int32, 3)
+
+
+def read_uvs(mesh, layer=None):
+    """Read a UV layer (the active one by default) as an (L, 2) array, or None without UVs."""
+    if layer is None:
+        layer = mesh.uv_layers.active
+    if layer is None:
+        return None
+    return read_array(layer.data, "uv", np.float32, 2)
+
+
+def set_custom_normals(mesh, normals):
+    """Write (L, 3) per-loop custom normals, enabling auto smooth where Blender still needs it."""
+    if hasattr(mesh, "use_auto_smooth"):
+        mesh.use_auto_smooth = True
+    mesh.normals_split_custom_set(normals)
+
+
+def loop_polygon_indices(mesh):
+    """Index of the polygon owning each loop of a mesh."""
+    loop_starts = read_array(mesh.polygons, "loop_start", np.int64)
+    loop_totals = read_array(mesh.polygons, "loop_total", np.int64)
+    offsets = np.arange(loop_totals.sum()) - np.repeat(np.cumsum(loop_totals) - loop_totals, loop_totals)
+    loop_polygons = np.empty(len(mesh.loops), dtype=np.int64)
+    loop_polygons[np.repeat(loop_starts, loop_totals) + offsets] = np.repeat(np.arange(len(loop_starts)), loop_totals)
+    return loop_polygons
+
+
+# foreach property, dtype and width of every generic attribute type
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", np.float32, 1),
+    'INT': ("value", np.int32, 1),
+    'FLOAT_VECTOR': ("vector", np.float32, 3),
+    'FLOAT_COLOR': ("color", np.float32, 4),
+    'BYTE_COLOR': ("color", np.float32, 4),
+    'BOOLEAN': ("value", bool, 1),
+    'FLOAT2': ("vector", np.float32, 2),
+    'INT8': ("value", np.int32, 1),
+    'INT32_2D': ("value", np.int32, 2),
+    'QUATERNION': ("value", np.float32, 4),
+}
+
+# Attributes that build_submesh writes itself or that Blender manages
+SKIPPED_ATTRIBUTES = {"position", "material_index", "sharp_face", "sharp_edge"}
+
+
+def attribute_layout(attribute):
+    """foreach property, dtype and width of a generic attribute, or None for unsupported types."""
+    layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+    if layout and attribute.data_type == 'BYTE_COLOR' and "color_srgb" in bpy.types.ByteColorAttributeValue.bl_rna.properties:
+        # Copy the stored bytes rather than round tripping through linear floats
+        layout = ("color_srgb",) + layout[1:]
+    return layout
+
+
+def domain_indices(sub, domain):
+    return {'POINT': sub.verts, 'EDGE': sub.edges, 'FACE': sub.faces, 'CORNER': sub.loops}.get(domain)
+
+
+def mesh_topology(mesh):
+    """Read the arrays core.partition.submesh needs from a mesh."""
+    return (
+        read_array(mesh.polygons, "loop_start", np.int64),
+        read_array(mesh.polygons, "loop_total", np.int64),
+        read_array(mesh.loops, "vertex_index", np.int64),
+        read_array(mesh.loops, "edge_index", np.int64),
+        read_array(mesh.edges, "vertices", np.int64, 2),
+    )
+
+
+def cached_array(cache, key, collection, prop, dtype, width=1):
+    """read_array memoized in ``cache`` under ``key``, when a cache dict is given."""
+    if cache is None:
+        return read_array(collection, prop, dtype, width)
+    array = cache.get(key)
+    if array is None:
+        array = cache[key] = read_array(collection, prop, dtype, width)
+    return array
+
+
+def build_submesh(mesh, sub, name, loop_normals=None, cache=None):
+    """Create a new mesh from ``mesh`` keeping only the elements of a core.partition.SubMesh.
+
+    Positions, edge and face flags, UV maps, color and other generic
+    attributes are copied with bulk array writes. ``loop_normals`` are the
+    source's custom normals, if any. Pass the same ``cache`` dict when
+    building several sub-meshes of one mesh to read each source array once.
+    Vertex groups and shape keys live on the object and are left to the
+    caller, see copy_shape_keys.
+    """
+    new = bpy.data.meshes.new(name)
+    new.vertices.add(len(sub.verts))
+    new.edges.add(len(sub.edges))
+    new.loops.add(len(sub.loops))
+    new.polygons.add(len(sub.faces))
+
+    coords = cached_array(cache, "co", mesh.vertices, "co", np.float32, 3)
+    new.vertices.foreach_set("co", coords[sub.verts].ravel())
+    new.edges.foreach_set("vertices", sub.edge_verts.ravel())
+    new.loops.foreach_set("vertex_index", sub.loop_verts)
+    new.loops.foreach_set("edge_index", sub.loop_edges)
+    new.polygons.foreach_set("loop_start", sub.loop_starts)
+    if bpy.app.version < (4, 0, 0):
+        new.polygons.foreach_set("loop_total", sub.loop_totals)
+
+    for source, target, indices, prop, dtype in (
+        (mesh.edges, new.edges, sub.edges, "use_seam", bool),
+        (mesh.edges, new.edges, sub.edges, "use_edge_sharp", bool),
+        (mesh.polygons, new.polygons, sub.faces, "use_smooth", bool),
+        (mesh.polygons, new.polygons, sub.faces, "material_index", np.int32),
+    ):
+        values = cached_array(cache, prop, source, prop, dtype)
+        target.foreach_set(prop, values[indices])
+
+    for attribute in mesh.attributes:
+        if attribute.name.startswith(".") or attribute.name in SKIPPED_ATTRIBUTES:
+            continue
+        layout = attribute_layout(attribute)
+        indices = domain_indices(sub, attribute.domain)
+        if layout is None or indices is None:
+            continue
+        prop, dtype, width = layout
+        values = cached_array(cache, ("attribute", attribute.name), attribute.data, prop, dtype, width)
+        target = new.attributes.get(attribute.name)
+        if target is None:
+            target = new.attributes.new(attribute.name, attribute.data_type, attribute.domain)
+        target.data.foreach_set(prop, values[indices].ravel())
+
+    # UV maps that aren't exposed as generic attributes (before Blender 3.5)
+    for layer in mesh.uv_layers:
+        if layer.name not in new.uv_layers:
+            uvs = cached_array(cache, ("uv", layer.name), layer.data, "uv", np.float32, 2)
+            new.uv_layers.new(name=layer.name).data.foreach_set("uv", uvs[sub.loops].ravel())
+    if mesh.uv_layers.active is not None and mesh.uv_layers.active.name in new.uv_layers:
+        new.uv_layers.active = new.uv_layers[mesh.uv_layers.active.name]
+
+    color_attributes = getattr(mesh, "color_attributes", None)
+    if color_attributes is not None and color_attributes.active_color is not None:
+        active_name = color_attributes.active_color.name
+        for i, layer in enumerate(new.color_attributes):
+            if layer.name == active_name:
+                new.color_attributes.active_color_index = i
+                break
+
+    new.update()
+    if loop_normals is not None:
+        set_custom_normals(new, loop_normals[sub.loops])
+    return new
+
+
+def copy_shape_keys(mesh, obj, verts, cache=None):
+    """Give ``obj``, which holds a mesh built by build_submesh, the shape keys of ``mesh`` over ``verts``.
+
+    Shape keys can only be added through an object, so this runs once the
+    new mesh is assigned. Names, values, slider ranges, vertex groups,
+    mute and relative keys are copied along with the coordinates.
+    """
+    if mesh.shape_keys is None:
+        return
+    source = mesh.shape_keys
+    for block in source.key_blocks:
+        new = obj.shape_key_add(name=block.name, from_mix=False)
+        coords = cached_array(cache, ("shape_key", block.name), block.data, "co", np.float32, 3)
+        new.data.foreach_set("co", coords[verts].ravel())
+        new.interpolation = block.interpolation
+        new.vertex_group = block.vertex_group
+        new.mute = block.mute
+        # Widen the range first so neither bound gets clamped by the other's default
+        new.slider_min = -10.0
+        new.slider_max = block.slider_max
+        new.slider_min = block.slider_min
+        new.value = block.value
+
+    key_blocks = obj.data.shape_keys.key_blocks
+    for block in source.key_blocks:
+        if block.relative_key is not None:
+            key_blocks[block.name].relative_key = key_blocks[block.relative_key.name]
+    obj.data.shape_keys.use_relative = source.use_relative
+    obj.data.shape_keys.eval_time = source.eval_time
+
+
+def custom_loop_normals(mesh):
+    """Per-loop normals of a mesh when it has custom normals, otherwise None."""
+    if not mesh.has_custom_normals:
+        return None
+    return read_loop_normals(mesh)
@@ -1,12 +1,23 @@
 import bpy
 
+from .change_tracking import changed_objects, mark_clean
+from .weight_io import apply_weight_steps, ensure_object_mode, normalize_weights, weight_bits
+
 class NaoNormalizeOperator(bpy.types.Operator):
     bl_idname = "wm.nao_normalize_operator"
     bl_label = "Normalize Weights"
 
     def execute(self, context):
-        for obj in bpy.context.visible_objects:
-            if obj.type == 'MESH' and obj.vertex_groups:
-                bpy.context.view_layer.objects.active = obj
-                bpy.ops.object.vertex_group_normalize_all()
+        bits = weight_bits(context.scene.nao_props)
+        objects = [obj for obj in context.visible_objects if obj.type == 'MESH']
+        operation = f"normalize:{bits}"
+        if context.scene.nao_props.only_changed:
+            objects = changed_objects(operation, objects)
+        ensure_object_mode(context)
+        if bits:
+            apply_weight_steps(objects, [("quantize_weights", {"bits": bits})], lock=True)
+        else:
+            normalize_weights(objects)
+        mark_clean(operation, objects)
+        self.report({'INFO'}, f"Normalized {len(objects)} mesh(es)" + (f" to {bits}-bit weights." if bits else "."))
         return {'FINISHED'}
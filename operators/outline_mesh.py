@@ -0,0 +1,222 @@
+import bpy
+import bmesh
+import time
+import numpy as np
+
+from .mesh_io import mesh_fingerprint
+from .profiling import phase
+
+# Each preset describes the outline shell a game expects. Adding a game is a
+# matter of adding an entry here.
+OUTLINE_PRESETS = {
+    'P3R': {
+        "label": "P3R",
+        "description": "Persona 3 Reload outline",
+        "material": "MI_CH_OlMk",
+        "color_layer": "PSKVTXCOL_0",
+        "color": (0xBB / 0xFF, 0x01 / 0xFF, 0x01 / 0xFF, 1.0),
+        "weld_threshold": 0.001,
+        "flip": True,
+        "offset": 0.0,
+    },
+    'P3R_SKIN': {
+        "label": "P3R Skin",
+        "description": "Persona 3 Reload skin outline, full white vertex colors",
+        "material": "MI_CH_OlMk",
+        "color_layer": "PSKVTXCOL_0",
+        "color": (1.0, 1.0, 1.0, 1.0),
+        "weld_threshold": 0.001,
+        "flip": True,
+        "offset": 0.0,
+    },
+    'JJK': {
+        "label": "JJK",
+        "description": "Jujutsu Kaisen outline",
+        "material": "MI_CP_060_00_Outline",
+        "color_layer": "JJKVTXCOL_0",
+        "color": (0xFF / 0xFF, 0x01 / 0xFF, 0xFF / 0xFF, 1.0),
+        "weld_threshold": 0.0,
+        "flip": True,
+        "offset": 0.0,
+    },
+}
+
+OUTLINE_PRESET_ITEMS = [(key, preset["label"], preset["description"]) for key, preset in OUTLINE_PRESETS.items()]
+
+
+def fill_color_layer(mesh, name, color):
+    """Fill the corner color layer ``name`` of ``mesh`` with ``color`` and make it the active one.
+
+    A layer already called ``name`` is replaced, other color layers are left alone.
+    """
+    attributes = getattr(mesh, "color_attributes", None)
+    if attributes is not None and "color_srgb" in bpy.types.ByteColorAttributeValue.bl_rna.properties:
+        existing = attributes.get(name)
+        if existing is not None:
+            attributes.remove(existing)
+        layer = attributes.new(name=name, type='BYTE_COLOR', domain='CORNER')
+        attributes.active_color = layer
+        prop = "color_srgb"
+    else:
+        existing = mesh.vertex_colors.get(name)
+        if existing is not None:
+            mesh.vertex_colors.remove(existing)
+        layer = mesh.vertex_colors.new(name=name)
+        layer.active = True
+        prop = "color"
+    layer.data.foreach_set(prop, np.tile(np.asarray(color, dtype=np.float32), len(layer.data)))
+    return layer
+
+
+def build_outline_geometry(mesh, weld_threshold, flip, offset):
+    """Weld, flip and push out the geometry of ``mesh`` in place."""
+    if weld_threshold > 0.0 or flip:
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        if weld_threshold > 0.0:
+            bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=weld_threshold)
+        if flip:
+            bmesh.ops.reverse_faces(bm, faces=bm.faces)
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.update()
+
+    if offset:
+        count = len(mesh.vertices)
+        coords = np.empty(count * 3, dtype=np.float32)
+        normals = np.empty(count * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coords)
+        mesh.vertices.foreach_get("normal", normals)
+        # Flipped normals point inwards, the shell still has to grow outwards
+        coords += normals * (-offset if flip else offset)
+        mesh.vertices.foreach_set("co", coords)
+        mesh.update()
+
+
+def create_outline(obj, preset_key, material):
+    """Create an outline shell object for ``obj`` from an OUTLINE_PRESETS entry.
+
+    The shell is tagged with its source, preset and the source's fingerprint
+    so batch runs can tell whether it is still up to date.
+    """
+    preset = OUTLINE_PRESETS[preset_key]
+
+    with phase("duplicate"):
+        outline = obj.copy()
+        outline.data = obj.data.copy()
+        for collection in obj.users_collection:
+            collection.objects.link(outline)
+        outline["nao_outline_source"] = obj
+        outline["nao_outline_preset"] = preset_key
+        outline["nao_outline_fingerprint"] = mesh_fingerprint(obj.data)
+
+    mesh = outline.data
+    with phase("geometry"):
+        build_outline_geometry(mesh, preset["weld_threshold"], preset["flip"], preset["offset"])
+
+    with phase("colors"):
+        mesh.materials.clear()
+        if material:
+            mesh.materials.append(material)
+        mesh.polygons.foreach_set("material_index", np.zeros(len(mesh.polygons), dtype=np.int32))
+        fill_color_layer(mesh, preset["color_layer"], preset["color"])
+    return outline
+
+
+def existing_outlines():
+    """Map the pointer of every outlined source object to its outline shells."""
+    outlines = {}
+    for obj in bpy.data.objects:
+        source = obj.get("nao_outline_source")
+        if isinstance(source, bpy.types.Object):
+            outlines.setdefault(source.as_pointer(), []).append(obj)
+    return outlines
+
+
+def is_outline(obj):
+    return isinstance(obj.get("nao_outline_source"), bpy.types.Object)
+
+
+def outline_objects(objects, preset_key, material):
+    """Create outlines for many meshes in one go.
+
+    Meshes whose outline for the same preset is still current are skipped
+    and stale outlines are replaced. Returns the created outlines and a list
+    of per-object stats.
+    """
+    outlines = existing_outlines()
+    created = []
+    stats = []
+    for obj in objects:
+        if obj.type != 'MESH' or is_outline(obj):
+            continue
+        start = time.perf_counter()
+        previous = [outline for outline in outlines.get(obj.as_pointer(), ())
+                    if outline.get("nao_outline_preset") == preset_key]
+        if previous:
+            fingerprint = mesh_fingerprint(obj.data)
+            if all(outline.get("nao_outline_fingerprint") == fingerprint for outline in previous):
+                stats.append({"object": obj.name, "skipped": True, "seconds": time.perf_counter() - start})
+                continue
+            for outline in previous:
+                bpy.data.objects.remove(outline)
+
+        created.append(create_outline(obj, preset_key, material))
+        stats.append({"object": obj.name, "skipped": False, "seconds": time.perf_counter() - start})
+    return created, stats
+
+
+class NaoOutlineMeshOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_outline_mesh_operator"
+    bl_label = "Outline Mesh"
+    bl_description = "Duplicate meshes into outline shells using the selected game preset"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: bpy.props.EnumProperty(
+        name="Scope",
+        items=[
+            ('ACTIVE', "Active", "Outline the active mesh"),
+            ('SELECTED', "Selected", "Outline every selected mesh"),
+            ('COLLECTION', "Collection", "Outline every mesh in the chosen collection"),
+        ],
+        default='ACTIVE'
+    )
+
+    def execute(self, context):
+        props = context.scene.nao_props
+        if self.scope == 'SELECTED':
+            objects = list(context.selected_objects)
+        elif self.scope == 'COLLECTION':
+            if props.outline_collection is None:
+                self.report({'WARNING'}, "Please choose a collection to outline.")
+                return {'CANCELLED'}
+            objects = list(props.outline_collection.all_objects)
+        else:
+            objects = [context.active_object] if context.active_object else []
+
+        objects = [obj for obj in objects if obj.type == 'MESH']
+        if not objects:
+            self.report({'WARNING'}, "Please select a mesh object.")
+            return {'CANCELLED'}
+
+        if context.object and context.object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        preset = OUTLINE_PRESETS[props.outline_preset]
+        material = bpy.data.materials.get(preset["material"])
+        if not material:
+            self.report({'WARNING'}, f"Material '{preset['material']}' not found. Please ensure it exists in the current blend file.")
+
+        created, stats = outline_objects(objects, props.outline_preset, material)
+
+        if created:
+            for obj in context.selected_objects:
+                obj.select_set(False)
+            for outline in created:
+                outline.select_set(True)
+            context.view_layer.objects.active = created[-1]
+
+        skipped = sum(1 for entry in stats if entry["skipped"])
+        seconds = sum(entry["seconds"] for entry in stats)
+        self.report({'INFO'}, f"Created {len(created)} outline(s), skipped {skipped} up to date, in {seconds:.2f}s.")
+        return {'FINISHED'}
@@ -0,0 +1,196 @@
+import bpy
+import csv
+import functools
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+from bpy.app.handlers import persistent
+
+# Operator classes that get timed while profiling is on, filled in by register()
+_operator_classes = []
+_original_execute = {}
+_runs = deque(maxlen=20)
+_active = []
+_null_phase = nullcontext()
+
+
+def track(classes):
+    """Remember the add-on's operator classes so profiling can wrap them."""
+    _operator_classes[:] = [cls for cls in classes
+                            if issubclass(cls, bpy.types.Operator) and cls.__module__ != __name__]
+
+
+def is_enabled():
+    return bool(_original_execute)
+
+
+def set_enabled(enabled):
+    """Wrap or unwrap every tracked operator's execute.
+
+    The wrappers are only installed while profiling is on, so turned off it
+    adds nothing to an operator call.
+    """
+    if enabled and not _original_execute:
+        for cls in _operator_classes:
+            _original_execute[cls] = cls.execute
+            cls.execute = _profiled(cls.execute)
+    elif not enabled and _original_execute:
+        for cls, execute in _original_execute.items():
+            cls.execute = execute
+        _original_execute.clear()
+
+
+def set_history(length):
+    global _runs
+    _runs = deque(_runs, maxlen=max(length, 1))
+
+
+@persistent
+def sync_settings(*args):
+    """Apply the profiling settings stored in the scene.
+
+    The properties only act through their update callbacks, which don't
+    run when a file is loaded or the add-on registered, so a .blend saved
+    with profiling on needs this to get its wrappers back.
+    """
+    scene = getattr(bpy.context, "scene", None)
+    props = getattr(scene, "nao_props", None)
+    if props is not None:
+        set_history(props.profiling_history)
+        set_enabled(props.profiling)
+    return None
+
+
+def register_handlers():
+    if sync_settings not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(sync_settings)
+    # The scene can't be read while the add-on registers, check it right after
+    bpy.app.timers.register(sync_settings, first_interval=0.0)
+
+
+def unregister_handlers():
+    if sync_settings in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(sync_settings)
+    if bpy.app.timers.is_registered(sync_settings):
+        bpy.app.timers.unregister(sync_settings)
+    set_enabled(False)
+
+
+def runs():
+    return list(_runs)
+
+
+def clear_runs():
+    _runs.clear()
+
+
+def mesh_counts(context):
+    """Object, vertex and loop counts of the meshes an operator is likely to touch."""
+    objects = context.selected_objects or context.scene.objects
+    meshes = {obj.data for obj in objects if obj.type == 'MESH'}
+    return {
+        "objects": len(objects),
+        "vertices": sum(len(mesh.vertices) for mesh in meshes),
+        "loops": sum(len(mesh.loops) for mesh in meshes),
+    }
+
+
+def _profiled(execute):
+    @functools.wraps(execute)
+    def profiled_execute(self, context):
+        run = {"operator": self.bl_idname, "label": self.bl_label, "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "phases": []}
+        run.update(mesh_counts(context))
+        _active.append(run)
+        start = time.perf_counter()
+        try:
+            result = execute(self, context)
+        finally:
+            run["seconds"] = time.perf_counter() - start
+            _active.pop()
+            _runs.append(run)
+        run["result"] = sorted(result) if isinstance(result, set) else result
+        return result
+    return profiled_execute
+
+
+class _Phase:
+    __slots__ = ("run", "name", "start")
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.run["phases"].append({"name": self.name, "seconds": time.perf_counter() - self.start})
+
+
+def phase(name):
+    """Context manager timing one stage of the operator being profiled, a no-op otherwise."""
+    if not _active:
+        return _null_phase
+    return _Phase(_active[-1], name)
+
+
+def export_runs(filepath):
+    """Write the recorded runs to a .json or .csv file, picked by extension."""
+    if filepath.lower().endswith(".csv"):
+        with open(filepath, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["time", "operator", "seconds", "objects", "vertices", "loops", "result", "phases"])
+            for run in _runs:
+                phases = ";".join(f"{entry['name']}={entry['seconds']:.6f}" for entry in run["phases"])
+                writer.writerow([run["time"], run["operator"], f"{run['seconds']:.6f}", run["objects"],
+                                 run["vertices"], run["loops"], "|".join(run.get("result") or ()), phases])
+    else:
+        with open(filepath, "w", encoding="utf-8") as file:
+            json.dump(list(_runs), file, indent=2)
+
+
+class NaoExportProfileOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_export_profile_operator"
+    bl_label = "Export Timings"
+    bl_description = "Save the recorded operator timings as JSON or CSV"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH', default="naotools_profile.json")
+    filter_glob: bpy.props.StringProperty(default="*.json;*.csv", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        export_runs(bpy.path.abspath(self.filepath))
+        self.report({'INFO'}, f"Saved {len(_runs)} run(s) to {self.filepath}")
+        return {'FINISHED'}
+
+
+class NaoClearProfileOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_clear_profile_operator"
+    bl_label = "Clear Timings"
+
+    def execute(self, context):
+        clear_runs()
+        return {'FINISHED'}
+
+
+def draw_runs(layout, props):
+    layout.prop(props, "profiling")
+    layout.prop(props, "profiling_history")
+    recorded = runs()
+    if not recorded:
+        layout.label(text="No runs recorded.")
+    for run in reversed(recorded):
+        box = layout.box()
+        box.label(text=f"{run['label']}: {run['seconds'] * 1000:.1f} ms")
+        box.label(text=f"{run['objects']} objects, {run['vertices']} verts, {run['loops']} loops")
+        for entry in run["phases"]:
+            box.label(text=f"    {entry['name']}: {entry['seconds'] * 1000:.1f} ms")
+    row = layout.row(align=True)
+    row.operator("wm.nao_export_profile_operator", icon='EXPORT')
+    row.operator("wm.nao_clear_profile_operator", icon='TRASH')
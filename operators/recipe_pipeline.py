@@ -0,0 +1,171 @@
+import bpy
+import json
+import os
+
+from .config_files import ADDON_DIRECTORY, config_files, user_config_directory
+from .recipes import STEPS, run_recipe
+
+BUILTIN_RECIPES = os.path.join(ADDON_DIRECTORY, "recipes")
+# Folder of the user's own files in Blender's config directory
+USER_RECIPES = "naotools_recipes"
+
+# Recipe step options and the NaoRecipeStep property holding each of them
+STEP_FIELDS = {
+    "limit_weights": {"limit": "limit", "normalize": "normalize"},
+    "quantize_weights": {"bits": "bits"},
+    "clear_unused_weights": {"threshold": "threshold"},
+    "optimize_vertex_cache": {"cache_size": "cache_size"},
+    "rename_uv": {"name": "uv_name"},
+    "export": {"filepath": "filepath"},
+}
+
+STEP_ITEMS = [(name, name.replace("_", " ").title(), "") for name in STEPS]
+
+# Blender needs the enum items to outlive the callback that returns them
+_recipe_items = []
+
+
+def recipe_files():
+    """Map recipe file stems to paths, user recipes overriding the built-in ones."""
+    return config_files(USER_RECIPES, BUILTIN_RECIPES)
+
+
+def recipe_items(self, context):
+    _recipe_items.clear()
+    for key in recipe_files():
+        _recipe_items.append((key, key.upper() if len(key) <= 5 else key.title(), ""))
+    if not _recipe_items:
+        _recipe_items.append(('NONE', "No Recipes", ""))
+    return _recipe_items
+
+
+def steps_to_recipe(steps):
+    recipe = []
+    for item in steps:
+        entry = {"step": item.step}
+        for option, prop in STEP_FIELDS.get(item.step, {}).items():
+            entry[option] = getattr(item, prop)
+        recipe.append(entry)
+    return recipe
+
+
+def recipe_to_steps(recipe, steps):
+    steps.clear()
+    for entry in recipe:
+        item = steps.add()
+        item.step = entry["step"]
+        for option, prop in STEP_FIELDS.get(entry["step"], {}).items():
+            if option in entry:
+                setattr(item, prop, entry[option])
+
+
+class NaoRecipeStep(bpy.types.PropertyGroup):
+    step: bpy.props.EnumProperty(name="Step", items=STEP_ITEMS)
+    limit: bpy.props.IntProperty(name="Max Vertex Groups", default=4, min=1, max=10)
+    normalize: bpy.props.BoolProperty(name="Normalize", default=True)
+    threshold: bpy.props.FloatProperty(name="Threshold", default=0.0, min=0.0, max=1.0)
+    bits: bpy.props.IntProperty(name="Bits", default=8, min=1, max=16)
+    cache_size: bpy.props.IntProperty(name="Cache Size", default=32, min=4, max=256)
+    uv_name: bpy.props.StringProperty(name="UV Name", default="UV0")
+    filepath: bpy.props.StringProperty(name="File Path", default="//export.fbx", subtype='FILE_PATH')
+
+
+class NaoRunRecipeOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_run_recipe_operator"
+    bl_label = "Run Recipe"
+    bl_description = "Run every recipe step on all meshes in the scene, with weight steps fused into a single pass"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        recipe = steps_to_recipe(context.scene.nao_props.recipe_steps)
+        if not recipe:
+            self.report({'WARNING'}, "The recipe has no steps.")
+            return {'CANCELLED'}
+        if context.object and context.object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        for entry in recipe:
+            if "filepath" in entry:
+                entry["filepath"] = bpy.path.abspath(entry["filepath"])
+        timings = run_recipe(recipe)
+        self.report({'INFO'}, f"Ran {len(recipe)} step(s) in {sum(t['seconds'] for t in timings):.2f}s.")
+        return {'FINISHED'}
+
+
+class NaoLoadRecipeOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_load_recipe_operator"
+    bl_label = "Load Recipe"
+    bl_description = "Replace the recipe steps with the selected game's recipe"
+
+    def execute(self, context):
+        props = context.scene.nao_props
+        path = recipe_files().get(props.recipe_preset)
+        if path is None:
+            self.report({'WARNING'}, "No recipe selected.")
+            return {'CANCELLED'}
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        recipe_to_steps(data["steps"] if isinstance(data, dict) else data, props.recipe_steps)
+        props.recipe_name = data.get("name", props.recipe_preset) if isinstance(data, dict) else props.recipe_preset
+        return {'FINISHED'}
+
+
+class NaoSaveRecipeOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_save_recipe_operator"
+    bl_label = "Save Recipe"
+    bl_description = "Save the recipe steps under the recipe name in your NaoTools config folder"
+
+    def execute(self, context):
+        props = context.scene.nao_props
+        name = props.recipe_name.strip()
+        if not name:
+            self.report({'WARNING'}, "Please enter a recipe name.")
+            return {'CANCELLED'}
+        directory = user_config_directory(USER_RECIPES, create=True)
+        path = os.path.join(directory, f"{bpy.path.clean_name(name).lower()}.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"name": name, "steps": steps_to_recipe(props.recipe_steps)}, file, indent=4)
+        self.report({'INFO'}, f"Saved recipe to {path}")
+        return {'FINISHED'}
+
+
+class NaoRecipeStepAddOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_recipe_step_add_operator"
+    bl_label = "Add Step"
+
+    def execute(self, context):
+        context.scene.nao_props.recipe_steps.add()
+        return {'FINISHED'}
+
+
+class NaoRecipeStepRemoveOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_recipe_step_remove_operator"
+    bl_label = "Remove Step"
+
+    index: bpy.props.IntProperty()
+
+    def execute(self, context):
+        steps = context.scene.nao_props.recipe_steps
+        if 0 <= self.index < len(steps):
+            steps.remove(self.index)
+        return {'FINISHED'}
+
+
+def draw_recipe(layout, props):
+    row = layout.row(align=True)
+    row.prop(props, "recipe_preset", text="")
+    row.operator("wm.nao_load_recipe_operator", text="", icon='IMPORT')
+
+    for index, item in enumerate(props.recipe_steps):
+        box = layout.box()
+        row = box.row(align=True)
+        row.prop(item, "step", text="")
+        row.operator("wm.nao_recipe_step_remove_operator", text="", icon='X').index = index
+        for prop in STEP_FIELDS.get(item.step, {}).values():
+            box.prop(item, prop)
+
+    layout.operator("wm.nao_recipe_step_add_operator", icon='ADD')
+    row = layout.row(align=True)
+    row.prop(props, "recipe_name", text="")
+    row.operator("wm.nao_save_recipe_operator", text="", icon='FILE_TICK')
+    layout.operator("wm.nao_run_recipe_operator")
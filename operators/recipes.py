@@ -0,0 +1,125 @@
+import os
+import time
+
+import bpy
+
+from .clear_unused_weights import clear_unused_groups
+from .optimize_vertex_cache import optimize_vertex_cache
+from .profiling import phase
+from .rename_uv import rename_uv_maps
+from .split_by_material import split_by_material
+from .triangulate_faces import triangulate_mesh
+from ..core.weights import WEIGHT_STEPS
+from .weight_io import apply_weight_steps, limit_weights, normalize_weights
+
+
+def mesh_objects():
+    return [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+
+
+def limit_weights_step(objects, limit=4, normalize=True):
+    limit_weights(objects, limit, normalize)
+
+
+def normalize_step(objects):
+    normalize_weights(objects)
+
+
+def quantize_weights_step(objects, bits=8):
+    apply_weight_steps(objects, [("quantize_weights", {"bits": bits})], lock=True)
+
+
+def rename_uv_step(objects, name="UV0"):
+    rename_uv_maps(objects, name)
+
+
+def triangulate_step(objects, quad_method='BEAUTY', ngon_method='BEAUTY'):
+    for mesh in {obj.data for obj in objects}:
+        triangulate_mesh(mesh, quad_method, ngon_method)
+
+
+def optimize_vertex_cache_step(objects, cache_size=32):
+    for mesh in {obj.data for obj in objects}:
+        optimize_vertex_cache(mesh, cache_size)
+
+
+def split_by_material_step(objects):
+    for obj in objects:
+        if obj.data.materials and obj.data.polygons:
+            split_by_material(obj)
+
+
+def clear_unused_weights_step(objects, threshold=0.0):
+    for obj in objects:
+        if obj.vertex_groups:
+            clear_unused_groups(obj, threshold)
+
+
+def export_step(objects, filepath, format='FBX', **options):
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    if format == 'FBX':
+        bpy.ops.export_scene.fbx(filepath=filepath, **options)
+    elif format == 'BLEND':
+        bpy.ops.wm.save_as_mainfile(filepath=filepath, copy=True)
+    else:
+        raise ValueError(f"Unknown export format '{format}'")
+
+
+# Recipe steps by name. Each takes the scene's mesh objects and the step's options.
+STEPS = {
+    "limit_weights": limit_weights_step,
+    "normalize": normalize_step,
+    "quantize_weights": quantize_weights_step,
+    "rename_uv": rename_uv_step,
+    "triangulate": triangulate_step,
+    "optimize_vertex_cache": optimize_vertex_cache_step,
+    "split_by_material": split_by_material_step,
+    "clear_unused_weights": clear_unused_weights_step,
+    "export": export_step,
+}
+
+
+def validate_recipe(recipe):
+    """Raise ValueError for recipe entries that don't name a known step."""
+    for entry in recipe:
+        if entry.get("step") not in STEPS:
+            raise ValueError(f"Unknown recipe step '{entry.get('step')}'")
+
+
+def recipe_stages(recipe):
+    """Group a recipe into stages, merging runs of consecutive weight steps into one."""
+    stages = []
+    for entry in recipe:
+        fused = entry["step"] in WEIGHT_STEPS
+        if fused and stages and stages[-1][0]:
+            stages[-1][1].append(entry)
+        else:
+            stages.append((fused, [entry]))
+    return stages
+
+
+def run_recipe(recipe, variables=None):
+    """Run a recipe, a list of {"step": name, **options} dicts, on the current scene.
+
+    Consecutive weight steps are fused so each mesh's weights are read and
+    written once for the whole run. String options are formatted with
+    ``variables``, so an export path can use "{output}/{stem}.fbx". Returns
+    the time spent in each stage.
+    """
+    validate_recipe(recipe)
+    variables = variables or {}
+    timings = []
+    for fused, entries in recipe_stages(recipe):
+        steps = [(entry["step"], {key: value.format(**variables) if isinstance(value, str) else value
+                                  for key, value in entry.items() if key != "step"})
+                 for entry in entries]
+        label = "+".join(name for name, _options in steps)
+        start = time.perf_counter()
+        with phase(label):
+            if fused:
+                apply_weight_steps(mesh_objects(), steps, lock=True)
+            else:
+                name, options = steps[0]
+                STEPS[name](mesh_objects(), **options)
+        timings.append({"step": label, "seconds": time.perf_counter() - start})
+    return timings
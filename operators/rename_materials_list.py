@@ -1,46 +1,127 @@
 import bpy
+import json
+import os
+import re
+
+from .config_files import ADDON_DIRECTORY, config_files
+
+BUILTIN_PROFILES = os.path.join(ADDON_DIRECTORY, "material_profiles")
+# Folder of the user's own files in Blender's config directory
+USER_PROFILES = "naotools_material_profiles"
+
+# Blender's ".001" style suffix added when a name is already taken
+DUPLICATE_SUFFIX = re.compile(r"\.\d{3,}$")
+
+# Blender needs the enum items to outlive the callback that returns them
+_profile_items = []
+
+
+def profile_files():
+    """Map profile file stems to paths, user profiles overriding the built-in ones."""
+    return config_files(USER_PROFILES, BUILTIN_PROFILES)
+
+
+def profile_items(self, context):
+    _profile_items.clear()
+    for key in profile_files():
+        _profile_items.append((key, key.replace("_", " ").title(), ""))
+    if not _profile_items:
+        _profile_items.append(('NONE', "No Profiles", ""))
+    return _profile_items
+
+
+def load_profile(key):
+    """Material names of a profile, one per material slot."""
+    path = profile_files().get(key)
+    if path is None:
+        raise ValueError(f"Unknown material profile '{key}'")
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    materials = profile.get("materials")
+    if not isinstance(materials, list) or not all(isinstance(name, str) for name in materials):
+        raise ValueError(f"Material profile '{key}' needs a \"materials\" list of names")
+    return materials
+
+
+def target_material(material, target_name, in_place, cache):
+    """Material named ``target_name`` standing in for ``material``, made at most once per source."""
+    if material is None:
+        key = (None, target_name)
+    else:
+        if DUPLICATE_SUFFIX.sub("", material.name) == target_name:
+            return material
+        key = (material.name, target_name)
+    if key in cache:
+        return cache[key]
+
+    existing = bpy.data.materials.get(target_name)
+    if material is None:
+        result = existing or bpy.data.materials.new(name=target_name)
+    elif existing is not None and existing.get("nao_rename_source") == material.name:
+        # Made by an earlier run from this same material
+        result = existing
+    elif in_place and material.users == 1:
+        material.name = target_name
+        result = material
+    else:
+        result = material.copy()
+        result.name = target_name
+        result["nao_rename_source"] = material.name
+    cache[key] = result
+    return result
+
+
+def rename_materials(objects, names, in_place=False):
+    """Give the first len(names) material slots of every object the profile's materials.
+
+    Returns how many slots were assigned and how many materials were created.
+    """
+    cache = {}
+    before = len(bpy.data.materials)
+    assigned = 0
+    for obj in objects:
+        for slot, target_name in zip(obj.material_slots, names):
+            material = target_material(slot.material, target_name, in_place, cache)
+            if slot.material != material:
+                slot.material = material
+            assigned += 1
+    return assigned, len(bpy.data.materials) - before
+
 
 class NaoRenameMaterialsListOperator(bpy.types.Operator):
     bl_idname = "wm.nao_rename_materials_list_operator"
-    bl_label = "Rename Materials for Aigis (051)"
-    bl_description = "Renames Aigis's mats to match her mat slot ids"
+    bl_label = "Rename Materials from Profile"
+    bl_description = "Renames mats to match the mat slot ids of the selected profile"
     bl_options = {'REGISTER', 'UNDO'}
 
+    batch: bpy.props.BoolProperty(
+        name="All Selected",
+        description="Rename the materials of every selected mesh instead of only the active one",
+        default=False
+    )
+    in_place: bpy.props.BoolProperty(
+        name="Rename in Place",
+        description="Rename materials that only one slot uses instead of copying them",
+        default=False
+    )
+
     def execute(self, context):
-        obj = context.active_object
-        
-        if not obj or obj.type != 'MESH':
+        if self.batch:
+            objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        else:
+            obj = context.active_object
+            objects = [obj] if obj and obj.type == 'MESH' else []
+
+        if not objects:
             self.report({'WARNING'}, "Please select a mesh object.")
             return {'CANCELLED'}
 
-        target_names = [
-            "M_00_FuMeMk_00",
-            "M_00_FuBaMk_00",
-            "M_02_FuBaMk_00",
-            "M_00_FuBaMk_00_OlMk",
-            "M_02_FuBaMk_00_OlMk",
-            "M_00_FuMeMk_65_OlMk",
-            "M_00_FuMeMk_60_OlMk",
-            "M_00_FuBaMk_65",
-            "M_00_FuBaMk_60",
-            "M_00_FuMeMk_65",
-            "M_00_FuMeMk_60"
-        ]
-
-        # Iterate through slots and assign names based on the list
-        for i, slot in enumerate(obj.material_slots):
-            if i >= len(target_names):
-                break
-            
-            target_name = target_names[i]
-            
-            if slot.material:
-                new_mat = slot.material.copy()
-                new_mat.name = target_name
-                slot.material = new_mat
-            else:
-                new_mat = bpy.data.materials.new(name=target_name)
-                slot.material = new_mat
-
-        self.report({'INFO'}, f"Renamed {min(len(obj.material_slots), len(target_names))} materials.")
-        return {'FINISHED'}
\ No newline at end of file
+        try:
+            names = load_profile(context.scene.nao_props.material_profile)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        assigned, created = rename_materials(objects, names, self.in_place)
+        self.report({'INFO'}, f"Renamed {assigned} materials on {len(objects)} mesh(es), created {created}.")
+        return {'FINISHED'}
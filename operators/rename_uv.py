@@ -1,5 +1,16 @@
 import bpy
 
+from .change_tracking import changed_objects, mark_clean
+
+
+def rename_uv_maps(objects, name):
+    """Give every UV map of the given mesh objects ``name``."""
+    for obj in objects:
+        if obj.type == 'MESH':
+            for uv_map in obj.data.uv_layers:
+                uv_map.name = name
+
+
 class NaoRenameUVOperator(bpy.types.Operator):
     bl_idname = "wm.nao_rename_uv_operator"
     bl_label = "Rename UV Maps"
@@ -7,8 +18,10 @@ class NaoRenameUVOperator(bpy.types.Operator):
     uv_map_name: bpy.props.StringProperty(name="UV Name", default="UV0")
 
     def execute(self, context):
-        for obj in bpy.context.scene.objects:
-            if obj.type == 'MESH':
-                for uv_map in obj.data.uv_layers:
-                    uv_map.name = context.scene.nao_custom_uv_name
+        objects = [obj for obj in context.scene.objects if obj.type == 'MESH']
+        operation = f"rename_uv:{context.scene.nao_custom_uv_name}"
+        if context.scene.nao_props.only_changed:
+            objects = changed_objects(operation, objects)
+        rename_uv_maps(objects, context.scene.nao_custom_uv_name)
+        mark_clean(operation, objects)
         return {'FINISHED'}
@@ -1,24 +1,96 @@
 import bpy
 
+from ..core.skeleton import diff, diff_json, diff_text, hierarchy_json, hierarchy_text
+
+SKELETON_OUTPUT_ITEMS = [
+    ('CONSOLE', "Console", "Print to the system console"),
+    ('CLIPBOARD', "Clipboard", "Copy to the clipboard"),
+    ('TEXT', "Text File", "Write an indented text file"),
+    ('JSON', "JSON File", "Write a JSON file"),
+]
+
+
+def read_bones(armature):
+    """Rest pose of every bone as plain dicts, in the armature's bone order."""
+    bones = []
+    for bone in armature.bones:
+        matrix = bone.matrix_local
+        bones.append({
+            "name": bone.name,
+            "parent": bone.parent.name if bone.parent else None,
+            "head": tuple(bone.head_local),
+            "tail": tuple(bone.tail_local),
+            "roll": bpy.types.Bone.AxisRollFromMatrix(matrix.to_3x3())[1],
+            "matrix": [list(row) for row in matrix],
+        })
+    return bones
+
+
+def write_output(context, output, filepath, text):
+    """Send the whole buffer out in one write, returns where it went."""
+    if output == 'CONSOLE':
+        print(text, end="")
+        return "the console"
+    if output == 'CLIPBOARD':
+        context.window_manager.clipboard = text
+        return "the clipboard"
+    path = bpy.path.abspath(filepath)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
 class SkeletonPrinterOperator(bpy.types.Operator):
     bl_idname = "wm.skeleton_printer_operator"
     bl_label = "Skeleton Printer"
     bl_options = {'REGISTER', 'UNDO'}
 
-    def print_hierarchy(self, bone, level=0):
-        print("\t" * level + bone.name)
-        for child in bone.children:
-            self.print_hierarchy(child, level + 1)
-
     def execute(self, context):
         selected_obj = context.active_object
-        if selected_obj and selected_obj.type == 'ARMATURE':
-            print("Hierarchy for Armature:", selected_obj.name)
-            for bone in selected_obj.data.bones:
-                if not bone.parent:
-                    self.print_hierarchy(bone, 1)
-            return {'FINISHED'}
-        else:
-            print("Please select an armature object.")
+        if not selected_obj or selected_obj.type != 'ARMATURE':
             self.report({'WARNING'}, "Please select an armature object.")
             return {'CANCELLED'}
+
+        props = context.scene.nao_props
+        bones = read_bones(selected_obj.data)
+        if props.skeleton_output == 'JSON':
+            text = hierarchy_json(selected_obj.name, bones)
+        else:
+            text = hierarchy_text(selected_obj.name, bones, transforms=props.skeleton_transforms)
+        target = write_output(context, props.skeleton_output, props.skeleton_filepath, text)
+        self.report({'INFO'}, f"Wrote {len(bones)} bones to {target}")
+        return {'FINISHED'}
+
+
+class NaoSkeletonDiffOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_skeleton_diff_operator"
+    bl_label = "Skeleton Diff"
+    bl_description = "Compare the active armature with the other selected armature"
+
+    tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Distance a bone's head or tail may move before it counts as moved",
+        default=1e-4,
+        min=0.0
+    )
+
+    def execute(self, context):
+        reference = context.active_object
+        others = [obj for obj in context.selected_objects if obj.type == 'ARMATURE' and obj != reference]
+        if not reference or reference.type != 'ARMATURE' or len(others) != 1:
+            self.report({'WARNING'}, "Select two armatures, the active one is the reference.")
+            return {'CANCELLED'}
+
+        other = others[0]
+        report = diff(read_bones(reference.data), read_bones(other.data), self.tolerance)
+        props = context.scene.nao_props
+        if props.skeleton_output == 'JSON':
+            text = diff_json(reference.name, other.name, report)
+        else:
+            text = diff_text(reference.name, other.name, report)
+        target = write_output(context, props.skeleton_output, props.skeleton_diff_filepath, text)
+        self.report({'INFO'}, f"{len(report['missing'])} missing, {len(report['extra'])} extra, "
+                              f"{len(report['reparented'])} reparented, {len(report['moved'])} moved, "
+                              f"written to {target}")
+        return {'FINISHED'}
+
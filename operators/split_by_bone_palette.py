@@ -0,0 +1,71 @@
+import bpy
+import numpy as np
+
+from ..core.palette import duplicated_vertices, palette_partition
+from ..core.partition import group_faces
+from .mesh_io import mesh_topology, read_array
+from .profiling import phase
+from .split_by_material import split_faces
+from .weight_io import ensure_object_mode, read_weights
+
+
+def split_by_bone_palette(obj, budget):
+    """Split a mesh object so no material of any piece is skinned by more than ``budget`` bones.
+
+    Each material's faces are clustered on their own and cluster ``k`` of
+    every material goes to piece ``k``, so a piece draws each of its
+    materials once. Returns the pieces and stats about the split.
+    """
+    mesh = obj.data
+    with phase("bone sets"):
+        loop_starts, loop_totals, loop_verts, _loop_edges, _edge_verts = mesh_topology(mesh)
+        material_indices = read_array(mesh.polygons, "material_index", np.int32)
+        material_indices = np.clip(material_indices, 0, max(len(mesh.materials) - 1, 0))
+        clusters, palettes = palette_partition(loop_starts, loop_totals, loop_verts, read_weights(obj),
+                                               budget, material_indices)
+    stats = {
+        "object": obj.name,
+        "pieces": int(clusters.max()) + 1 if len(clusters) else 0,
+        "draw_calls": sum(len(group) for group in palettes.values()),
+        "over_budget": sum(len(palette) > budget for group in palettes.values() for palette in group),
+        "duplicated": duplicated_vertices(clusters, loop_starts, loop_totals, loop_verts),
+    }
+    if stats["pieces"] <= 1:
+        return [obj], stats
+
+    with phase("split"):
+        keys, face_sets = group_faces(clusters)
+        names = [obj.name] + [f"{obj.name}_palette{key}" for key in keys.tolist()[1:]]
+        return split_faces(obj, face_sets, names), stats
+
+
+class NaoSplitByBonePaletteOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_split_by_bone_palette_operator"
+    bl_label = "Split by Bone Palette"
+    bl_description = "Split the selected meshes so each material of each piece uses at most the given number of bones"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    budget: bpy.props.IntProperty(
+        name="Bones per Draw",
+        description="Most distinct vertex groups a single draw call may be skinned with",
+        default=64,
+        min=1,
+        max=1024
+    )
+
+    def execute(self, context):
+        objects = [obj for obj in context.selected_objects
+                   if obj.type == 'MESH' and obj.vertex_groups and obj.data.polygons]
+        if not objects:
+            self.report({'WARNING'}, "Please select a mesh object with vertex groups.")
+            return {'CANCELLED'}
+
+        ensure_object_mode(context)
+        stats = [entry for _pieces, entry in (split_by_bone_palette(obj, self.budget) for obj in objects)]
+        over = sum(entry["over_budget"] for entry in stats)
+        message = ", ".join(f"{entry['object']}: {entry['pieces']} ({entry['draw_calls']} draw calls)"
+                            for entry in stats)
+        self.report({'WARNING'} if over else {'INFO'},
+                    f"Pieces per mesh: {message}. {sum(entry['duplicated'] for entry in stats)} boundary vertices duplicated."
+                    + (f" {over} face bone set(s) exceed the budget on their own." if over else ""))
+        return {'FINISHED'}
@@ -1,4 +1,77 @@
 import bpy
+import numpy as np
+
+from ..core.partition import group_faces, loose_elements, merge_slots, submesh
+from ..core.weights import subset
+from .mesh_io import build_submesh, copy_shape_keys, custom_loop_normals, mesh_topology, read_array
+from .weight_io import add_weights, ensure_object_mode, match_vertex_groups, read_weights
+
+
+def split_faces(obj, face_sets, names):
+    """Split a mesh object into one object per face set, straight from the mesh arrays.
+
+    The original object keeps the first set's faces along with the loose
+    edges and vertices, as separating in edit mode does. Every piece keeps
+    its shape keys and only the material slots its faces use, so unused
+    slots are dropped in the same pass. Returns the objects holding the
+    pieces.
+    """
+    mesh = obj.data
+    material_indices = read_array(mesh.polygons, "material_index", np.int32)
+    material_indices = np.clip(material_indices, 0, max(len(mesh.materials) - 1, 0))
+    slot_keys = list(range(len(mesh.materials)))
+
+    topology = mesh_topology(mesh)
+    loose = loose_elements(len(mesh.vertices), topology[2], topology[3], topology[4])
+    loop_normals = custom_loop_normals(mesh)
+    weights = read_weights(obj) if obj.vertex_groups else None
+    group_names = [group.name for group in obj.vertex_groups]
+    active_group = obj.vertex_groups.active_index
+    cache = {}
+
+    pieces = []
+    for name, faces in zip(names, face_sets):
+        sub = submesh(faces, *topology, *(loose if not pieces else ()))
+        new_mesh = build_submesh(mesh, sub, name, loop_normals, cache)
+        slots, face_slots = merge_slots(material_indices[sub.faces], slot_keys)
+        for slot in slots:
+            new_mesh.materials.append(mesh.materials[slot])
+        new_mesh.polygons.foreach_set("material_index", face_slots.astype(np.int32))
+        pieces.append((name, new_mesh, sub))
+
+    objects = [obj]
+    for name, new_mesh, sub in pieces[1:]:
+        piece = obj.copy()
+        piece.name = name
+        for collection in obj.users_collection:
+            collection.objects.link(piece)
+        objects.append(piece)
+
+    for piece, (name, new_mesh, sub) in zip(objects, pieces):
+        piece.data = new_mesh
+        if weights is not None:
+            match_vertex_groups(piece, group_names)
+            piece.vertex_groups.active_index = active_group
+            add_weights(piece, subset(weights, sub.verts))
+        copy_shape_keys(mesh, piece, sub.verts, cache)
+
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+    return objects
+
+
+def split_by_material(obj):
+    """Split a mesh object into one object per used material, see split_faces."""
+    mesh = obj.data
+    material_indices = read_array(mesh.polygons, "material_index", np.int32)
+    material_indices = np.clip(material_indices, 0, len(mesh.materials) - 1)
+    keys, face_sets = group_faces(material_indices)
+    if len(keys) == 1 and len(mesh.materials) == 1:
+        return [obj]
+    names = [f"{obj.name}_{mesh.materials[key].name}" if mesh.materials[key] else obj.name
+             for key in keys.tolist()]
+    return split_faces(obj, face_sets, names)
+
 
 class NaoSplitByMaterialOperator(bpy.types.Operator):
     bl_idname = "wm.nao_split_by_material_operator"
@@ -6,11 +79,10 @@ class NaoSplitByMaterialOperator(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        for obj in bpy.context.selected_objects:
-            if obj.type == 'MESH' and obj.data.materials:
-                bpy.context.view_layer.objects.active = obj
-                bpy.ops.object.mode_set(mode='EDIT')
-                bpy.ops.mesh.select_all(action='SELECT')
-                bpy.ops.mesh.separate(type='MATERIAL')
-                bpy.ops.object.mode_set(mode='OBJECT')
+        ensure_object_mode(context)
+        count = 0
+        for obj in list(context.selected_objects):
+            if obj.type == 'MESH' and obj.data.materials and obj.data.polygons:
+                count += len(split_by_material(obj))
+        self.report({'INFO'}, f"Split into {count} mesh(es).")
         return {'FINISHED'}
@@ -0,0 +1,96 @@
+import numpy as np
+from bpy.app.handlers import persistent
+from mathutils.bvhtree import BVHTree
+
+from ..core.fingerprint import array_fingerprint
+from ..core.transfer import transform_normals
+from .mesh_io import loop_polygon_indices, read_array, read_loop_normals, read_loop_triangles
+
+# Source surfaces keyed by object pointer, reused while the fingerprint matches. Only the most
+# recently built ones are kept, each holds a BVH tree and a copy of its mesh.
+SURFACE_CACHE_SIZE = 4
+_surface_cache = {}
+
+
+class SourceSurface:
+    """World space triangles of a source mesh with a BVH tree for closest point queries."""
+
+    def __init__(self, coords, tri_verts, tri_loops, loop_normals, fingerprint):
+        self.coords = coords
+        self.tri_verts = tri_verts
+        self.tri_loops = tri_loops
+        self.loop_normals = loop_normals
+        self.fingerprint = fingerprint
+        self.tree = BVHTree.FromPolygons(coords.tolist(), tri_verts.tolist(), all_triangles=True)
+
+    def nearest(self, points):
+        """Find the closest surface point to each of the (N, 3) world space ``points``.
+
+        BVHTree only answers one point per call, so this is still a Python
+        loop over the points, everything around it is vectorized. Returns the
+        hit locations and the index of the hit triangle, -1 where nothing was
+        found.
+        """
+        locations = np.array(points, dtype=np.float64, copy=True)
+        faces = np.full(len(points), -1, dtype=np.int64)
+        find_nearest = self.tree.find_nearest
+        for i, co in enumerate(locations.tolist()):
+            location, _normal, index, _distance = find_nearest(co)
+            if index is not None:
+                locations[i] = location
+                faces[i] = index
+        return locations, faces
+
+
+def world_coords(obj, mesh):
+    matrix = np.array(obj.matrix_world)
+    coords = read_array(mesh.vertices, "co", np.float32, 3).astype(np.float64)
+    return coords @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def source_surface(obj, depsgraph):
+    """Return the cached SourceSurface of an object, rebuilding it only when its evaluated mesh changed."""
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        coords = world_coords(obj, mesh)
+        tri_loops = read_loop_triangles(mesh)
+        loop_vertices = read_array(mesh.loops, "vertex_index", np.int32)
+        normals = transform_normals(read_loop_normals(mesh), np.array(obj.matrix_world.to_3x3()))
+    finally:
+        evaluated.to_mesh_clear()
+
+    fingerprint = array_fingerprint(coords, tri_loops, normals)
+    key = obj.as_pointer()
+    surface = _surface_cache.get(key)
+    if surface is None or surface.fingerprint != fingerprint:
+        surface = SourceSurface(coords, loop_vertices[tri_loops], tri_loops, normals, fingerprint)
+    # Move it to the end so the least recently used surface is the one dropped
+    _surface_cache.pop(key, None)
+    _surface_cache[key] = surface
+    while len(_surface_cache) > SURFACE_CACHE_SIZE:
+        del _surface_cache[next(iter(_surface_cache))]
+    return surface
+
+
+@persistent
+def clear_surface_cache(*args):
+    """Drop every cached surface, a loaded file can reuse the pointers they are keyed by."""
+    _surface_cache.clear()
+
+
+def loop_query_points(obj, nudge=1e-3):
+    """World space query points for every loop of ``obj``.
+
+    Each point is pulled slightly towards its face center so loops on either
+    side of a hard edge land on the matching side of the source.
+    """
+    mesh = obj.data
+    matrix = np.array(obj.matrix_world)
+    coords = read_array(mesh.vertices, "co", np.float32, 3).astype(np.float64)
+    centers = read_array(mesh.polygons, "center", np.float32, 3).astype(np.float64)
+    loop_vertices = read_array(mesh.loops, "vertex_index", np.int32)
+    loop_polygons = loop_polygon_indices(mesh)
+    points = coords[loop_vertices]
+    points += (centers[loop_polygons] - points) * nudge
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
@@ -0,0 +1,95 @@
+import bpy
+import numpy as np
+
+from ..core.transfer import merge_weights, transfer_weights
+from ..core.weights import WeightTable
+from .mesh_io import read_array, read_loop_triangles
+from .profiling import phase
+from .surface_query import SourceSurface, world_coords
+from .weight_io import add_weights, ensure_object_mode, locked_groups, read_weights, weight_bits, write_weights
+
+
+def weight_surface(obj):
+    """SourceSurface over the undeformed mesh of ``obj``, so hit triangles index its vertex groups."""
+    mesh = obj.data
+    tri_loops = read_loop_triangles(mesh)
+    loop_verts = read_array(mesh.loops, "vertex_index", np.int32)
+    return SourceSurface(world_coords(obj, mesh), loop_verts[tri_loops], tri_loops, None, None)
+
+
+def transfer_to(surface, table, names, target, steps):
+    """Replace the weights ``target`` has in the source's groups with the ones under its vertices.
+
+    Groups the target is missing are created for the weights that land in
+    them. The steps run over all of a vertex's weights, its other groups
+    included, and groups locked on the target are left as they are.
+    Returns the number of weights assigned.
+    """
+    with phase("query"):
+        locations, faces = surface.nearest(world_coords(target, target.data))
+    with phase("interpolate"):
+        result = transfer_weights(table, locations, faces, surface.coords, surface.tri_verts)
+
+    with phase("merge"):
+        groups = target.vertex_groups
+        mapping = np.full(len(names), -1, dtype=np.int32)
+        for group in np.unique(result.groups).tolist():
+            mapping[group] = (groups.get(names[group]) or groups.new(name=names[group])).index
+        existing = read_weights(target)
+        replaced = np.zeros(len(groups), dtype=bool)
+        replaced[[groups[name].index for name in names if name in groups]] = True
+        incoming = WeightTable(result.verts, mapping[result.groups], result.weights, result.vertex_count, len(groups))
+        keep, weights, added = merge_weights(existing, incoming, replaced, steps,
+                                             locked_groups(target, lock_active=False))
+
+    with phase("write weights"):
+        write_weights(target, existing, keep, weights)
+        add_weights(target, added)
+    return len(added)
+
+
+class NaoTransferWeightsOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_transfer_weights_operator"
+    bl_label = "Transfer Weights"
+    bl_description = ("Copy the weights of the active mesh onto the other selected meshes from the closest point "
+                      "of its surface, limited and normalized in the same pass")
+    bl_options = {'REGISTER', 'UNDO'}
+
+    limit: bpy.props.BoolProperty(
+        name="Limit",
+        description="Keep only the Max Vertex Groups heaviest weights of each vertex",
+        default=True
+    )
+    normalize: bpy.props.BoolProperty(
+        name="Normalize",
+        description="Rescale the weights of each vertex to add up to 1, quantized when Weight Precision is set",
+        default=True
+    )
+
+    def execute(self, context):
+        source = context.active_object
+        if source is None or source.type != 'MESH' or not source.vertex_groups:
+            self.report({'WARNING'}, "Please make the mesh with the weights to copy the active object.")
+            return {'CANCELLED'}
+        targets = list({obj.data: obj for obj in context.selected_objects
+                        if obj.type == 'MESH' and obj.data != source.data}.values())
+        if not targets:
+            self.report({'WARNING'}, "Please select the meshes to copy the weights to as well.")
+            return {'CANCELLED'}
+
+        props = context.scene.nao_props
+        bits = weight_bits(props)
+        steps = []
+        if self.limit:
+            steps.append(("limit_weights", {"limit": props.max_vertex_groups, "normalize": False}))
+        if self.normalize:
+            steps.append(("quantize_weights", {"bits": bits}) if bits else ("normalize", {}))
+
+        ensure_object_mode(context)
+        with phase("source"):
+            surface = weight_surface(source)
+            table = read_weights(source)
+        names = [group.name for group in source.vertex_groups]
+        assigned = sum(transfer_to(surface, table, names, target, steps) for target in targets)
+        self.report({'INFO'}, f"Transferred {assigned} weights from {source.name} to {len(targets)} mesh(es).")
+        return {'FINISHED'}
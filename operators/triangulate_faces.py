@@ -1,4 +1,61 @@
 import bpy
+import bmesh
+import numpy as np
+
+from .mesh_io import read_array, read_loop_normals, set_custom_normals
+from .weight_io import ensure_object_mode
+
+TEMP_NORMALS = "nao_temp_normals"
+
+
+def is_triangulated(mesh):
+    return bool(np.all(read_array(mesh.polygons, "loop_total", np.int32) == 3))
+
+
+def stash_custom_normals(mesh):
+    """Copy custom normals into a temporary corner attribute that bmesh carries along.
+
+    Returns False when the mesh has no custom normals to keep.
+    """
+    if not mesh.has_custom_normals:
+        return False
+    normals = mesh.attributes.new(TEMP_NORMALS, 'FLOAT_VECTOR', 'CORNER')
+    normals.data.foreach_set("vector", read_loop_normals(mesh).ravel())
+    return True
+
+
+def restore_custom_normals(mesh):
+    """Set custom normals back from the attribute written by stash_custom_normals and remove it."""
+    normals = mesh.attributes[TEMP_NORMALS]
+    loop_normals = read_array(normals.data, "vector", np.float32, 3)
+    mesh.attributes.remove(normals)
+    set_custom_normals(mesh, loop_normals)
+
+
+def triangulate_mesh(mesh, quad_method='BEAUTY', ngon_method='BEAUTY'):
+    """Triangulate a mesh through bmesh without entering edit mode.
+
+    Custom normals are stashed in a temporary corner attribute, which bmesh
+    copies onto the loops of the new triangles along with every other loop
+    attribute, and set again afterwards. Returns False when the mesh was
+    already all triangles.
+    """
+    if is_triangulated(mesh):
+        return False
+
+    has_custom_normals = stash_custom_normals(mesh)
+
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bmesh.ops.triangulate(bm, faces=bm.faces, quad_method=quad_method, ngon_method=ngon_method)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    if has_custom_normals:
+        restore_custom_normals(mesh)
+    mesh.update()
+    return True
+
 
 class NaoTriangulateOperator(bpy.types.Operator):
     bl_idname = "wm.nao_triangulate_operator"
@@ -6,11 +63,8 @@ class NaoTriangulateOperator(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        for obj in bpy.context.selected_objects:
-            if obj.type == 'MESH':
-                bpy.context.view_layer.objects.active = obj
-                bpy.ops.object.mode_set(mode='EDIT')
-                bpy.ops.mesh.select_all(action='SELECT')
-                bpy.ops.mesh.quads_convert_to_tris()
-                bpy.ops.object.mode_set(mode='OBJECT')
+        ensure_object_mode(context)
+        meshes = {obj.data for obj in context.selected_objects if obj.type == 'MESH'}
+        triangulated = sum(1 for mesh in meshes if triangulate_mesh(mesh))
+        self.report({'INFO'}, f"Triangulated {triangulated} mesh(es), {len(meshes) - triangulated} already triangulated.")
         return {'FINISHED'}
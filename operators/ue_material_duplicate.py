@@ -1,38 +1,69 @@
 import bpy
+import numpy as np
+
+from ..core.partition import tiled_submesh
+from ..core.weights import tile
+from .mesh_io import build_submesh, copy_shape_keys, custom_loop_normals, mesh_topology, read_array
+from .weight_io import add_weights, ensure_object_mode, match_vertex_groups, read_weights
 
 
 def duplicate_and_merge_mesh_with_its_materials():
+    """Merge one copy per material slot into the selected mesh.
+
+    Returns the selected object and its number of material slots, or None
+    when the selection was rejected with a popup.
+    """
     selected_objects = bpy.context.selected_objects
     if len(selected_objects) != 1:
         bpy.context.window_manager.popup_menu(warn_no_selection, title="Warning", icon='ERROR')
-        return
+        return None
 
     selected_mesh = selected_objects[0]
 
     if selected_mesh.type != 'MESH':
         bpy.context.window_manager.popup_menu(warn_not_mesh, title="Warning", icon='ERROR')
-        return
-
-    materials = selected_mesh.data.materials
-    new_meshes = []
-
-    for material in materials:
-        new_mesh = selected_mesh.copy()
-        new_mesh.data = selected_mesh.data.copy()
-        new_mesh.data.materials.clear()
-        new_mesh.data.materials.append(material)
-        bpy.context.collection.objects.link(new_mesh)
-        new_meshes.append(new_mesh)
-
-    bpy.context.view_layer.objects.active = selected_mesh
-    bpy.ops.object.select_all(action='DESELECT')
-    selected_mesh.select_set(True)
-
-    for new_mesh in new_meshes:
-        new_mesh.select_set(True)
-
-    bpy.ops.object.join()
-    print(f"Duplicated {selected_mesh.name} {len(materials)} times and merged the meshes back into the original.")
+        return None
+
+    mesh = selected_mesh.data
+    materials = list(mesh.materials)
+    if not materials:
+        return selected_mesh, 0
+    weights = read_weights(selected_mesh) if selected_mesh.vertex_groups else None
+    group_names = [group.name for group in selected_mesh.vertex_groups]
+    active_group = selected_mesh.vertex_groups.active_index
+
+    selected_mesh.data, sub = build_material_copies(mesh)
+    if weights is not None:
+        match_vertex_groups(selected_mesh, group_names)
+        selected_mesh.vertex_groups.active_index = active_group
+        add_weights(selected_mesh, tile(weights, len(materials) + 1))
+    copy_shape_keys(mesh, selected_mesh, sub.verts)
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+    return selected_mesh, len(materials)
+
+
+def build_material_copies(mesh):
+    """Build the merged mesh of ``mesh`` plus one full copy of it per material slot.
+
+    The original faces keep their materials and every face of copy ``k``
+    uses slot ``k``, which is what duplicating per material and joining
+    gives. The output is allocated once at its final size and filled with
+    tiled bulk writes, no temporary objects are created. Returns the merged
+    mesh and its SubMesh, whose tiled vertex indices also slice the shape
+    keys once the mesh is on an object (see copy_shape_keys).
+    """
+    copies = len(mesh.materials) + 1
+    sub = tiled_submesh(copies, len(mesh.vertices), *mesh_topology(mesh))
+    merged = build_submesh(mesh, sub, mesh.name, custom_loop_normals(mesh))
+    for material in mesh.materials:
+        merged.materials.append(material)
+
+    face_count = len(mesh.polygons)
+    material_indices = np.repeat(np.arange(-1, copies - 1, dtype=np.int32), face_count)
+    material_indices[:face_count] = read_array(mesh.polygons, "material_index", np.int32)
+    merged.polygons.foreach_set("material_index", material_indices)
+    return merged, sub
 
 
 def warn_no_selection(self, context):
@@ -49,5 +80,13 @@ class UEMaterialDuplicateOperator(bpy.types.Operator):
     bl_description = "Duplicate the selected mesh with its materials"
 
     def execute(self, context):
-        duplicate_and_merge_mesh_with_its_materials()
+        ensure_object_mode(context)
+        result = duplicate_and_merge_mesh_with_its_materials()
+        if result is None:
+            return {'CANCELLED'}
+        obj, copies = result
+        if not copies:
+            self.report({'WARNING'}, f"{obj.name} has no material slots to duplicate.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Duplicated {obj.name} {copies} times and merged the meshes back into the original.")
         return {'FINISHED'}
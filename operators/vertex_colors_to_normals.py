@@ -1,62 +1,83 @@
-import bpy
-import mathutils
-
-# courtesy of Dniwe
-
-class NaoVertexColorsToNormalsOperator(bpy.types.Operator):
-    bl_idname = "wm.nao_vertex_colors_to_normals_operator"
-    bl_label = "Vertex Colors to Normals"
-    bl_options = {'REGISTER', 'UNDO'}
-
-    def execute(self, context):
-        # Get the active object
-        obj = context.active_object
-
-        # Ensure it's a mesh
-        if not obj or obj.type != 'MESH':
-            self.report({'WARNING'}, "Active object is not a mesh")
-            return {'CANCELLED'}
-        
-        # Get the active vertex color layer
-        if not obj.data.vertex_colors:
-             self.report({'WARNING'}, "No active vertex color layer")
-             return {'CANCELLED'}
-
-        color_layer = obj.data.vertex_colors.active
-
-        if color_layer is None:
-            self.report({'WARNING'}, "No active vertex color layer")
-            return {'CANCELLED'}
-        
-        # Create a list to store the new normals
-        new_normals = []
-
-        # Iterate over the polygons (i.e., faces)
-        for poly in obj.data.polygons:
-            # Iterate over the loop indices of the polygon
-            for loop_index in poly.loop_indices:
-                # Get the color of the current vertex
-                color = color_layer.data[loop_index].color
-
-                # Apply gamma correction
-                corrected_color = [pow(c, 2.2) for c in color]
-
-                # Convert the color to a direction vector
-                # (R * 2 - 1, G * 2 - 1, B * 2 - 1)
-                normal = mathutils.Vector((
-                    corrected_color[0] * 2 - 1, 
-                    corrected_color[1] * 2 - 1, 
-                    corrected_color[2] * 2 - 1
-                ))
-
-                # Normalize the vector
-                normal.normalize()
-
-                # Add the normal to the list
-                new_normals.append(normal)
-
-        # Set the new normals
-        obj.data.normals_split_custom_set(new_normals)
-        
-        self.report({'INFO'}, "Successfully converted Vertex Colors to Normals.")
-        return {'FINISHED'}
\ No newline at end of file
+import bpy
+import numpy as np
+
+from ..core.normals import colors_to_normals
+from .mesh_io import set_custom_normals
+
+# courtesy of Dniwe
+
+def active_color_layer(mesh):
+    """Return the active color layer of a mesh with its domain and whether it stores bytes.
+
+    Prefers the color attributes API and falls back to legacy vertex colors.
+    """
+    attributes = getattr(mesh, "color_attributes", None)
+    if attributes is not None:
+        layer = attributes.active_color
+        if layer is not None:
+            return layer, layer.domain, layer.data_type == 'BYTE_COLOR'
+    if mesh.vertex_colors and mesh.vertex_colors.active is not None:
+        return mesh.vertex_colors.active, 'CORNER', True
+    return None, None, False
+
+
+def read_color_layer(layer, is_byte):
+    """Read a color layer into an (N, 4) float32 buffer.
+
+    Returns the buffer and whether it holds raw sRGB byte values, which is
+    what the gamma decode expects.
+    """
+    colors = np.empty((len(layer.data), 4), dtype=np.float32)
+    if isinstance(layer, bpy.types.MeshLoopColorLayer):
+        # Legacy vertex colors hand back the stored bytes as they are
+        layer.data.foreach_get("color", colors.ravel())
+        return colors, True
+    if is_byte and "color_srgb" in bpy.types.ByteColorAttributeValue.bl_rna.properties:
+        layer.data.foreach_get("color_srgb", colors.ravel())
+        return colors, True
+    layer.data.foreach_get("color", colors.ravel())
+    return colors, False
+
+
+def vertex_colors_to_normals(mesh, layer, domain, is_byte):
+    """Set the custom normals of ``mesh`` from a color layer.
+
+    foreach_get can only read a whole collection, so the color buffer is
+    read in one go and peak memory is still one full buffer of colors plus
+    the normals. Only the decode runs in chunks.
+    """
+    colors, quantized = read_color_layer(layer, is_byte)
+    normals = colors_to_normals(colors, gamma=2.2 if quantized else 1.0, quantized=quantized)
+    del colors
+
+    if domain == 'POINT':
+        loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertices)
+        normals = normals[loop_vertices]
+
+    set_custom_normals(mesh, normals)
+
+
+class NaoVertexColorsToNormalsOperator(bpy.types.Operator):
+    bl_idname = "wm.nao_vertex_colors_to_normals_operator"
+    bl_label = "Vertex Colors to Normals"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        # Get the active object
+        obj = context.active_object
+
+        # Ensure it's a mesh
+        if not obj or obj.type != 'MESH':
+            self.report({'WARNING'}, "Active object is not a mesh")
+            return {'CANCELLED'}
+
+        layer, domain, is_byte = active_color_layer(obj.data)
+        if layer is None:
+            self.report({'WARNING'}, "No active vertex color layer")
+            return {'CANCELLED'}
+
+        vertex_colors_to_normals(obj.data, layer, domain, is_byte)
+
+        self.report({'INFO'}, "Successfully converted Vertex Colors to Normals.")
+        return {'FINISHED'}
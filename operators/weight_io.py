@@ -0,0 +1,192 @@
+import bpy
+import numpy as np
+
+from ..core.weights import WeightTable, limit_total, normalize, run_weight_steps, split
+from .profiling import phase
+
+
+def read_weights(obj):
+    """Read every vertex-group assignment of a mesh object into a WeightTable."""
+    vertices = obj.data.vertices
+    counts = np.empty(len(vertices), dtype=np.int32)
+    groups = []
+    weights = []
+    for i, vertex in enumerate(vertices):
+        elements = vertex.groups
+        counts[i] = len(elements)
+        for element in elements:
+            groups.append(element.group)
+            weights.append(element.weight)
+    return WeightTable.from_counts(counts, groups, weights, len(obj.vertex_groups))
+
+
+def write_weights(obj, table, keep, weights):
+    """Write new weights back to a mesh object.
+
+    ``table`` must be the unmodified result of read_weights for ``obj``;
+    ``keep`` marks the entries to retain and ``weights`` holds their new
+    values, both in table order.
+    """
+    vertices = obj.data.vertices
+    starts = np.zeros(table.vertex_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(table.verts, minlength=table.vertex_count), out=starts[1:])
+
+    # Update surviving weights in place before removing anything, removal
+    # reorders the remaining elements of a vertex.
+    changed = keep & (weights != table.weights)
+    changed_idx = np.flatnonzero(changed)
+    if len(changed_idx):
+        new_weights = weights.tolist()
+        changed_list = changed.tolist()
+        starts = starts.tolist()
+        for vi in np.unique(table.verts[changed_idx]).tolist():
+            start = starts[vi]
+            elements = vertices[vi].groups
+            for k in range(starts[vi + 1] - start):
+                if changed_list[start + k]:
+                    elements[k].weight = new_weights[start + k]
+
+    removed = ~keep
+    removed_count = int(removed.sum())
+    if removed_count:
+        removed_verts = table.verts[removed]
+        removed_groups = table.groups[removed]
+        order = np.argsort(removed_groups, kind='stable')
+        removed_verts = removed_verts[order]
+        removed_groups = removed_groups[order]
+        group_ids, group_starts = np.unique(removed_groups, return_index=True)
+        for group_id, chunk in zip(group_ids.tolist(), np.split(removed_verts, group_starts[1:])):
+            obj.vertex_groups[group_id].remove(chunk.tolist())
+    return removed_count
+
+
+def add_weights(obj, table):
+    """Assign every entry of ``table`` to the vertex groups of ``obj``.
+
+    Entries are batched into one vertex_groups add call per distinct
+    (group, weight) pair, which collapses the many full-weight assignments
+    of a typical rig.
+    """
+    if not len(table):
+        return
+    order = np.lexsort((table.weights, table.groups))
+    verts = table.verts[order]
+    groups = table.groups[order]
+    weights = table.weights[order]
+    ends = np.flatnonzero((groups[1:] != groups[:-1]) | (weights[1:] != weights[:-1])) + 1
+    starts = np.r_[0, ends].tolist()
+    ends = np.r_[ends, len(order)].tolist()
+    vertex_groups = obj.vertex_groups
+    for start, end in zip(starts, ends):
+        vertex_groups[int(groups[start])].add(verts[start:end].tolist(), float(weights[start]), 'REPLACE')
+
+
+def match_vertex_groups(obj, names):
+    """Give ``obj`` exactly the vertex groups ``names``, in order.
+
+    Since Blender 3.0 vertex group names live on the mesh, so an object
+    that was just handed a new mesh starts without any.
+    """
+    if [group.name for group in obj.vertex_groups] == names:
+        return
+    obj.vertex_groups.clear()
+    for name in names:
+        obj.vertex_groups.new(name=name)
+
+
+def locked_groups(obj, lock_active=True):
+    """Mask of the vertex groups of ``obj`` that normalizing leaves alone.
+
+    Like Blender's Normalize All these are the groups with their weights
+    locked, plus the active group unless ``lock_active`` is off.
+    """
+    locked = np.array([group.lock_weight for group in obj.vertex_groups], dtype=bool)
+    if lock_active and 0 <= obj.vertex_groups.active_index < len(locked):
+        locked[obj.vertex_groups.active_index] = True
+    return locked
+
+
+def locked_entries(objects, combined):
+    """Mask of the entries of tables concatenated from ``objects`` that sit in a locked group."""
+    locked = np.concatenate([np.zeros(0, dtype=bool)] + [locked_groups(obj) for obj in objects])
+    return locked[combined.groups]
+
+
+def weighted_mesh_objects(objects):
+    """Yield mesh objects with vertex groups, skipping repeat users of the same mesh data."""
+    seen = set()
+    for obj in objects:
+        if obj.type != 'MESH' or not obj.vertex_groups:
+            continue
+        if obj.data in seen:
+            continue
+        seen.add(obj.data)
+        yield obj
+
+
+def weight_bits(props):
+    """Bit depth picked in the panel for quantized weights, 0 for plain float weights."""
+    return 0 if props.weight_precision == 'FLOAT' else int(props.weight_precision)
+
+
+def ensure_object_mode(context):
+    if context.object and context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def limit_weights(objects, limit, renormalize=True):
+    """Limit the influences per vertex of every given mesh in one vectorized pass.
+
+    Returns the number of weight assignments removed.
+    """
+    objects = list(weighted_mesh_objects(objects))
+    with phase("read weights"):
+        tables = [read_weights(obj) for obj in objects]
+    with phase("limit"):
+        combined, offsets = WeightTable.concatenate(tables)
+        keep, weights = limit_total(combined, limit, renormalize)
+
+    removed = 0
+    with phase("write weights"):
+        for obj, table, obj_keep, obj_weights in zip(objects, tables, split(keep, offsets), split(weights, offsets)):
+            removed += write_weights(obj, table, obj_keep, obj_weights)
+    return removed
+
+
+def normalize_weights(objects):
+    """Normalize the weights of every given mesh so each vertex adds up to 1, in one vectorized pass.
+
+    Locked groups and the active group keep their weights, see locked_groups.
+    """
+    objects = list(weighted_mesh_objects(objects))
+    tables = [read_weights(obj) for obj in objects]
+    combined, offsets = WeightTable.concatenate(tables)
+    weights = normalize(combined.verts, combined.weights, combined.vertex_count,
+                        locked=locked_entries(objects, combined))
+    keep = np.ones(len(combined), dtype=bool)
+    for obj, table, obj_keep, obj_weights in zip(objects, tables, split(keep, offsets), split(weights, offsets)):
+        write_weights(obj, table, obj_keep, obj_weights)
+    return len(objects)
+
+
+def apply_weight_steps(objects, steps, lock=False):
+    """Run fused weight steps over every given mesh, reading and writing each mesh's weights once.
+
+    ``steps`` is a list of (name, options) pairs, see core.weights.run_weight_steps.
+    With ``lock`` the normalizing steps leave locked groups alone like
+    normalize_weights does.
+    """
+    objects = list(weighted_mesh_objects(objects))
+    with phase("read weights"):
+        tables = [read_weights(obj) for obj in objects]
+    with phase("weight steps"):
+        combined, offsets = WeightTable.concatenate(tables)
+        keep, weights, unused = run_weight_steps(combined, steps, locked_entries(objects, combined) if lock else None)
+        group_offsets = np.cumsum([0] + [table.group_count for table in tables])
+
+    with phase("write weights"):
+        for i, (obj, table) in enumerate(zip(objects, tables)):
+            write_weights(obj, table, keep[offsets[i]:offsets[i + 1]], weights[offsets[i]:offsets[i + 1]])
+            for index in reversed(np.flatnonzero(unused[group_offsets[i]:group_offsets[i + 1]]).tolist()):
+                obj.vertex_groups.remove(obj.vertex_groups[index])
+    return len(objects)
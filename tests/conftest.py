@@ -0,0 +1,27 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The bpy-free cores import as the top level ``core`` package, as in benchmarks/run.py
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def addon():
+    """The add-on package, loaded under a fixed name like cli.py does. Needs Blender's bpy module."""
+    pytest.importorskip("bpy")
+    import cli
+    return cli.import_addon()
+
+
+@pytest.fixture
+def blender(addon):
+    """An empty scene with the add-on registered."""
+    import bpy
+    addon.register()
+    bpy.ops.wm.read_homefile(use_empty=True)
+    yield bpy
+    addon.unregister()
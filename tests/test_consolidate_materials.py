@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture
+def consolidate(addon):
+    import bpy
+    from naotools.operators import consolidate_materials
+    yield consolidate_materials
+    for material in list(bpy.data.materials):
+        bpy.data.materials.remove(material)
+
+
+def curve_material(name, y):
+    import bpy
+    material = bpy.data.materials.new(name)
+    node = material.node_tree.nodes.new("ShaderNodeRGBCurve")
+    node.mapping.curves[3].points[1].location = (1.0, y)
+    return material
+
+
+def ramp_material(name, position):
+    import bpy
+    material = bpy.data.materials.new(name)
+    node = material.node_tree.nodes.new("ShaderNodeValToRGB")
+    node.color_ramp.elements[1].position = position
+    return material
+
+
+def test_materials_differing_only_in_a_curve_point_are_not_merged(consolidate):
+    first, other, copy = curve_material("A", 1.0), curve_material("B", 0.5), curve_material("A.001", 1.0)
+    canonical = consolidate.canonical_materials([first, other, copy])
+    assert canonical[other.as_pointer()] == other
+    assert canonical[copy.as_pointer()] == first
+
+
+def test_materials_differing_only_in_a_color_ramp_are_not_merged(consolidate):
+    first, other = ramp_material("A", 1.0), ramp_material("B", 0.7)
+    canonical = consolidate.canonical_materials([first, other])
+    assert canonical[other.as_pointer()] == other
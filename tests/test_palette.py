@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from core.palette import bone_sets, pack_palettes
+
+
+def random_faces(face_count, bone_count, seed=0):
+    """(face, bone) pairs sorted by face, as face_bones returns them."""
+    rng = np.random.default_rng(seed)
+    faces = []
+    bones = []
+    for face in range(face_count):
+        face_bones = np.unique(rng.integers(0, bone_count, rng.integers(0, 5))).tolist()
+        faces += [face] * len(face_bones)
+        bones += face_bones
+    return np.array(faces, dtype=np.int64), np.array(bones, dtype=np.int64)
+
+
+def test_bone_sets_number_each_distinct_set_once():
+    pair_faces, pair_bones = random_faces(2000, 8)
+    set_ids, sets, lowest, means = bone_sets(2000, pair_faces, pair_bones)
+    expected = [frozenset(pair_bones[pair_faces == face].tolist()) for face in range(2000)]
+    assert [sets[i] for i in set_ids.tolist()] == expected
+    assert len(sets) == len(set(expected))
+    assert lowest.tolist() == [min(bones) if bones else -1 for bones in sets]
+    assert means.tolist() == pytest.approx([np.mean(sorted(bones)) if bones else 0.0 for bones in sets])
+
+
+def test_bone_sets_without_faces():
+    set_ids, sets, lowest, means = bone_sets(0, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    assert len(set_ids) == 0 and sets == [] and len(lowest) == 0 and len(means) == 0
+
+
+def test_pack_palettes_respects_budget():
+    sets = [frozenset({0, 1}), frozenset({1, 2}), frozenset({5, 6, 7}), frozenset({0, 2})]
+    assignment, palettes = pack_palettes(sets, range(len(sets)), 3)
+    assert all(len(palette) <= 3 for palette in palettes)
+    assert all(bones <= palettes[index] for bones, index in zip(sets, assignment.tolist()))
+    assert assignment[0] == assignment[1] == assignment[3] != assignment[2]
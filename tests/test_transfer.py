@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from core.transfer import merge_weights
+from core.weights import WeightTable
+
+NORMALIZE = [("limit_weights", {"limit": 4, "normalize": False}), ("normalize", {})]
+
+
+def target_tables():
+    """A target with weights in its own group 0 and the transferred group 1."""
+    existing = WeightTable([0, 0, 1], [0, 1, 0], [0.6, 0.4, 1.0], 2, 3)
+    incoming = WeightTable([0, 1, 1], [1, 1, 2], [1.0, 0.5, 0.5], 2, 3)
+    return existing, incoming, np.array([False, True, True])
+
+
+def test_merge_weights_normalizes_across_the_targets_other_groups():
+    existing, incoming, replaced = target_tables()
+    keep, weights, added = merge_weights(existing, incoming, replaced, NORMALIZE)
+    assert keep.tolist() == [True, False, True]
+    totals = np.bincount(np.r_[existing.verts[keep], added.verts],
+                         weights=np.r_[weights[keep], added.weights], minlength=2)
+    assert totals == pytest.approx([1.0, 1.0])
+    assert weights[[0, 2]] == pytest.approx([0.375, 0.5])
+    assert added.groups.tolist() == [1, 1, 2]
+
+
+def test_merge_weights_quantizes_to_exact_totals():
+    existing, incoming, replaced = target_tables()
+    keep, weights, added = merge_weights(existing, incoming, replaced, [("quantize_weights", {"bits": 8})])
+    levels = np.rint(np.r_[weights[keep], added.weights] * 255)
+    totals = np.bincount(np.r_[existing.verts[keep], added.verts], weights=levels, minlength=2)
+    assert totals.tolist() == [255, 255]
+
+
+def test_merge_weights_leaves_locked_groups_alone():
+    existing, incoming, replaced = target_tables()
+    locked = np.array([False, True, False])
+    keep, weights, added = merge_weights(existing, incoming, replaced, NORMALIZE, locked)
+    assert keep.tolist() == [True, True, True]
+    assert weights[1] == pytest.approx(0.4)
+    assert weights[0] == pytest.approx(0.6)
+    assert 1 not in added.groups.tolist()
+
+
+def test_transfer_operator_normalizes_with_the_targets_own_groups(blender):
+    bpy = blender
+    bpy.ops.mesh.primitive_uv_sphere_add()
+    source = bpy.context.active_object
+    count = len(source.data.vertices)
+    source.vertex_groups.new(name="A").add(list(range(count)), 0.7, 'REPLACE')
+    source.vertex_groups.new(name="B").add(list(range(count)), 0.3, 'REPLACE')
+    bpy.ops.mesh.primitive_cube_add(size=1.5)
+    target = bpy.context.active_object
+    target.vertex_groups.new(name="Own").add(list(range(8)), 1.0, 'REPLACE')
+    source.select_set(True)
+    bpy.context.view_layer.objects.active = source
+    bpy.context.scene.nao_props.weight_precision = '8'
+
+    assert bpy.ops.wm.nao_transfer_weights_operator() == {'FINISHED'}
+    for vertex in target.data.vertices:
+        assert len(vertex.groups) == 3
+        assert round(sum(element.weight for element in vertex.groups) * 255) == 255
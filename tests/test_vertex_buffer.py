@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from core.vertex_buffer import (VertexLayout, bone_streams, build_buffers, pack_component, read_buffers, weld,
+                                write_buffers)
+from core.weights import WeightTable
+
+
+def rows(vertices):
+    """Vertices as raw byte rows, comparable with ==."""
+    return vertices.view(np.dtype((np.void, vertices.dtype.itemsize)))
+
+
+def skinned_layout(weight_type="unorm8"):
+    return VertexLayout("test", [("position", "float32", 3), ("uv0", "float16", 2),
+                                 ("bone_indices", "uint8", 4), ("bone_weights", weight_type, 4)])
+
+
+@pytest.mark.parametrize("component, values", [
+    ("uint8", [0, 256]),
+    ("uint8", [-1, 3]),
+    ("uint16", [70000]),
+    ("snorm8", [-129]),
+])
+def test_pack_component_rejects_integers_out_of_range(component, values):
+    with pytest.raises(ValueError):
+        pack_component(np.array(values), component, 1)
+
+
+def test_pack_component_scales_normalized_floats_and_pads_columns():
+    packed = pack_component(np.array([[0.0, 0.5], [1.0, 2.0]]), "unorm8", 3)
+    assert packed.dtype == np.uint8
+    assert packed.tolist() == [[0, 128, 0], [255, 255, 0]]
+    assert pack_component(np.array([[-1.0], [1.0]]), "snorm16", 1).ravel().tolist() == [-32767, 32767]
+
+
+def test_weld_matches_unique_in_first_use_order():
+    rng = np.random.default_rng(1)
+    layout = VertexLayout("test", [("position", "float32", 3), ("uv0", "float16", 2)])
+    distinct = np.zeros(50, dtype=layout.dtype)
+    distinct["position"] = rng.random((50, 3))
+    distinct["uv0"] = rng.random((50, 2))
+    vertices = distinct[rng.integers(0, 50, 1000)]
+
+    welded, inverse = weld(vertices)
+    _values, first = np.unique(rows(vertices), return_index=True)
+    assert len(welded) == len(first)
+    assert (rows(welded) == rows(vertices[np.sort(first)])).all()
+    assert (rows(welded[inverse]) == rows(vertices)).all()
+
+
+def test_weld_empty():
+    welded, inverse = weld(np.zeros(0, dtype=skinned_layout().dtype))
+    assert len(welded) == 0 and len(inverse) == 0
+
+
+@pytest.mark.parametrize("weight_type, total", [("unorm8", 255), ("unorm16", 65535), ("float32", 1.0)])
+def test_bone_streams_keep_heaviest_and_sum_to_full_scale(weight_type, total):
+    table = WeightTable([0, 0, 0, 0, 0, 1], [0, 1, 2, 3, 4, 2], [0.1, 0.4, 0.2, 0.2, 0.1, 1.0], 3, 5)
+    indices, weights = bone_streams(table, 4, weight_type)
+    assert indices[0].tolist() == [1, 2, 3, 0]
+    assert indices[1].tolist() == [2, 0, 0, 0]
+    assert weights.sum(axis=1)[:2] == pytest.approx([total, total])
+    assert weights[2].tolist() == [0, 0, 0, 0]
+
+
+def test_build_buffers_groups_triangles_and_rejects_index_overflow():
+    layout = skinned_layout()
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]], dtype=np.float32)
+    streams = {"position": positions[[0, 1, 2, 2, 1, 3]]}
+    vertices, indices, submeshes = build_buffers(layout, streams, [[3, 4, 5], [0, 1, 2]], [1, 0])
+    assert len(vertices) == 4
+    assert vertices["position"][indices].tolist() == positions[[0, 1, 2, 2, 1, 3]].tolist()
+    assert submeshes == [(0, 0, 3), (1, 3, 3)]
+
+    tiny = VertexLayout("tiny", [("position", "float32", 1)], index_type="uint16")
+    corners = np.arange(70002)
+    with pytest.raises(ValueError):
+        build_buffers(tiny, {"position": corners.astype(np.float32)}, corners.reshape(-1, 3))
+
+
+def test_write_and_read_buffers_round_trip(tmp_path):
+    layout = skinned_layout()
+    rng = np.random.default_rng(2)
+    vertices = np.zeros(7, dtype=layout.dtype)
+    vertices["position"] = rng.random((7, 3))
+    vertices["bone_weights"] = [255, 0, 0, 0]
+    indices = rng.integers(0, 7, 12).astype("<u2")
+    path = tmp_path / "mesh.nvb"
+
+    write_buffers(path, layout, vertices, indices, name="mesh", bones=["root"])
+    header, read_layout, read_vertices, read_indices = read_buffers(path)
+    assert header["name"] == "mesh" and header["bones"] == ["root"]
+    assert read_layout.to_dict() == layout.to_dict()
+    assert (rows(read_vertices) == rows(vertices)).all()
+    assert read_indices.tolist() == indices.tolist()
+    assert header["index_offset"] % 16 == 0
+
+
+def test_read_buffers_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a buffer")
+    with pytest.raises(ValueError):
+        read_buffers(path)
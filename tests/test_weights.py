@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from core.weights import (WeightTable, interpolate_weights, limit_total, normalize, quantize, quantize_levels,
+                          run_weight_steps, vertex_ranks)
+
+
+def empty_table():
+    """A mesh with vertex groups but no weights assigned."""
+    return WeightTable([], [], [], 10, 3)
+
+
+def small_table():
+    return WeightTable(
+        [0, 0, 0, 1, 1, 2],
+        [0, 1, 2, 0, 2, 1],
+        [0.5, 0.3, 0.2, 0.25, 0.25, 0.0],
+        3, 3,
+    )
+
+
+def test_vertex_ranks_orders_heaviest_first_keeping_ties_stable():
+    table = small_table()
+    assert vertex_ranks(table.verts, table.weights).tolist() == [0, 1, 2, 0, 1, 0]
+
+
+def test_normalize_sums_to_one_and_leaves_zero_vertices():
+    table = small_table()
+    weights = normalize(table.verts, table.weights, table.vertex_count)
+    totals = np.bincount(table.verts, weights=weights, minlength=3)
+    assert totals[:2] == pytest.approx([1.0, 1.0])
+    assert totals[2] == 0.0
+
+
+def test_limit_total_keeps_heaviest_and_renormalizes():
+    keep, weights = limit_total(small_table(), 2)
+    assert keep.tolist() == [True, True, False, True, True, True]
+    assert weights[:2] == pytest.approx([0.625, 0.375])
+    assert weights[2] == 0.0
+
+
+def test_quantize_levels_sum_exactly_to_full_scale():
+    rng = np.random.default_rng(0)
+    verts = np.repeat(np.arange(1000), 4)
+    weights = rng.random(len(verts)).astype(np.float32)
+    for bits in (8, 16):
+        levels = quantize_levels(verts, weights, 1000, bits)
+        assert (np.bincount(verts, weights=levels) == (1 << bits) - 1).all()
+
+
+def test_normalize_keeps_locked_weights_and_scales_the_rest():
+    table = small_table()
+    locked = table.groups == 0
+    weights = normalize(table.verts, table.weights, table.vertex_count, locked=locked)
+    assert weights[[0, 3]] == pytest.approx([0.5, 0.25])
+    assert weights[[1, 2, 4]] == pytest.approx([0.3, 0.2, 0.75])
+
+
+def test_quantize_levels_keep_locked_levels():
+    table = small_table()
+    locked = table.groups == 0
+    levels = quantize_levels(table.verts, table.weights, table.vertex_count, 8, locked=locked)
+    assert levels[[0, 3]].tolist() == [128, 64]
+    assert levels[[0, 1, 2]].sum() == 255 and levels[[3, 4]].sum() == 255
+
+
+@pytest.mark.parametrize("steps", [
+    [("normalize", {})],
+    [("limit_weights", {"limit": 4})],
+    [("quantize_weights", {"bits": 8})],
+    [("limit_weights", {"limit": 4, "normalize": False}), ("quantize_weights", {"bits": 16}),
+     ("clear_unused_weights", {})],
+])
+def test_weight_steps_accept_meshes_without_weights(steps):
+    keep, weights, unused = run_weight_steps(empty_table(), steps)
+    assert len(keep) == 0 and len(weights) == 0
+    assert len(unused) == 3
+
+
+def test_empty_tables_regression():
+    table = empty_table()
+    keep, weights = limit_total(table, 4)
+    assert len(keep) == 0 and len(weights) == 0
+    assert len(normalize(table.verts, table.weights, table.vertex_count)) == 0
+    assert len(quantize(table.verts, table.weights, table.vertex_count)) == 0
+
+
+def test_interpolate_weights_blends_corners_and_merges_groups():
+    table = WeightTable([0, 0, 1, 2], [0, 1, 1, 2], [0.5, 0.5, 1.0, 1.0], 3, 3)
+    result = interpolate_weights(table, np.array([[0, 1, 2], [2, 2, 2]]), np.array([[0.5, 0.25, 0.25], [1, 0, 0]]))
+    assert result.verts.tolist() == [0, 0, 0, 1]
+    assert result.groups.tolist() == [0, 1, 2, 2]
+    assert result.weights == pytest.approx([0.25, 0.5, 0.25, 1.0])